@@ -1,70 +1,175 @@
-import os
+import argparse
+import atexit
+import sys
 from dotenv import load_dotenv
-from langchain.agents import tool
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from langchain_openai import ChatOpenAI
-from src.config import DB_PATH, EMBEDDING_MODEL
-from src.data_ingestion import fetch_disruption_news
+# langchain.agents re-exports this decorator but takes over a second to import
+from langchain_core.tools import tool
+from src.answer_cache import answer_cache_stats, get_answer_cache, query_scope
+from src.config import ANSWER_CACHE_ENABLED
+from src.data_ingestion import fetch_disruption_news, fetch_disruption_news_many
+from src.exposure_index import get_exposure_index
+from src.filter_index import get_filter_index
+from src.retriever import get_retriever, summarize_hits
+from src.tracing import enable_tracing, finish_tracing, traced
 
 load_dotenv()
 
 # --- Define Tools ---
 
 @tool
+@traced("tool.news_scanner")
 def news_scanner_tool(query: str) -> str:
     """
     Scans for recent news articles related to a general query about supply chain disruptions.
     Use this as your first step to get a lay of the land. The input query should be a
-    simple search term like 'factory fire' or 'port congestion'.
+    simple search term like 'factory fire' or 'port congestion'. To try several variants
+    at once, put one search term per line; they are searched together.
     Returns a formatted string of article titles and URLs.
     """
-    print(f"--- AGENT ACTION: Calling News Scanner Tool with query: '{query}' ---")
-    # We will re-use our function from Week 1
-    articles = fetch_disruption_news(query) 
+    queries = [q.strip() for q in query.splitlines() if q.strip()] or [query]
+    print(f"--- AGENT ACTION: Calling News Scanner Tool with query: '{' | '.join(queries)}' ---")
+    # We will re-use our functions from Week 1; several variants are fetched concurrently
+    if len(queries) == 1:
+        articles = fetch_disruption_news(queries[0])
+    else:
+        results = fetch_disruption_news_many(queries)
+        # Merge the variants, dropping articles that more than one of them returned
+        seen_urls = set()
+        articles = []
+        for query_articles in results.values():
+            for a in query_articles:
+                if a['url'] not in seen_urls:
+                    seen_urls.add(a['url'])
+                    articles.append(a)
     if articles:
         # Format the output to be clean and simple for the agent
         return "\n".join([f"Title: {a['title']}, URL: {a['url']}" for a in articles])
     return "No relevant news articles found."
 
 @tool
+@traced("tool.supply_chain_retriever")
 def supply_chain_retriever_tool(query: str) -> str:
     """
     Queries the company's internal supply chain vector database to find information
     about suppliers, materials, and locations. Crucially, this tool now returns
-    both the retrieved information AND its 'Criticality Level'.
+    both the retrieved information AND its 'Criticality Level'. All relevant matches are
+    returned in one call, grouped by supplier and location, so there is no need to repeat
+    the same question with different wording.
     """
     print(f"--- AGENT ACTION: Calling Upgraded Supply Chain Retriever with query: '{query}' ---")
-    
-    # Load the embedding function and the vector database from disk
-    embeddings = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
-    vectordb = Chroma(persist_directory=DB_PATH, embedding_function=embeddings)
-    
-    # Perform a similarity search. We ask for the single best match (k=1) for clarity.
-    results = vectordb.similarity_search(query, k=1)
-    
-    if results:
-        # Get the first and best document match
-        doc = results[0]
-        page_content = doc.page_content
-        
-        # --- THIS IS THE KEY UPGRADE ---
-        # We access the document's metadata and get the criticality level.
-        # .get() is a safe way to do this; it returns 'Unknown' if the key doesn't exist.
-        criticality = doc.metadata.get('criticality_level', 'Unknown')
-        
-        # We return a structured string that the agent's LLM can easily understand.
-        return f"Found Match: {page_content}\nCriticality Level: {criticality}"
-        
-    return "No relevant information found in the supply chain database."
+
+    # A question asked before in the same words is answered from the answer cache
+    cache = get_answer_cache() if ANSWER_CACHE_ENABLED else None
+    if cache is not None:
+        answer = cache.get(query)
+        if answer is not None:
+            return answer
+
+    # Exact lookups such as "suppliers in Taiwan" are answered completely from the filter index
+    match = get_filter_index().match(query)
+    if match.is_pure_filter:
+        answer = get_filter_index().answer(match)
+        if cache is not None:
+            cache.put(query, answer)
+        return answer
+
+    # The shared retriever loads the embedding model and the vector database once per process
+    retriever = get_retriever()
+    query_embedding = retriever.embed_query(query)
+
+    # The same question in other words (same places, suppliers and IDs) gets the earlier answer
+    scope = query_scope(match.filters, query)
+    if cache is not None:
+        answer, earlier_query = cache.get_similar(query, query_embedding, scope)
+        if answer is not None:
+            return f"(Same question as the earlier query '{earlier_query}'.)\n{answer}"
+
+    # Perform a similarity search for the top matches above the relevance threshold.
+    # Any recognised country, city, supplier or criticality narrows the search down first.
+    hits = retriever.search_with_scores(query, where=match.where(), query_embedding=query_embedding)
+
+    if hits:
+        # Hits are grouped by supplier and location, each with its highest 'Criticality Level',
+        # so one call covers every supplier in a location instead of a single arbitrary match.
+        answer = summarize_hits(hits)
+    else:
+        answer = "No relevant information found in the supply chain database."
+    if cache is not None:
+        cache.put(query, answer, query_embedding, scope)
+    return answer
+
+@tool
+@traced("tool.supply_chain_batch_retriever")
+def supply_chain_batch_retriever_tool(queries: str) -> str:
+    """
+    Checks several locations, companies or headlines against the company's internal supply
+    chain vector database in one step. The input must be a newline-separated list with one
+    query per line (for example, one news headline per line). For each query it returns the
+    best match and its 'Criticality Level'.
+    """
+    query_list = [q.strip() for q in queries.splitlines() if q.strip()]
+    print(f"--- AGENT ACTION: Calling Batch Supply Chain Retriever with {len(query_list)} queries ---")
+    if not query_list:
+        return "No queries provided. Pass one query per line."
+
+    # All queries are embedded and searched together
+    batch_results = get_retriever().batch_similarity_search(query_list, k=1)
+
+    sections = []
+    for query, results in zip(query_list, batch_results):
+        if results:
+            doc = results[0]
+            criticality = doc.metadata.get('criticality_level', 'Unknown')
+            sections.append(f"Query: {query}\nFound Match: {doc.page_content}\nCriticality Level: {criticality}")
+        else:
+            sections.append(f"Query: {query}\nNo relevant information found in the supply chain database.")
+    return "\n\n".join(sections)
+
+@tool
+@traced("tool.supplier_exposure")
+def supplier_exposure_tool(location_or_supplier: str) -> str:
+    """
+    Returns the full blast radius if a country, city or supplier is disrupted: every affected
+    supplier and material, ranked from most to least critical, with criticality counts.
+    The input must be exactly one name, e.g. 'Hsinchu', 'Taiwan', 'Sun Earth Corp' or 'S851'.
+    """
+    print(f"--- AGENT ACTION: Calling Supplier Exposure Tool with: '{location_or_supplier}' ---")
+    index = get_exposure_index()
+    name = location_or_supplier.strip().strip('"\'')
+    radii = index.blast_radius(name)
+    if not radii:
+        return f"'{name}' is not a country, city or supplier in our supply chain."
+    return "\n\n".join(index.format(radius) for radius in radii)
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Try the supply chain retriever tool on a sample query.")
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="Re-run this command under 'python -X importtime' and print where start-up time goes.")
+    parser.add_argument("--trace", action="store_true",
+                        help="Time the tool calls, model loading and searches and print a summary.")
+    args = parser.parse_args()
+    if args.profile_imports:
+        from src.startup import profile_imports
+        raise SystemExit(profile_imports(sys.argv))
+    if args.trace:
+        enable_tracing("agent")
+        atexit.register(finish_tracing)
+
+    from src.startup import seconds_since_start
     print("--- Testing the upgraded retriever tool ---")
-    # We will simulate a query the agent might make
+    # We will simulate a query the agent might make. Filter-only queries are answered from
+    # the index snapshot, so the embedding model is not loaded for them.
     test_query = "What suppliers do we have in Taiwan?"
     tool_output = supply_chain_retriever_tool.invoke(test_query)
+    print(f"First tool call answered {seconds_since_start():.2f}s after start-up")
     
     print(f"\nQuery: '{test_query}'")
     print("Tool Output:")
     print(tool_output)
+
+    # Load the model and the database so the semantic search timings below are steady-state
+    get_retriever().warm_up()
+    supply_chain_retriever_tool.invoke("semiconductor suppliers affected by a typhoon")
+    print(f"\nRetriever stats: {get_retriever().stats()}")
+    print(f"Answer cache stats: {answer_cache_stats()}")
     print("\n--- Test complete ---")
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark: rendering documents with DataFrame.iterrows() vs. the column-wise pipeline.
+
+Run from the project root:
+    python -m benchmarks.bench_document_rendering
+    python -m benchmarks.bench_document_rendering --sizes 1000 100000 1000000 --legacy-max-rows 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.documents import render_documents, to_metadatas
+
+
+def make_merged_frame(num_rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Builds a synthetic merged materials/suppliers table with the same columns as the real one.
+    """
+    rng = np.random.default_rng(seed)
+    num_suppliers = max(num_rows // 10, 1)
+    supplier_idx = rng.integers(0, num_suppliers, size=num_rows)
+    countries = np.array(["Taiwan", "Germany", "USA", "China", "Japan", "Mexico"])
+    cities = np.array(["Hsinchu", "Leipzig", "Houston", "Shenzhen", "Osaka", "Monterrey"])
+    levels = np.array(["Low", "Medium", "High", "Critical"])
+    industries = np.array(["Semiconductors", "Logistics", "Chemicals", "Automotive"])
+    location = supplier_idx % len(countries)
+    return pd.DataFrame({
+        "material_id": [f"M{i:07d}" for i in range(1, num_rows + 1)],
+        "material_name": np.char.add("ECO-", rng.integers(1, 999, size=num_rows).astype(str)),
+        "supplied_by_id": [f"S{i:06d}" for i in supplier_idx],
+        "criticality_level": levels[rng.integers(0, len(levels), size=num_rows)],
+        "supplier_id": [f"S{i:06d}" for i in supplier_idx],
+        "supplier_name": np.char.add("Supplier ", supplier_idx.astype(str)),
+        "country": countries[location],
+        "city": cities[location],
+        "industry_type": industries[supplier_idx % len(industries)],
+    }).astype(str)
+
+
+def render_legacy(merged_df: pd.DataFrame) -> list:
+    """
+    The previous per-row implementation from vectordb.py, minus the Document wrapper.
+    """
+    documents = []
+    for index, row in merged_df.iterrows():
+        page_content = f"Material '{row['material_name']}' (ID: {row['material_id']}) is a " \
+                       f"{row['criticality_level']} criticality component. It is supplied by " \
+                       f"'{row['supplier_name']}' (ID: {row['supplier_id']}) from {row['city']}, " \
+                       f"{row['country']}, which is in the {row['industry_type']} industry."
+        metadata = {
+            "source": f"materials.csv:{row['material_id']}",
+            "supplier_name": row['supplier_name'],
+            "material_name": row['material_name'],
+            "criticality_level": row['criticality_level']
+        }
+        documents.append((page_content, metadata))
+    return documents
+
+
+def render_vectorised(merged_df: pd.DataFrame) -> list:
+    rendered = render_documents(merged_df)
+    return list(zip(rendered["page_content"].tolist(), to_metadatas(rendered)))
+
+
+def time_it(func, merged_df: pd.DataFrame) -> float:
+    start = time.perf_counter()
+    func(merged_df)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=None,
+                        help="Skip the iterrows() path above this many rows (it takes minutes at 1M).")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'iterrows (s)':>14} {'vectorised (s)':>16} {'speed-up':>10}")
+    for size in args.sizes:
+        merged_df = make_merged_frame(size)
+        vectorised = time_it(render_vectorised, merged_df)
+        if args.legacy_max_rows is None or size <= args.legacy_max_rows:
+            legacy = time_it(render_legacy, merged_df)
+            print(f"{size:>10} {legacy:>14.3f} {vectorised:>16.3f} {legacy / vectorised:>9.1f}x")
+        else:
+            print(f"{size:>10} {'skipped':>14} {vectorised:>16.3f} {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Checks the int8 ONNX embedding backend against the PyTorch model before switching
+EMBEDDING_BACKEND, on our own documents (rendered from data/ exactly as vectordb.py does):
+    cosine     agreement between the two backends' vectors for the same document
+               (mean, 5th percentile and minimum over --docs documents)
+    recall@k   overlap of each query's top-k documents with the PyTorch top-k, for an index
+               built with ONNX ("onnx index") and for ONNX queries against the existing
+               PyTorch-built index ("mixed", i.e. switching without `vectordb.py --full`)
+
+and, with each backend loaded in a fresh process so the other does not skew memory:
+    load       time to load the model
+    docs/s     ingest throughput (the documents in batches of EMBED_BATCH_SIZE)
+    p50/p95    single-query encode latency over the queries
+    rss        resident set size after encoding
+
+Needs both sentence-transformers and onnxruntime, plus the export
+(`python -m src.onnx_embeddings export`). Run from the project root:
+    python -m benchmarks.bench_onnx_embeddings --docs 2000 --k 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_vector_store import rss_mb
+from src.config import DATA_PATH, EMBEDDING_MODEL, EMBED_BATCH_SIZE
+from src.documents import iter_merged_frames, render_documents
+
+QUERIES = [
+    "What materials are supplied from Taiwan?",
+    "Do we have any high criticality microchips?",
+    "semiconductors from suppliers in Japan",
+    "critical components shipped through Rotterdam",
+    "lithium battery cells",
+    "rare earth magnets supplied from China",
+    "low criticality packaging materials",
+    "suppliers in Vietnam",
+    "steel parts from Germany",
+    "memory chips with a single source supplier",
+    "typhoon disruption at factories in Taiwan",
+    "flooding near suppliers in India",
+    "automotive sensors",
+    "printed circuit boards from Mexico",
+    "what depends on suppliers in South Korea?",
+    "medium criticality plastics",
+]
+
+
+def load_documents(limit: int) -> list:
+    texts = []
+    for merged_df in iter_merged_frames(DATA_PATH, chunksize=max(limit, 1000)):
+        texts.extend(render_documents(merged_df)["page_content"].tolist())
+        if len(texts) >= limit:
+            break
+    return texts[:limit]
+
+
+def measure(backend: str, texts: list, queries: list) -> tuple:
+    """
+    Runs in a fresh process: loads the backend, encodes the documents and the queries.
+    Returns the timings and the (document, query) vectors.
+    """
+    from src.embedding import load_embeddings
+
+    baseline = rss_mb()
+    start = time.perf_counter()
+    embeddings = load_embeddings(EMBEDDING_MODEL, backend)
+    load = time.perf_counter() - start
+
+    embeddings.embed_query("warm up")
+    start = time.perf_counter()
+    doc_vectors = []
+    for i in range(0, len(texts), EMBED_BATCH_SIZE):
+        doc_vectors.extend(embeddings.embed_documents(texts[i:i + EMBED_BATCH_SIZE]))
+    ingest = time.perf_counter() - start
+
+    latencies, query_vectors = [], []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(embeddings.embed_query(query))
+        latencies.append(time.perf_counter() - start)
+
+    stats = {
+        "backend": backend,
+        "load_s": load,
+        "docs_per_s": len(texts) / ingest,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - baseline,
+    }
+    return stats, np.asarray(doc_vectors, dtype=np.float32), np.asarray(query_vectors, dtype=np.float32)
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = unit(query_vectors) @ unit(doc_vectors).T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def recall_at_k(expected: np.ndarray, found: np.ndarray) -> float:
+    return float(np.mean([len(set(e) & set(f)) / len(e) for e, f in zip(expected, found)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=2000, help="Documents from data/ to embed.")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--measure", nargs=2, metavar=("BACKEND", "OUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    texts = load_documents(args.docs)
+    queries = QUERIES + texts[:: max(1, len(texts) // 16)][:16]
+
+    if args.measure:
+        stats, doc_vectors, query_vectors = measure(args.measure[0], texts, queries)
+        np.savez(args.measure[1], docs=doc_vectors, queries=query_vectors)
+        print(json.dumps(stats))
+        return
+
+    results, vectors = [], {}
+    with tempfile.TemporaryDirectory(prefix="bench_onnx_") as workdir:
+        for backend in ["torch", "onnx"]:
+            out = os.path.join(workdir, f"{backend}.npz")
+            print(f"Encoding {len(texts)} documents and {len(queries)} queries with {backend}...")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_onnx_embeddings", "--measure", backend, out,
+                 "--docs", str(args.docs), "--k", str(args.k)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+            with np.load(out) as data:
+                vectors[backend] = (data["docs"], data["queries"])
+
+    torch_docs, torch_queries = vectors["torch"]
+    onnx_docs, onnx_queries = vectors["onnx"]
+    cosine = np.sum(unit(torch_docs) * unit(onnx_docs), axis=1)
+    expected = top_k(torch_docs, torch_queries, args.k)
+
+    columns = ["load_s", "docs_per_s", "p50_ms", "p95_ms", "rss_mb", "rss_delta_mb"]
+    print(f"\n{len(texts)} documents, {len(queries)} queries, '{EMBEDDING_MODEL}'")
+    print(f"{'backend':<10}" + "".join(f"{c:>14}" for c in columns))
+    for r in results:
+        print(f"{r['backend']:<10}" + "".join(f"{r[c]:>14.2f}" for c in columns))
+    print(f"\nCosine torch vs onnx: mean {cosine.mean():.4f}, p5 {np.percentile(cosine, 5):.4f}, min {cosine.min():.4f}")
+    print(f"recall@{args.k} onnx index: {recall_at_k(expected, top_k(onnx_docs, onnx_queries, args.k)):.3f}")
+    print(f"recall@{args.k} mixed (onnx queries, torch index): {recall_at_k(expected, top_k(torch_docs, onnx_queries, args.k)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
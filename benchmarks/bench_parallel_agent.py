@@ -0,0 +1,100 @@
+"""
+Offline harness for the parallel ReAct executor: a scripted fake LLM and fake tools with
+fixed latencies, run through both the stock AgentExecutor (tools one after another) and
+ParallelAgentExecutor. Checks that both reach the same answer and the same observations,
+and prints the wall-clock time of each.
+
+Run from the project root:
+    python -m benchmarks.bench_parallel_agent --headlines 10 --tool-latency 0.3 --llm-latency 0.2
+"""
+import argparse
+import time
+
+from langchain.agents import AgentExecutor, create_react_agent
+from langchain.agents import tool
+from langchain_core.language_models import FakeListLLM
+from langchain_core.prompts import PromptTemplate
+
+from src.parallel_agent import MultiActionReActOutputParser, ParallelAgentExecutor
+
+# Small offline stand-in for the hub ReAct prompt, with the same input variables
+PROMPT = PromptTemplate.from_template(
+    "Answer the question using these tools:\n{tools}\n\n"
+    "Use the format Thought / Action (one of [{tool_names}]) / Action Input / Observation, "
+    "and finish with Final Answer.\n\nQuestion: {input}\nThought:{agent_scratchpad}"
+)
+
+CITIES = ["Hsinchu", "Taichung", "Leipzig", "Osaka", "Shenzhen", "Monterrey", "Houston", "Pune", "Busan", "Lyon",
+          "Turin", "Perth", "Recife", "Hanoi", "Leeds", "Kobe"]
+
+
+def make_tools(latency: float) -> list:
+    @tool
+    def news_scanner_tool(query: str) -> str:
+        """Fake news search returning one headline per query."""
+        time.sleep(latency)
+        return f"Title: {query} reported, URL: https://example.com/{query.replace(' ', '-')}"
+
+    @tool
+    def supply_chain_retriever_tool(query: str) -> str:
+        """Fake supply chain lookup returning a fixed criticality per location."""
+        time.sleep(latency)
+        level = ["High", "Medium", "Low"][len(query) % 3]
+        return f"Found Match: supplier in {query}\nCriticality Level: {level}"
+
+    return [news_scanner_tool, supply_chain_retriever_tool]
+
+
+def make_script(num_headlines: int) -> list:
+    """
+    LLM responses for one run: a batch of news queries, a batch of location checks, an answer.
+    """
+    cities = (CITIES * (num_headlines // len(CITIES) + 1))[:num_headlines]
+    scan = "Thought: I will search several disruption types at once.\n" + "\n".join(
+        f"Action: news_scanner_tool\nAction Input: {topic}"
+        for topic in ["factory fire", "port congestion", "labour strike"]
+    )
+    check = "Thought: I will check every location I found.\n" + "\n".join(
+        f"Action: supply_chain_retriever_tool\nAction Input: {city}" for city in cities
+    )
+    final = "Thought: I now know the final answer\nFinal Answer: " + "; ".join(
+        f"[P0 - CRITICAL] {city}" for city in cities
+    )
+    return [scan, check, final]
+
+
+def run(executor_kind: str, num_headlines: int, tool_latency: float, llm_latency: float):
+    tools = make_tools(tool_latency)
+    llm = FakeListLLM(responses=make_script(num_headlines), sleep=llm_latency)
+    agent = create_react_agent(llm, tools, PROMPT, output_parser=MultiActionReActOutputParser())
+    if executor_kind == "serial":
+        executor = AgentExecutor(agent=agent, tools=tools, return_intermediate_steps=True)
+    else:
+        executor = ParallelAgentExecutor(agent=agent, tools=tools, max_workers=max(num_headlines, 3))
+    start = time.perf_counter()
+    result = executor.invoke({"input": "Find supply chain risks."})
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--headlines", type=int, default=10)
+    parser.add_argument("--tool-latency", type=float, default=0.3)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    serial, serial_seconds = run("serial", args.headlines, args.tool_latency, args.llm_latency)
+    parallel, parallel_seconds = run("parallel", args.headlines, args.tool_latency, args.llm_latency)
+
+    same_output = serial["output"] == parallel["output"]
+    same_observations = [o for _, o in serial["intermediate_steps"]] == [o for _, o in parallel["intermediate_steps"]]
+    print(f"tool calls:        {len(parallel['intermediate_steps'])}")
+    print(f"serial executor:   {serial_seconds:.2f}s")
+    print(f"parallel executor: {parallel_seconds:.2f}s ({serial_seconds / parallel_seconds:.1f}x)")
+    print(f"same final answer: {same_output}, same observations: {same_observations}")
+    if not (same_output and same_observations):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+End-to-end retrieval benchmark on synthetic catalogues, written as JSON so runs on
+different commits can be compared.
+
+For each corpus size a catalogue is generated with data.datagen (seeded, so every run
+sees the same data), rendered and embedded as vectordb.py does, and written to each
+vector store backend together with the lexical index. Labelled queries are drawn from the
+catalogue: by country, city, supplier name and material ID. Then, for every backend and
+mode ("vector": vector search only; "hybrid": vector plus lexical index, fused as in the
+retriever), a fresh process opens the indexes and runs the queries through
+SupplyChainRetriever:
+    cold_start_ms   opening the store (and lexical index, and model) plus the first query
+    p50/p95/p99_ms  single-query latency, embedding included
+    batch_qps       queries per second through batch_similarity_search
+    peak_rss_mb     peak resident memory of that process
+    recall          recall@k against brute-force exact search over the same embeddings
+                    (ties with the k-th exact score count as correct)
+    labels          per query type: hit@k (some result has the queried country, city,
+                    supplier or material) and precision@k (share of results that do)
+
+By default documents and queries are embedded with a hashed bag of words, so the benchmark
+runs offline in seconds; it measures the indexes, not the model. --embedder model uses the
+configured embedding model instead (EMBEDDING_MODEL on EMBEDDING_BACKEND), which needs it
+to be available locally.
+
+Run from the project root (Chroma is skipped if chromadb is not installed):
+    python -m benchmarks.bench_retrieval --sizes 1000 10000 100000 --k 10
+    python -m benchmarks.bench_retrieval --compare bench_results/retrieval-<commit>.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.bench_vector_store import open_store
+from data.datagen import generate_corpus
+from src.documents import iter_merged_frames, render_documents, to_metadatas
+from src.lexical_index import LexicalIndex
+
+BACKENDS = ["flat", "flat-int8", "chroma"]
+MODES = ["vector", "hybrid"]
+QUERY_TEMPLATES = {
+    "country": ("country", ["suppliers in {country}", "materials sourced from {country}"]),
+    "city": ("city", ["factories in {city}", "what do we buy from {city}?"]),
+    "supplier": ("supplier_name", ["materials supplied by {supplier_name}", "{supplier_name} parts"]),
+    "material_id": ("material_id", ["{material_id}", "details for material {material_id}"]),
+}
+METRICS = ["cold_start_ms", "p50_ms", "p95_ms", "p99_ms", "batch_qps", "peak_rss_mb", "recall"]
+
+_WORD = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Offline stand-in for the embedding model: every word adds +1 or -1 to one of `dim`
+    buckets chosen by its hash, and the vector is L2-normalized.
+    """
+
+    def __init__(self, dim: int = 384):
+        self.dim = dim
+        self._buckets = {}
+
+    def _bucket(self, word: str) -> tuple:
+        bucket = self._buckets.get(word)
+        if bucket is None:
+            h = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            bucket = self._buckets[word] = (h % self.dim, 1.0 if h >> 63 else -1.0)
+        return bucket
+
+    def encode(self, texts: list) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                column, sign = self._bucket(word)
+                vectors[row, column] += sign
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts: list) -> list:
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self.encode([text])[0].tolist()
+
+
+def make_embeddings(name: str):
+    if name == "hash":
+        return HashingEmbeddings()
+    from src.embedding import load_embeddings
+    return load_embeddings()
+
+
+def peak_rss_mb() -> float:
+    # VmHWM is this process's own peak; Linux carries ru_maxrss over from the parent through exec
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def commit_id() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# --- building ---
+
+def build_indexes(data_dir: str, workdir: str, backends: list, embedder: str, batch_size: int = 5000) -> dict:
+    """
+    Renders and embeds the catalogue, writes it to every backend and the lexical index.
+    Returns the document ids, their embeddings and metadata (for labels and ground truth),
+    the paths and the build time per backend.
+    """
+    embeddings = make_embeddings(embedder)
+    stores, build_seconds = {}, {}
+    for backend in backends:
+        try:
+            stores[backend] = open_store(backend, os.path.join(workdir, backend) + "/")
+            build_seconds[backend] = 0.0
+        except ImportError as e:
+            print(f"  Skipping {backend}: {e}")
+    lexical = LexicalIndex()
+    lexical_seconds = 0.0
+
+    ids, vectors, metadata = [], [], []
+    for merged_df in iter_merged_frames(data_dir, chunksize=100_000):
+        rendered = render_documents(merged_df)
+        for start in range(0, len(rendered), batch_size):
+            batch = rendered.iloc[start:start + batch_size]
+            texts = batch["page_content"].tolist()
+            batch_vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+            metadatas = to_metadatas(batch)
+            for backend, store in stores.items():
+                started = time.perf_counter()
+                store.upsert(batch["id"].tolist(), batch_vectors, texts, metadatas)
+                build_seconds[backend] += time.perf_counter() - started
+            started = time.perf_counter()
+            lexical.upsert(batch["id"].tolist(), texts)
+            lexical_seconds += time.perf_counter() - started
+            ids.extend(batch["id"].tolist())
+            vectors.append(batch_vectors)
+            metadata.extend(metadatas)
+
+    for backend, store in stores.items():
+        started = time.perf_counter()
+        store.persist()
+        build_seconds[backend] += time.perf_counter() - started
+    lexical_path = os.path.join(workdir, "lexical_index.pkl")
+    started = time.perf_counter()
+    lexical.persist(lexical_path)
+    lexical_seconds += time.perf_counter() - started
+
+    return {
+        "ids": ids, "vectors": np.vstack(vectors), "metadata": metadata,
+        "paths": {backend: os.path.join(workdir, backend) + "/" for backend in stores},
+        "lexical_path": lexical_path, "build_seconds": build_seconds, "lexical_build_seconds": lexical_seconds,
+    }
+
+
+def make_queries(metadata: list, count: int, seed: int) -> list:
+    """
+    Draws `count` labelled queries, spread evenly over the query types, from random documents.
+    """
+    rng = np.random.default_rng(seed)
+    queries = []
+    types = list(QUERY_TEMPLATES)
+    for i in range(count):
+        query_type = types[i % len(types)]
+        field, templates = QUERY_TEMPLATES[query_type]
+        row = metadata[int(rng.integers(len(metadata)))]
+        template = templates[int(rng.integers(len(templates)))]
+        queries.append({"type": query_type, "field": field, "value": row[field], "text": template.format(**row)})
+    return queries
+
+
+def exact_top_k(vectors: np.ndarray, query_vectors: np.ndarray, k: int, block: int = 16) -> tuple:
+    """
+    Brute-force top k by cosine similarity: (positions, scores), best first.
+    """
+    positions, scores = [], []
+    for start in range(0, len(query_vectors), block):
+        similarity = query_vectors[start:start + block] @ vectors.T
+        top = np.argpartition(-similarity, min(k, similarity.shape[1] - 1), axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        positions.append(np.take_along_axis(top, order, axis=1))
+        scores.append(np.take_along_axis(top_scores, order, axis=1))
+    return np.vstack(positions), np.vstack(scores)
+
+
+# --- measuring (runs in a fresh process) ---
+
+def measure(spec: dict) -> dict:
+    """
+    Opens the indexes, runs every query once, then all of them as one batch.
+    """
+    from src.retriever import SupplyChainRetriever
+
+    queries = [q["text"] for q in spec["queries"]]
+    k = spec["k"]
+    started = time.perf_counter()
+    store = open_store(spec["backend"], spec["path"])
+    lexical = LexicalIndex.load(spec["lexical_path"]) if spec["mode"] == "hybrid" else None
+    retriever = SupplyChainRetriever(backend=spec["backend"], store=store, embeddings=make_embeddings(spec["embedder"]),
+                                     lexical_index=lexical)
+    retriever.search_with_scores(queries[0], k=k, max_distance=None)
+    cold_start = time.perf_counter() - started
+
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = retriever.search_with_scores(query, k=k, max_distance=None)
+        latencies.append(time.perf_counter() - started)
+        results.append([doc.id for doc, _ in hits])
+
+    started = time.perf_counter()
+    retriever.batch_similarity_search(queries, k=k)
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "cold_start_ms": cold_start * 1000,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "batch_qps": len(queries) / batch_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "results": results,
+    }
+
+
+def score(results: list, queries: list, built: dict, truth: tuple, k: int) -> dict:
+    """
+    Recall@k against the exact top k, and hit@k / precision@k against the query labels.
+    """
+    position_of = {doc_id: i for i, doc_id in enumerate(built["ids"])}
+    truth_positions, truth_scores = truth
+    recalls = []
+    labels = {query_type: {"hits": 0, "matches": 0, "returned": 0, "queries": 0} for query_type in QUERY_TEMPLATES}
+    for q, result, expected, expected_scores, query_vector in zip(queries, results, truth_positions, truth_scores,
+                                                                   built["query_vectors"]):
+        positions = [position_of[doc_id] for doc_id in result if doc_id in position_of]
+        # Results scoring at least the k-th exact score are as good as the exact ones (ties)
+        scores = built["vectors"][positions] @ query_vector if positions else np.zeros(0)
+        recalls.append(min(1.0, float((scores >= expected_scores[-1] - 1e-5).sum()) / len(expected)))
+        matches = sum(built["metadata"][p][q["field"]] == q["value"] for p in positions)
+        label = labels[q["type"]]
+        label["queries"] += 1
+        label["hits"] += matches > 0
+        label["matches"] += matches
+        label["returned"] += len(positions)
+    return {
+        "recall": float(np.mean(recalls)),
+        "labels": {
+            query_type: {"hit_rate": l["hits"] / l["queries"] if l["queries"] else None,
+                         "precision": l["matches"] / l["returned"] if l["returned"] else None}
+            for query_type, l in labels.items()
+        },
+    }
+
+
+# --- reporting ---
+
+def print_table(results: list, k: int):
+    print(f"\nk={k}; recall is against exact search, labels are hit@k per query type")
+    label_names = list(QUERY_TEMPLATES)
+    print(f"{'size':>9} {'backend':<10} {'mode':<7}" + "".join(f"{c:>14}" for c in METRICS)
+          + "".join(f"{name:>13}" for name in label_names))
+    for r in results:
+        print(f"{r['size']:>9} {r['backend']:<10} {r['mode']:<7}" + "".join(f"{r[c]:>14.2f}" for c in METRICS)
+              + "".join(f"{r['labels'][name]['hit_rate']:>13.2f}" for name in label_names))
+
+
+def print_comparison(results: list, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["size"], r["backend"], r["mode"]): r for r in baseline["results"]}
+    print(f"\nChange against {baseline_path} (commit {baseline.get('commit')}):")
+    print(f"{'size':>9} {'backend':<10} {'mode':<7}" + "".join(f"{c:>14}" for c in METRICS))
+    for r in results:
+        old = before.get((r["size"], r["backend"], r["mode"]))
+        if old is None:
+            continue
+        changes = []
+        for c in METRICS:
+            if c == "recall":
+                changes.append(f"{r[c] - old[c]:>+14.3f}")
+            else:
+                changes.append(f"{(r[c] / old[c] - 1) * 100 if old[c] else 0.0:>+13.1f}%")
+        print(f"{r['size']:>9} {r['backend']:<10} {r['mode']:<7}" + "".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="Materials per catalogue (with a tenth as many suppliers).")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--embedder", choices=["hash", "model"], default="hash")
+    parser.add_argument("--out", help="JSON results file (default bench_results/retrieval-<commit>.json).")
+    parser.add_argument("--compare", help="Earlier JSON results to print the changes against.")
+    parser.add_argument("--measure", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        with open(args.measure) as f:
+            print(json.dumps(measure(json.load(f))))
+        return
+
+    commit = commit_id()
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_retrieval_")
+    try:
+        for size in args.sizes:
+            # 1. GENERATE, EMBED AND INDEX THE CATALOGUE
+            print(f"\nCatalogue of {size} materials:")
+            data_dir = os.path.join(workdir, f"data_{size}") + "/"
+            generate_corpus(data_dir, max(1, size // 10), size, seed=args.seed, verbose=False)
+            size_dir = os.path.join(workdir, f"index_{size}")
+            built = build_indexes(data_dir, size_dir, args.backends, args.embedder)
+            print(f"  Indexed in " + ", ".join(f"{b} {s:.1f}s" for b, s in built["build_seconds"].items())
+                  + f", lexical {built['lexical_build_seconds']:.1f}s")
+
+            # 2. LABELLED QUERIES AND THEIR EXACT TOP K
+            queries = make_queries(built["metadata"], args.queries, args.seed)
+            built["query_vectors"] = np.asarray(make_embeddings(args.embedder).embed_documents(
+                [q["text"] for q in queries]), dtype=np.float32)
+            built["query_vectors"] /= np.maximum(np.linalg.norm(built["query_vectors"], axis=1, keepdims=True), 1e-12)
+            truth = exact_top_k(built["vectors"], built["query_vectors"], args.k)
+
+            # 3. EVERY BACKEND AND MODE IN A FRESH PROCESS
+            for backend, path in built["paths"].items():
+                for mode in args.modes:
+                    spec_path = os.path.join(size_dir, f"spec_{backend}_{mode}.json")
+                    with open(spec_path, "w") as f:
+                        json.dump({"backend": backend, "mode": mode, "path": path, "lexical_path": built["lexical_path"],
+                                   "queries": queries, "k": args.k, "embedder": args.embedder}, f)
+                    output = subprocess.run(
+                        [sys.executable, "-m", "benchmarks.bench_retrieval", "--measure", spec_path],
+                        check=True, capture_output=True, text=True,
+                    ).stdout
+                    measured = json.loads(output.strip().splitlines()[-1])
+                    row = {"size": size, "backend": backend, "mode": mode,
+                           "build_seconds": built["build_seconds"][backend],
+                           **{c: measured[c] for c in METRICS if c in measured},
+                           **score(measured["results"], queries, built, truth, args.k)}
+                    print(f"  {backend:<10} {mode:<7} p50 {row['p50_ms']:.2f} ms, recall {row['recall']:.3f}, "
+                          f"material_id hit@{args.k} {row['labels']['material_id']['hit_rate']:.2f}")
+                    results.append(row)
+            shutil.rmtree(size_dir, ignore_errors=True)
+            shutil.rmtree(data_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(results, args.k)
+    out = args.out or os.path.join("bench_results", f"retrieval-{commit}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({
+            "commit": commit,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "settings": {"sizes": args.sizes, "backends": args.backends, "modes": args.modes, "queries": args.queries, "k": args.k, "seed": args.seed,
+                         "embedder": args.embedder},
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {out}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Compares the vector store backends on a synthetic corpus: random unit vectors of the
+MiniLM dimension with the same metadata columns as the real documents.
+
+The corpus is written once per backend, then each backend is opened in a fresh process
+so that load time and resident memory are not flattered by the build:
+    load      time to open the store
+    first     latency of the first query (lazy initialisation, page faults)
+    p50/p95   single-query latency over --queries random queries
+    batch     per-query latency when all queries are sent in one call
+    rss       resident set size after the queries
+
+Run from the project root (the Chroma backend is skipped if chromadb is not installed):
+    python -m benchmarks.bench_vector_store --rows 200000 --queries 200
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from src.vectorstore import ChromaVectorStore, FlatVectorStore
+
+BACKENDS = ["chroma", "flat", "flat-int8"]
+COUNTRIES = ["Taiwan", "Japan", "Germany", "USA", "China", "India", "Mexico", "Vietnam"]
+LEVELS = ["Critical", "High", "Medium", "Low"]
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_store(backend: str, path: str):
+    if backend == "chroma":
+        return ChromaVectorStore(path)
+    return FlatVectorStore(path, quantize=backend == "flat-int8")
+
+
+def build(backend: str, path: str, rows: int, dim: int, batch_size: int = 5000):
+    rng = np.random.default_rng(0)
+    store = open_store(backend, path)
+    for start in range(0, rows, batch_size):
+        n = min(batch_size, rows - start)
+        ids = [f"M{i}" for i in range(start, start + n)]
+        metadatas = [
+            {"material_id": doc_id, "country": COUNTRIES[i % len(COUNTRIES)], "criticality_level": LEVELS[i % len(LEVELS)],
+             "supplier_name": f"Supplier {i % 997}", "content_hash": str(i)}
+            for i, doc_id in zip(range(start, start + n), ids)
+        ]
+        documents = [f"Material '{doc_id}' is supplied by 'Supplier {i % 997}'." for i, doc_id in zip(range(start, start + n), ids)]
+        store.upsert(ids, rng.normal(size=(n, dim)).astype(np.float32), documents, metadatas)
+    store.persist()
+
+
+def measure(backend: str, path: str, queries: int, dim: int, k: int) -> dict:
+    """
+    Runs in a fresh process: opens the store and times the queries.
+    """
+    baseline = rss_mb()
+    rng = np.random.default_rng(1)
+    query_vectors = rng.normal(size=(queries, dim)).astype(np.float32)
+
+    start = time.perf_counter()
+    store = open_store(backend, path)
+    load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store.query(query_vectors[:1], k)
+    first = time.perf_counter() - start
+
+    latencies = []
+    for vector in query_vectors:
+        start = time.perf_counter()
+        store.query([vector], k)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    store.query(query_vectors, k)
+    batch = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    store.query(query_vectors[:1], k, where={"$and": [{"country": "Taiwan"}, {"criticality_level": {"$in": ["Critical", "High"]}}]})
+    filtered = time.perf_counter() - start
+
+    return {
+        "backend": backend,
+        "load_ms": load * 1000,
+        "first_ms": first * 1000,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p95_ms": float(np.percentile(latencies, 95)) * 1000,
+        "batch_ms": batch * 1000,
+        "filtered_ms": filtered * 1000,
+        "rss_mb": rss_mb(),
+        "rss_delta_mb": rss_mb() - baseline,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--measure", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure[0], args.measure[1], args.queries, args.dim, args.k)))
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_vector_store_")
+    results = []
+    try:
+        for backend in args.backends:
+            path = os.path.join(workdir, backend) + "/"
+            try:
+                start = time.perf_counter()
+                build(backend, path, args.rows, args.dim)
+            except ImportError as e:
+                print(f"Skipping {backend}: {e}")
+                continue
+            print(f"Built {backend} with {args.rows} rows in {time.perf_counter() - start:.1f}s")
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_vector_store", "--measure", backend, path,
+                 "--queries", str(args.queries), "--dim", str(args.dim), "--k", str(args.k)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    columns = ["load_ms", "first_ms", "p50_ms", "p95_ms", "batch_ms", "filtered_ms", "rss_mb", "rss_delta_mb"]
+    print(f"\n{args.rows} rows x {args.dim} dims, k={args.k}, {args.queries} queries")
+    print(f"{'backend':<10}" + "".join(f"{c:>14}" for c in columns))
+    for r in results:
+        print(f"{r['backend']:<10}" + "".join(f"{r[c]:>14.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
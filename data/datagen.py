@@ -0,0 +1,335 @@
+"""
+Synthetic supplier and material catalogue generator.
+
+Writes suppliers.csv and materials.csv with the same columns and ID format as the sample
+data (S001, ..., S999, S1000, ...), at any size: the ingest and retrieval benchmarks use the
+10k, 1m and 10m presets.
+
+    python -m data.datagen --out bench_data/                 # 1000 suppliers, 1000 materials
+    python -m data.datagen --preset 1m --out bench_data/
+    python -m data.datagen --suppliers 50000 --materials 2000000 --fanout zipf --out bench_data/
+
+Every column is drawn with NumPy for a whole block of rows at once, and the files are
+written chunk by chunk, so memory stays flat however many rows are requested. Each block
+of GENERATION_BLOCK_ROWS rows has its own random stream derived from the seed, so the same
+seed always gives the same files, whatever --chunk-rows is.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+COUNTRIES_CITIES = {
+    "USA": ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Philadelphia", "San Antonio", "San Diego", "Dallas", "San Jose"],
+    "China": ["Shanghai", "Beijing", "Shenzhen", "Guangzhou", "Chengdu", "Hangzhou", "Wuhan", "Xi'an", "Tianjin", "Nanjing"],
+    "India": ["Mumbai", "Delhi", "Bangalore", "Hyderabad", "Ahmedabad", "Chennai", "Kolkata", "Surat", "Pune", "Jaipur"],
+    "Germany": ["Berlin", "Hamburg", "Munich", "Cologne", "Frankfurt", "Stuttgart", "Düsseldorf", "Dortmund", "Essen", "Leipzig"],
+    "Japan": ["Tokyo", "Yokohama", "Osaka", "Nagoya", "Sapporo", "Fukuoka", "Kobe", "Kyoto", "Kawasaki", "Saitama"],
+    "South Korea": ["Seoul", "Busan", "Incheon", "Daegu", "Daejeon", "Gwangju", "Suwon", "Ulsan", "Changwon", "Seongnam"],
+    "Vietnam": ["Ho Chi Minh City", "Hanoi", "Da Nang", "Haiphong", "Can Tho", "Bien Hoa", "Thu Dau Mot", "Nha Trang", "Vung Tau", "Hue"],
+    "Taiwan": ["Taipei", "New Taipei", "Taichung", "Kaohsiung", "Taoyuan", "Tainan", "Hsinchu", "Keelung", "Chiayi", "Changhua"],
+    "Mexico": ["Mexico City", "Ecatepec", "Guadalajara", "Puebla", "Juárez", "Tijuana", "León", "Zapopan", "Monterrey", "Nezahualcóyotl"],
+    "Brazil": ["São Paulo", "Rio de Janeiro", "Brasília", "Salvador", "Fortaleza", "Belo Horizonte", "Manaus", "Curitiba", "Recife", "Porto Alegre"],
+    "UK": ["London", "Birmingham", "Glasgow", "Liverpool", "Bristol", "Manchester", "Sheffield", "Leeds", "Edinburgh", "Leicester"],
+    "France": ["Paris", "Marseille", "Lyon", "Toulouse", "Nice", "Nantes", "Strasbourg", "Montpellier", "Bordeaux", "Lille"],
+    "Italy": ["Rome", "Milan", "Naples", "Turin", "Palermo", "Genoa", "Bologna", "Florence", "Bari", "Catania"],
+    "Canada": ["Toronto", "Montreal", "Vancouver", "Calgary", "Edmonton", "Ottawa", "Winnipeg", "Quebec City", "Hamilton", "Kitchener"],
+    "Australia": ["Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide", "Gold Coast", "Canberra", "Newcastle", "Wollongong", "Hobart"]
+}
+
+INDUSTRIES = [
+    "Semiconductors", "Electronics", "Automotive", "Aerospace", "Pharmaceuticals",
+    "Medical Devices", "Food & Beverage", "Chemicals", "Construction", "Textiles",
+    "Apparel", "Logistics", "Shipping", "Manufacturing", "Steel & Metals",
+    "Plastics", "Rubber", "Wood & Paper", "Mining", "Oil & Gas",
+    "Renewable Energy", "Telecom", "Software", "Hardware", "Furniture",
+    "Jewelry", "Toys", "Sports Equipment", "Agriculture", "Fishing"
+]
+
+COMPANY_TYPES = [
+    "Corp", "Inc", "Ltd", "Co", "Group", "Enterprises", "Industries",
+    "Solutions", "Systems", "Technologies", "International", "Global",
+    "Manufacturing", "Trading", "Supply", "Distributors", "Ventures"
+]
+
+NAME_WORDS = [
+    "Alpha", "Beta", "Gamma", "Delta", "Epsilon", "Zeta", "Eta", "Theta",
+    "Omega", "Sigma", "Quantum", "Precision", "Advanced", "Premium", "Elite",
+    "Superior", "Excel", "Prime", "First", "National", "United", "Federal",
+    "Central", "Pacific", "Atlantic", "Continental", "Worldwide", "Universal",
+    "Innovative", "Creative", "Dynamic", "Strategic", "Reliable", "Trusted",
+    "Quality", "Standard", "Professional", "Technical", "Digital", "Smart",
+    "Eco", "Green", "Sustainable", "Modern", "New", "Next", "Future", "Vision",
+    "Star", "Sun", "Moon", "Earth", "Ocean", "Mountain", "River", "Valley",
+    "Eagle", "Lion", "Tiger", "Dragon", "Phoenix", "Pegasus", "Orion", "Apollo"
+]
+
+MATERIAL_CATEGORIES = {
+    "Electronics": [
+        "Microchip", "Processor", "Circuit Board", "Capacitor", "Resistor",
+        "Transistor", "LED", "Sensor", "Memory Chip", "Integrated Circuit",
+        "Semiconductor Wafer", "PCB", "Connector", "Oscillator", "Diode"
+    ],
+    "Chemicals": [
+        "Active Pharmaceutical Ingredient", "Chemical Compound", "Polymer",
+        "Solvent", "Catalyst", "Reagent", "Additive", "Resin", "Adhesive",
+        "Lubricant", "Coating", "Pigment", "Dye", "Surfactant", "Acid"
+    ],
+    "Metals": [
+        "Steel Alloy", "Aluminum Sheet", "Copper Wire", "Titanium Rod",
+        "Brass Fitting", "Stainless Steel", "Bronze Casting", "Zinc Plate",
+        "Magnesium Ingot", "Tungsten Carbide", "Nickel Coil", "Lead Plate"
+    ],
+    "Plastics": [
+        "Polyethylene Pellet", "PVC Compound", "ABS Plastic", "Polycarbonate Sheet",
+        "Nylon Fiber", "Polypropylene Resin", "Acrylic Panel", "PET Preform",
+        "Polyurethane Foam", "Silicone Rubber", "TPE Compound", "EPS Bead"
+    ],
+    "Textiles": [
+        "Cotton Fabric", "Polyester Yarn", "Nylon Mesh", "Wool Blend",
+        "Silk Thread", "Linen Cloth", "Denim Fabric", "Felt Material",
+        "Technical Textile", "Non-woven Fabric", "Kevlar Fiber", "Spandex"
+    ],
+    "Raw Materials": [
+        "Crude Oil", "Natural Gas", "Iron Ore", "Bauxite", "Copper Concentrate",
+        "Wood Pulp", "Silica Sand", "Limestone", "Gypsum", "Phosphate Rock",
+        "Potash", "Sulfur", "Clay", "Graphite", "Lithium Carbonate"
+    ],
+    "Components": [
+        "Precision Bearing", "Gear Assembly", "Hydraulic Cylinder", "Pump Housing",
+        "Valve Body", "Motor Stator", "Compressor Rotor", "Heat Exchanger",
+        "Filter Element", "Seal Kit", "Fastener Set", "Spring Assembly"
+    ],
+    "Packaging": [
+        "Corrugated Box", "Plastic Container", "Glass Bottle", "Aluminum Can",
+        "Label Stock", "Shrink Wrap", "Protective Foam", "Pallet",
+        "Drum Container", "Flexible Pouch", "Clamshell Package", "Crate"
+    ]
+}
+
+# Material codes such as "ZETA-436-MAX"
+PREFIXES = ["AX", "BX", "CX", "DX", "EX", "FX", "GX", "HX", "IX", "JX",
+            "ALPHA", "BETA", "GAMMA", "DELTA", "OMEGA", "SIGMA", "ZETA",
+            "TECH", "PRO", "ULTRA", "MEGA", "HYPER", "SUPER", "MAX",
+            "ECO", "BIO", "NANO", "MICRO", "MACRO", "QUANTUM"]
+SUFFIXES = ["", "-A", "-B", "-C", "-PRO", "-PLUS", "-MAX", "-ULTRA", "-ECO", "-BIO"]
+DESCRIPTIVE_TERMS = [
+    "High-Purity", "Precision", "Industrial-Grade", "Medical-Grade",
+    "Food-Grade", "Military-Spec", "High-Temp", "Corrosion-Resistant",
+    "UV-Stable", "Flame-Retardant", "Conductive", "Magnetic",
+    "Optical", "Structural", "Thermal", "Electrical", "Mechanical"
+]
+# Share of material names with a technical code instead of a descriptive term
+CODED_NAME_SHARE = 0.6
+
+# Criticality levels with weights (High is less common but more critical)
+CRITICALITY_LEVELS = ["Low", "Medium", "High", "Critical"]
+CRITICALITY_WEIGHTS = [0.3, 0.4, 0.2, 0.1]
+
+# Benchmark corpora: (suppliers, materials)
+PRESETS = {
+    "10k": (1_000, 10_000),
+    "1m": (100_000, 1_000_000),
+    "10m": (1_000_000, 10_000_000),
+}
+
+# Rows drawn from one random stream; chunks are whole numbers of blocks
+GENERATION_BLOCK_ROWS = 65_536
+
+_SUPPLIERS_STREAM, _MATERIALS_STREAM, _FANOUT_STREAM = 0, 1, 2
+
+
+# Zero padding of the numeric part, as in the sample data; larger numbers simply get longer
+ID_DIGITS = 3
+
+
+def format_ids(prefix: str, numbers: np.ndarray) -> np.ndarray:
+    """
+    1-based ID numbers as e.g. 'S001', 'S1000'.
+    """
+    return np.char.add(prefix, np.char.zfill(np.asarray(numbers).astype(str), ID_DIGITS))
+
+
+def _block_rng(seed: int, stream: int, block: int) -> np.random.Generator:
+    return np.random.default_rng([seed, stream, block])
+
+
+def _choose_grouped(rng: np.random.Generator, groups: dict, group_idx: np.ndarray) -> np.ndarray:
+    """
+    For each row's group (country, material category) picks one of the group's items uniformly.
+    """
+    items = np.array([item for members in groups.values() for item in members])
+    counts = np.array([len(members) for members in groups.values()])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    pick = (rng.random(len(group_idx)) * counts[group_idx]).astype(np.int64)
+    return items[offsets[group_idx] + pick]
+
+
+def generate_suppliers(start: int, stop: int, seed: int) -> pd.DataFrame:
+    """
+    Supplier rows start..stop-1 (0-based). stop - start must not exceed one block.
+    """
+    rng = _block_rng(seed, _SUPPLIERS_STREAM, start // GENERATION_BLOCK_ROWS)
+    n = stop - start
+    words = np.array(NAME_WORDS)
+    first = rng.integers(0, len(words), n)
+    # A different second word: shift by 1..len-1 positions
+    second = (first + rng.integers(1, len(words), n)) % len(words)
+    company_type = np.array(COMPANY_TYPES)[rng.integers(0, len(COMPANY_TYPES), n)]
+    countries = np.array(list(COUNTRIES_CITIES))
+    country_idx = rng.integers(0, len(countries), n)
+    names = np.char.add(np.char.add(np.char.add(words[first], " "), np.char.add(words[second], " ")),
+                           company_type)
+    return pd.DataFrame({
+        "supplier_id": format_ids("S", np.arange(start + 1, stop + 1)),
+        "supplier_name": names,
+        "country": countries[country_idx],
+        "city": _choose_grouped(rng, COUNTRIES_CITIES, country_idx),
+        "industry_type": np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), n)],
+    })
+
+
+def fanout_weights(num_suppliers: int, fanout: str, skew: float, seed: int) -> np.ndarray:
+    """
+    Probability of each supplier being picked for a material. "uniform" spreads materials
+    evenly; "zipf" gives supplier ranks a 1/rank**skew share, so a few suppliers provide
+    many materials and most provide a handful. Ranks are shuffled so the big suppliers are
+    not simply the first IDs.
+    """
+    if fanout == "uniform":
+        return np.full(num_suppliers, 1.0 / num_suppliers)
+    if fanout != "zipf":
+        raise ValueError(f"Unknown fan-out distribution: {fanout}")
+    weights = 1.0 / np.arange(1, num_suppliers + 1, dtype=np.float64) ** skew
+    _block_rng(seed, _FANOUT_STREAM, 0).shuffle(weights)
+    return weights / weights.sum()
+
+
+def generate_materials(start: int, stop: int, num_suppliers: int, supplier_cdf: np.ndarray, seed: int) -> pd.DataFrame:
+    """
+    Material rows start..stop-1 (0-based) and the number of them each supplier got.
+    supplier_cdf is the cumulative fan-out weights.
+    """
+    rng = _block_rng(seed, _MATERIALS_STREAM, start // GENERATION_BLOCK_ROWS)
+    n = stop - start
+    categories = list(MATERIAL_CATEGORIES)
+    material_type = _choose_grouped(rng, MATERIAL_CATEGORIES, rng.integers(0, len(categories), n))
+
+    code = np.char.add(np.char.add(np.array(PREFIXES)[rng.integers(0, len(PREFIXES), n)], "-"),
+                          np.char.add(rng.integers(1, 1000, n).astype(str),
+                                         np.array(SUFFIXES)[rng.integers(0, len(SUFFIXES), n)]))
+    term = np.array(DESCRIPTIVE_TERMS)[rng.integers(0, len(DESCRIPTIVE_TERMS), n)]
+    qualifier = np.where(rng.random(n) < CODED_NAME_SHARE, code, term)
+
+    supplier_idx = np.searchsorted(supplier_cdf, rng.random(n) * supplier_cdf[-1], side="right")
+    supplier_idx = np.minimum(supplier_idx, num_suppliers - 1)
+    levels = np.array(CRITICALITY_LEVELS)[
+        np.searchsorted(np.cumsum(CRITICALITY_WEIGHTS), rng.random(n) * sum(CRITICALITY_WEIGHTS), side="right")]
+    return pd.DataFrame({
+        "material_id": format_ids("M", np.arange(start + 1, stop + 1)),
+        "material_name": np.char.add(np.char.add(qualifier, " "), material_type),
+        "supplied_by_id": format_ids("S", supplier_idx + 1),
+        "criticality_level": levels,
+    }), np.bincount(supplier_idx, minlength=num_suppliers)
+
+
+class ChunkWriter:
+    """
+    Appends DataFrame chunks to one CSV file, writing the header with the first chunk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows = 0
+        if os.path.exists(path):
+            os.remove(path)
+
+    def write(self, df: pd.DataFrame):
+        df.to_csv(self.path, mode="a", header=self.rows == 0, index=False)
+        self.rows += len(df)
+
+
+def _iter_chunks(total: int, chunk_rows: int):
+    # Whole blocks per chunk, so each block is generated from its own stream in one piece
+    blocks_per_chunk = max(1, chunk_rows // GENERATION_BLOCK_ROWS)
+    step = blocks_per_chunk * GENERATION_BLOCK_ROWS
+    for chunk_start in range(0, total, step):
+        chunk_stop = min(chunk_start + step, total)
+        yield [(s, min(s + GENERATION_BLOCK_ROWS, chunk_stop))
+               for s in range(chunk_start, chunk_stop, GENERATION_BLOCK_ROWS)]
+
+
+def generate_corpus(out_dir: str, num_suppliers: int, num_materials: int, seed: int = 42,
+                    fanout: str = "uniform", skew: float = 1.1, chunk_rows: int = 1_048_576,
+                    verbose: bool = True) -> dict:
+    """
+    Writes suppliers.csv and materials.csv to out_dir and returns generation stats.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    started = time.perf_counter()
+
+    # 1. SUPPLIERS
+    writer = ChunkWriter(os.path.join(out_dir, "suppliers.csv"))
+    for blocks in _iter_chunks(num_suppliers, chunk_rows):
+        writer.write(pd.concat([generate_suppliers(s, e, seed) for s, e in blocks], ignore_index=True))
+        if verbose:
+            print(f"  suppliers: {writer.rows:,}/{num_suppliers:,}")
+
+    # 2. MATERIALS
+    supplier_cdf = np.cumsum(fanout_weights(num_suppliers, fanout, skew, seed))
+    materials_per_supplier = np.zeros(num_suppliers, dtype=np.int64)
+    writer = ChunkWriter(os.path.join(out_dir, "materials.csv"))
+    for blocks in _iter_chunks(num_materials, chunk_rows):
+        frames = []
+        for s, e in blocks:
+            df, counts = generate_materials(s, e, num_suppliers, supplier_cdf, seed)
+            frames.append(df)
+            materials_per_supplier += counts
+        writer.write(pd.concat(frames, ignore_index=True))
+        if verbose:
+            print(f"  materials: {writer.rows:,}/{num_materials:,}")
+
+    seconds = time.perf_counter() - started
+    return {
+        "suppliers": num_suppliers,
+        "materials": num_materials,
+        "seconds": round(seconds, 2),
+        "rows_per_second": round((num_suppliers + num_materials) / seconds),
+        "fanout_mean": round(float(materials_per_supplier.mean()), 2),
+        "fanout_p99": int(np.percentile(materials_per_supplier, 99)),
+        "fanout_max": int(materials_per_supplier.max()),
+        "suppliers_without_materials": int((materials_per_supplier == 0).sum()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic supplier/material catalogue.")
+    parser.add_argument("--preset", choices=sorted(PRESETS),
+                        help="Benchmark corpus size (sets --suppliers and --materials).")
+    parser.add_argument("--suppliers", type=int, default=1000, help="Number of suppliers.")
+    parser.add_argument("--materials", type=int, default=1000, help="Number of materials.")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same files.")
+    parser.add_argument("--fanout", choices=["uniform", "zipf"], default="uniform",
+                        help="How materials are spread over suppliers.")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for --fanout zipf.")
+    parser.add_argument("--chunk-rows", type=int, default=1_048_576, help="Rows generated and written at a time.")
+    parser.add_argument("--out", required=True, help="Output directory.")
+    parser.add_argument("--force", action="store_true",
+                        help="Replace suppliers.csv and materials.csv if the output directory has them.")
+    args = parser.parse_args()
+
+    existing = [name for name in ["suppliers.csv", "materials.csv"] if os.path.exists(os.path.join(args.out, name))]
+    if existing and not args.force:
+        parser.error(f"{args.out} already has {' and '.join(existing)}; pass --force to replace them")
+
+    if args.preset:
+        args.suppliers, args.materials = PRESETS[args.preset]
+    print(f"--- Generating {args.suppliers:,} suppliers and {args.materials:,} materials "
+          f"(seed {args.seed}, {args.fanout} fan-out) into {args.out} ---")
+    stats = generate_corpus(args.out, args.suppliers, args.materials, seed=args.seed, fanout=args.fanout,
+                            skew=args.skew, chunk_rows=args.chunk_rows)
+    print(f"Done in {stats['seconds']}s ({stats['rows_per_second']:,} rows/s)")
+    print(f"Materials per supplier: mean {stats['fanout_mean']}, p99 {stats['fanout_p99']}, "
+          f"max {stats['fanout_max']}; {stats['suppliers_without_materials']:,} suppliers have none")
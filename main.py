@@ -1,58 +1,140 @@
-import os
+import argparse
+import atexit
+import sys
 from dotenv import load_dotenv
-from langchain import hub
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain_openai import ChatOpenAI
 
-from agent import news_scanner_tool, supply_chain_retriever_tool
-from src.config import LLM_MODEL_NAME
+from src.agent_factory import build_agent_executor, build_llm
+from src.config import (
+    FAST_PATH_NEWS_QUERIES, SERVER_HOST, SERVER_PORT, SERVER_MAX_CONCURRENCY, SERVER_MAX_QUEUE,
+    MONITOR_INTERVAL_SECONDS,
+)
 # Load environment variables
 load_dotenv()
 
+# LangChain, the OpenAI client and the embedding model are imported on first use (see
+# src/agent_factory.py), so that --help, --fast and --profile-imports start without them.
 
-
-
-llm = ChatOpenAI(
-    model=LLM_MODEL_NAME,
-    temperature=0,
-    openai_api_base=os.getenv("OPENROUTER_API_BASE"),
-    openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-)
-
-print(f"LLM Initialized with model: {LLM_MODEL_NAME}")
-
-tools = [news_scanner_tool, supply_chain_retriever_tool]
-
-# --- 3. Get the Agent's Prompt Template ---
-prompt = hub.pull("hwchase17/react")
-
-# --- 4. Create the Agent ---
-agent = create_react_agent(llm, tools, prompt)
-
-# --- 5. Create the Agent Executor ---
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True,handle_parsing_errors=True)
+def run_fast_path(headlines_file: str = None, llm_fallback: bool = False):
+    """
+    Deterministic pipeline: fetch headlines, match them against our suppliers, cities and
+    countries, and print the prioritised list without calling the LLM. With llm_fallback,
+    headlines that matched nothing are handed to the agent afterwards.
+    """
+    from src.data_ingestion import fetch_disruption_news_many
+    from src.prompts import HEADLINES_TASK
+    from src.risk_pipeline import RiskPipeline
+
+    if headlines_file:
+        with open(headlines_file, encoding="utf-8") as f:
+            articles = [{"title": line.strip(), "url": ""} for line in f if line.strip()]
+    else:
+        results = fetch_disruption_news_many(FAST_PATH_NEWS_QUERIES)
+        # Keep each article once, even if several queries returned it
+        articles = list({a["url"]: a for query_articles in results.values() for a in query_articles}.values())
+
+    pipeline = RiskPipeline()
+    risks, unmatched = pipeline.run(articles)
+    print(f"\n--- Fast path: {len(articles)} headlines, {len(risks)} risks, {len(unmatched)} unmatched ---")
+    print(pipeline.format_report(risks) if risks else "No headline mentions any of our suppliers, cities or countries.")
+
+    if llm_fallback and unmatched:
+        print("\n--- Handing unmatched headlines to the agent ---")
+        headlines = "\n".join(f"- {a['title']}" for a in unmatched)
+        build_agent_executor().invoke({"input": HEADLINES_TASK.format(headlines=headlines)})
 
 # --- 6. Define the Master Task and Run the Agent ---
 if __name__ == '__main__':
-    master_task = """
-    Your mission is to act as a world-class Supply Chain Risk Analyst.
-    Your goal is to be a resilient and resourceful researcher.
-
-    First, use the news_scanner_tool to find potential disruption events.
-    **CRITICAL INSTRUCTION: If your initial search query returns no results, DO NOT give up. You MUST try again with a different, broader, or simpler query. Break the problem down. For example, if 'factory fire OR port congestion' fails, try searching for just 'factory fire', and then separately for 'port congestion'. Continue this process until you find relevant information.**
-
-    For each relevant news headline you find, you must use the supply_chain_retriever_tool to check if the mentioned location or company affects our supply chain. The tool will return a 'Criticality Level' for any match it finds.
-
-    Finally, provide a consolidated final answer. Your answer MUST be a prioritized list, ordered from most critical to least critical. For each identified risk, you MUST begin the line with a priority score tag:
-    - [P0 - CRITICAL] for 'High' criticality events.
-    - [P1 - WARNING] for 'Medium' criticality events.
-    - [P2 - INFO] for 'Low' criticality events.
-
-    If after several different search attempts you still find no risks, then and only then should you state that clearly. Begin your analysis.
-    """
+    parser = argparse.ArgumentParser(description="Run the supply chain risk agent.")
+    parser.add_argument("--parallel", action="store_true",
+                        help="Let the agent request several tool calls per step and run them concurrently.")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Maximum tool calls run at the same time in --parallel mode.")
+    parser.add_argument("--fast", action="store_true",
+                        help="Score headlines with the deterministic matcher instead of the LLM agent.")
+    parser.add_argument("--headlines-file",
+                        help="With --fast: read headlines from this file (one per line) instead of GNews.")
+    parser.add_argument("--llm-fallback", action="store_true",
+                        help="With --fast or --monitor: let the agent look at headlines the matcher could not place.")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Always call the LLM instead of re-using cached completions (see src/llm_cache.py).")
+    parser.add_argument("--trace", action="store_true",
+                        help="Record timed spans (agent steps, LLM and tool calls, news requests, embedding, "
+                             "vector search) and print a summary at exit; spans are written to traces/.")
+    parser.add_argument("--profile-imports", action="store_true",
+                        help="Re-run this command under 'python -X importtime' and print where start-up time goes.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a long-lived HTTP service with the models kept loaded (see src/server.py).")
+    parser.add_argument("--host", default=SERVER_HOST, help="With --serve: address to listen on.")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="With --serve: port to listen on.")
+    parser.add_argument("--max-concurrency", type=int, default=SERVER_MAX_CONCURRENCY,
+                        help="With --serve: requests handled at the same time.")
+    parser.add_argument("--max-queue", type=int, default=SERVER_MAX_QUEUE,
+                        help="With --serve: requests allowed to wait before the server answers 429.")
+    parser.add_argument("--monitor", action="store_true",
+                        help="Poll the news on a schedule and only analyse headlines not seen before (see src/monitor.py).")
+    parser.add_argument("--interval", type=float, default=MONITOR_INTERVAL_SECONDS,
+                        help="With --monitor: seconds between polls.")
+    parser.add_argument("--iterations", type=int,
+                        help="With --monitor: stop after this many polls (default: run until interrupted).")
+    parser.add_argument("--stub-llm", action="store_true",
+                        help="Use a scripted offline LLM instead of OpenRouter (agent run, --serve or --monitor).")
+    parser.add_argument("--stub-news",
+                        help="Read news from this file (one headline per line) instead of GNews.")
+    parser.add_argument("--no-model", action="store_true",
+                        help="With --serve: do not load the embedding model at start-up.")
+    args = parser.parse_args()
+
+    if args.profile_imports:
+        from src.startup import profile_imports
+        raise SystemExit(profile_imports(sys.argv))
+
+    if args.trace:
+        from src.tracing import enable_tracing, finish_tracing
+        enable_tracing("main")
+        atexit.register(finish_tracing)
+
+    if args.serve:
+        from src.server import run_server
+        run_server(args.host, args.port, args.max_concurrency, args.max_queue,
+                   stub_llm=args.stub_llm, stub_news=args.stub_news, load_model=not args.no_model)
+        raise SystemExit(0)
+
+    if args.stub_news:
+        from src.news_client import StaticNewsSource, set_news_client
+        set_news_client(StaticNewsSource.from_file(args.stub_news))
+
+    if args.monitor:
+        from src.monitor import run_monitor
+        run_monitor(interval=args.interval, iterations=args.iterations,
+                    llm_fallback=args.llm_fallback, stub_llm=args.stub_llm)
+        raise SystemExit(0)
+
+    if args.fast:
+        run_fast_path(args.headlines_file, args.llm_fallback)
+        raise SystemExit(0)
+
+    from src.agent_budget import StepLog
+    from src.prompts import MASTER_TASK
+    master_task = MASTER_TASK
+
+    llm = build_llm(stub=args.stub_llm, cache=not args.no_llm_cache)
+    agent_executor = build_agent_executor(llm, parallel=args.parallel, workers=args.workers)
+    if args.parallel:
+        from src.parallel_agent import PARALLEL_ACTIONS_INSTRUCTIONS
+        master_task += PARALLEL_ACTIONS_INSTRUCTIONS
 
-    
     print("\n--- Running Supply Chain Agent ---")
-    agent_executor.invoke({
-        "input": master_task
-    })
\ No newline at end of file
+    from src.tracing import span
+    step_log = StepLog()
+    with span("agent.run"):
+        result = agent_executor.invoke({
+            "input": master_task
+        }, config={"callbacks": [step_log]})
+    if args.parallel:
+        print(f"\nFinal Answer:\n{result['output']}")
+    print(f"\n--- Run summary ---\n{step_log.summary()}")
+    from src.answer_cache import answer_cache_stats
+    cache_stats = answer_cache_stats()
+    if cache_stats.get("lookups"):
+        print(f"Retriever answer cache: {cache_stats['exact_hits']} exact and {cache_stats['similar_hits']} "
+              f"similar hits in {cache_stats['lookups']} lookups")
\ No newline at end of file
@@ -0,0 +1,156 @@
+"""
+Keeps the ReAct prompt within a token budget and records where an agent run's time and
+tokens go.
+
+The stock agent re-sends every past tool observation on every step, so a long run pays for
+the first news search again and again. format_scratchpad() cuts old observations down once
+the scratchpad is over budget (the latest steps stay intact, so the agent still sees what it
+just asked for). StepLog collects one record per LLM call and per tool call; pass it in the
+invoke() config, e.g. executor.invoke(inputs, config={"callbacks": [log]}).
+"""
+import threading
+import time
+import uuid
+
+from langchain_core.callbacks import BaseCallbackHandler
+from src.config import AGENT_SCRATCHPAD_TOKEN_BUDGET, AGENT_SCRATCHPAD_KEEP_RECENT, AGENT_COMPACT_OBSERVATION_CHARS
+from src.tracing import span
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (about 4 characters per token for English with BPE tokenizers).
+    Good enough for budgeting; the provider's own counts are used in the log when available.
+    """
+    return (len(text) + 3) // 4
+
+
+def compact_observation(observation: str, max_chars: int = AGENT_COMPACT_OBSERVATION_CHARS) -> str:
+    if len(observation) <= max_chars:
+        return observation
+    return f"{observation[:max_chars].rstrip()} ... [{len(observation) - max_chars} more characters omitted]"
+
+
+def format_scratchpad(intermediate_steps: list, token_budget: int = AGENT_SCRATCHPAD_TOKEN_BUDGET,
+                      keep_recent: int = AGENT_SCRATCHPAD_KEEP_RECENT) -> str:
+    """
+    Same layout as LangChain's format_log_to_str, but once the steps add up to more than
+    token_budget the oldest observations are shortened, oldest first, until it fits (or
+    only the last keep_recent steps are left in full).
+    """
+    observations = [str(observation) for _, observation in intermediate_steps]
+    total = sum(estimate_tokens(action.log) + estimate_tokens(o) for (action, _), o in zip(intermediate_steps, observations))
+    for i in range(len(observations) - keep_recent):
+        if total <= token_budget:
+            break
+        short = compact_observation(observations[i])
+        total -= estimate_tokens(observations[i]) - estimate_tokens(short)
+        observations[i] = short
+
+    thoughts = ""
+    for (action, _), observation in zip(intermediate_steps, observations):
+        thoughts += action.log
+        thoughts += f"\nObservation: {observation}\nThought: "
+    return thoughts
+
+
+class StepLog(BaseCallbackHandler):
+    """
+    Per-step record of an agent run: for every LLM call the prompt and completion tokens,
+    the latency and whether it came from the cache; for every tool call its latency and
+    the size of its observation. Prints a line per step when verbose.
+    """
+
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+        self.steps = []
+        self._tools = {}
+        self._lock = threading.Lock()
+
+    def _add(self, record: dict):
+        with self._lock:
+            record["step"] = len(self.steps) + 1
+            self.steps.append(record)
+        if self.verbose:
+            if record["kind"] == "llm":
+                cached = " (cached)" if record["cached"] else ""
+                print(f"  [step {record['step']}] LLM: {record['prompt_tokens']} prompt + "
+                      f"{record['completion_tokens']} completion tokens, {record['seconds']:.2f}s{cached}")
+            else:
+                print(f"  [step {record['step']}] {record['name']}: {record['seconds']:.2f}s, "
+                      f"{record['observation_tokens']} tokens returned")
+
+    def record_llm(self, prompt: str, completion: str, seconds: float, cached: bool, usage: dict = None):
+        usage = usage or {}
+        self._add({
+            "kind": "llm", "name": "llm", "seconds": seconds, "cached": cached,
+            "prompt_tokens": usage.get("input_tokens") or estimate_tokens(prompt),
+            "completion_tokens": usage.get("output_tokens") or estimate_tokens(completion),
+        })
+
+    # --- tool callbacks ---
+
+    def on_tool_start(self, serialized: dict, input_str: str, *, run_id: uuid.UUID, **kwargs):
+        self._tools[run_id] = ((serialized or {}).get("name", "tool"), time.perf_counter())
+
+    def on_tool_end(self, output, *, run_id: uuid.UUID, **kwargs):
+        name, start = self._tools.pop(run_id, ("tool", time.perf_counter()))
+        self._add({"kind": "tool", "name": name, "seconds": time.perf_counter() - start,
+                   "observation_tokens": estimate_tokens(str(getattr(output, "content", output)))})
+
+    def on_tool_error(self, error: BaseException, *, run_id: uuid.UUID, **kwargs):
+        self.on_tool_end(f"{error}", run_id=run_id)
+
+    def summary(self) -> str:
+        llm = [s for s in self.steps if s["kind"] == "llm"]
+        tools = [s for s in self.steps if s["kind"] == "tool"]
+        prompt_tokens = sum(s["prompt_tokens"] for s in llm)
+        completion_tokens = sum(s["completion_tokens"] for s in llm)
+        lines = [
+            f"LLM calls: {len(llm)} ({sum(s['cached'] for s in llm)} cached), {prompt_tokens} prompt + "
+            f"{completion_tokens} completion tokens, {sum(s['seconds'] for s in llm):.2f}s",
+            f"Tool calls: {len(tools)}, {sum(s['seconds'] for s in tools):.2f}s",
+        ]
+        by_tool = {}
+        for s in tools:
+            count, seconds = by_tool.get(s["name"], (0, 0.0))
+            by_tool[s["name"]] = (count + 1, seconds + s["seconds"])
+        for name, (count, seconds) in sorted(by_tool.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"  {name}: {count} calls, {seconds:.2f}s")
+        return "\n".join(lines)
+
+
+def _step_logs(config: dict) -> list:
+    callbacks = (config or {}).get("callbacks")
+    handlers = getattr(callbacks, "handlers", callbacks) or []
+    return [h for h in handlers if isinstance(h, StepLog)]
+
+
+def logged_llm(llm, cache=None):
+    """
+    Wraps the (stop-bound) LLM of the agent so every call is timed and reported to the
+    StepLogs in the run's callbacks. Cache hits skip LangChain's LLM callbacks, so this is
+    done around the call rather than in a callback handler.
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    def call(prompt_value, config):
+        logs = _step_logs(config)
+        if not logs:
+            with span("agent.llm"):
+                return llm.invoke(prompt_value, config=config)
+        hits = cache.hits if cache is not None else 0
+        start = time.perf_counter()
+        with span("agent.llm") as s:
+            output = llm.invoke(prompt_value, config=config)
+            # Concurrent runs sharing the cache can make this over-report hits; it is only a log
+            cached = cache is not None and cache.hits > hits
+            s.set(cached=cached)
+        seconds = time.perf_counter() - start
+        completion = getattr(output, "content", output)
+        for log in logs:
+            log.record_llm(prompt_value.to_string(), str(completion), seconds, cached,
+                           getattr(output, "usage_metadata", None))
+        return output
+
+    return RunnableLambda(call, name="logged_llm")
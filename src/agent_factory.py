@@ -0,0 +1,91 @@
+"""
+Builds the LLM and the ReAct agent executor for main.py and the service mode.
+
+LangChain's agent module and the OpenAI client take a while to import, so they are only
+imported when an agent is actually built. build_llm(stub=True) returns StubReActLLM
+(src/stub_llm.py) instead of the chat model, for full agent runs without network access.
+
+The agent is assembled here rather than with create_react_agent so that the scratchpad goes
+through format_scratchpad (token budget) and every LLM call through logged_llm (step log),
+see src/agent_budget.py. Completions are cached on disk by src/llm_cache.py.
+"""
+import os
+
+from src.config import LLM_MODEL_NAME, LLM_TEMPERATURE, LLM_CACHE_ENABLED
+
+
+def build_llm(stub: bool = False, cache: bool = LLM_CACHE_ENABLED):
+    """
+    With cache=True (and temperature 0) repeated prompts are answered from the local
+    completion cache instead of the API.
+    """
+    llm_cache = None
+    if cache and LLM_TEMPERATURE == 0:
+        from src.llm_cache import get_llm_cache
+        llm_cache = get_llm_cache()
+    if stub:
+        from src.stub_llm import StubReActLLM
+        return StubReActLLM(cache=llm_cache)
+    from langchain_openai import ChatOpenAI
+    llm = ChatOpenAI(
+        model=LLM_MODEL_NAME,
+        temperature=LLM_TEMPERATURE,
+        openai_api_base=os.getenv("OPENROUTER_API_BASE"),
+        openai_api_key=os.getenv("OPENROUTER_API_KEY"),
+        cache=llm_cache,
+    )
+    print(f"LLM Initialized with model: {LLM_MODEL_NAME}" + (" (cached)" if llm_cache else ""))
+    return llm
+
+
+def build_react_agent(llm, tools: list, prompt, output_parser=None):
+    """
+    create_react_agent with a token-budgeted scratchpad and per-call step logging.
+    """
+    from langchain.agents.output_parsers import ReActSingleInputOutputParser
+    from langchain_core.runnables import RunnableLambda, RunnablePassthrough
+    from langchain_core.tools import render_text_description
+    from src.agent_budget import format_scratchpad, logged_llm
+    from src.tracing import span
+
+    prompt = prompt.partial(tools=render_text_description(tools), tool_names=", ".join(t.name for t in tools))
+    llm_with_stop = logged_llm(llm.bind(stop=["\nObservation"]), cache=llm.cache or None)
+    chain = (
+        RunnablePassthrough.assign(agent_scratchpad=lambda x: format_scratchpad(x["intermediate_steps"]))
+        | prompt
+        | llm_with_stop
+        | (output_parser or ReActSingleInputOutputParser())
+    )
+
+    def plan(inputs: dict, config):
+        # One span per ReAct step: building the prompt, the LLM call and parsing its answer
+        with span("agent.step", step=len(inputs["intermediate_steps"]) + 1):
+            return chain.invoke(inputs, config=config)
+
+    return RunnableLambda(plan, name="react_agent")
+
+
+def build_agent_executor(llm=None, parallel: bool = False, workers: int = 8, verbose: bool = True):
+    """
+    Creates the tools and the ReAct agent around `llm` (the configured chat model by default).
+    With parallel=True the agent may request several tool calls per step and they are run
+    concurrently.
+    """
+    from langchain.agents import AgentExecutor
+    from agent import news_scanner_tool, supply_chain_retriever_tool, supply_chain_batch_retriever_tool, supplier_exposure_tool
+    from src.prompts import get_react_prompt
+
+    llm = llm or build_llm()
+    tools = [news_scanner_tool, supply_chain_retriever_tool, supply_chain_batch_retriever_tool, supplier_exposure_tool]
+
+    # Vendored copy of hwchase17/react, so no hub round-trip on start-up
+    prompt = get_react_prompt()
+
+    if parallel:
+        from src.parallel_agent import MultiActionReActOutputParser, ParallelAgentExecutor
+        # Independent tool calls from one planning step are dispatched together
+        parallel_agent = build_react_agent(llm, tools, prompt, output_parser=MultiActionReActOutputParser())
+        return ParallelAgentExecutor(agent=parallel_agent, tools=tools, max_workers=workers,
+                                     verbose=verbose, handle_parsing_errors=True)
+    agent = build_react_agent(llm, tools, prompt)
+    return AgentExecutor(agent=agent, tools=tools, verbose=verbose, handle_parsing_errors=True)
@@ -0,0 +1,230 @@
+"""
+Cache of supply_chain_retriever_tool answers, keyed on the query and its embedding.
+
+The ReAct loop often asks the same question in other words ("suppliers in Taiwan",
+"Taiwan suppliers", "What suppliers do we have in Taiwan?"). A query is looked up first by
+its normalized text, then by cosine similarity of its embedding to the cached queries': the
+closest one above ANSWER_CACHE_SIMILARITY is a hit. Embeddings are poor at telling
+"Taiwan" from "Japan" or "M001" from "M002", so a similar query only counts when it has the
+same scope: the same recognised countries, cities, suppliers and criticality levels, and
+the same words containing digits (IDs and part codes).
+
+Entries expire after ANSWER_CACHE_TTL_SECONDS, the least recently used ones are evicted
+beyond ANSWER_CACHE_MAX_ENTRIES, and everything is dropped when vectordb.py rewrites the
+index snapshots in db/ (the indexes themselves are reloaded by src/index_watch.py). The
+cache lives in memory, for one process.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from src.config import ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_TTL_SECONDS, ANSWER_CACHE_SIMILARITY
+from src.embedding_cache import normalize_text
+from src.index_watch import INDEX_FILES, index_signature
+
+_WORD = re.compile(r"\w+(?:-\w+)*")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Exact-match key: lower case, punctuation dropped ("What suppliers are in Taiwan?" and
+    "what suppliers are in taiwan" are the same query).
+    """
+    return " ".join(_WORD.findall(normalize_text(query).lower()))
+
+
+def query_scope(filters: dict, query: str) -> str:
+    """
+    Scope within which similar queries may share an answer: the recognised filter values
+    (see FilterIndex.match) plus every word containing a digit.
+    """
+    values = sorted(f"{name}={value.lower()}" for name, vals in (filters or {}).items() for value in vals)
+    codes = sorted({word for word in _WORD.findall(query.lower()) if any(c.isdigit() for c in word)})
+    return "|".join(values + codes)
+
+
+class AnswerCache:
+    """
+    LRU cache of answers with a matrix of their query embeddings for the similarity lookup.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_MAX_ENTRIES, ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+                 similarity: float = ANSWER_CACHE_SIMILARITY, index_files: list = INDEX_FILES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity = similarity
+        self.index_files = index_files
+        self._lock = threading.Lock()
+        # normalized query -> {"query", "answer", "scope", "created", "slot"}
+        self._entries = OrderedDict()
+        # Unit query embeddings by slot, and which entry owns each slot
+        self._vectors = None
+        self._slot_keys = [None] * max_entries
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._signature = index_signature(index_files)
+        self.lookups = 0
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # --- bookkeeping ---
+
+    def _check_index(self) -> bool:
+        # A rebuilt database makes every cached answer suspect. Returns whether it changed.
+        signature = index_signature(self.index_files)
+        with self._lock:
+            if signature == self._signature:
+                return False
+            self._signature = signature
+            if self._entries:
+                self.invalidations += 1
+                self._clear()
+        return True
+
+    def _clear(self):
+        for key in list(self._entries):
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        if entry["slot"] is not None:
+            self._vectors[entry["slot"]] = 0
+            self._slot_keys[entry["slot"]] = None
+            self._free_slots.append(entry["slot"])
+
+    def _is_expired(self, entry: dict) -> bool:
+        return time.monotonic() - entry["created"] > self.ttl_seconds
+
+    # --- lookups ---
+
+    def get(self, query: str) -> str:
+        """
+        Returns the answer cached for this exact (normalized) query, or None.
+        Needs no embedding, so it is tried before the model is loaded. Every get() counts
+        as one lookup for the hit rate, whether or not get_similar() follows.
+        """
+        key = normalize_query(query)
+        self._check_index()
+        with self._lock:
+            self.lookups += 1
+            entry = self._entries.get(key)
+            if entry is not None and self._is_expired(entry):
+                self._remove(key)
+                self.expired += 1
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            self.exact_hits += 1
+            return entry["answer"]
+
+    def get_similar(self, query: str, embedding, scope: str = "") -> tuple:
+        """
+        Returns (answer, cached query) for the most similar cached query in the same scope
+        whose cosine similarity is at least the threshold, or (None, None).
+        """
+        self._check_index()
+        with self._lock:
+            best = self._most_similar(_unit(embedding), scope)
+            if best is None:
+                return None, None
+            self._entries.move_to_end(best)
+            self.similar_hits += 1
+            entry = self._entries[best]
+            return entry["answer"], entry["query"]
+
+    def _most_similar(self, vector: np.ndarray, scope: str):
+        if self._vectors is None or len(vector) != self._vectors.shape[1]:
+            return None
+        scores = self._vectors @ vector
+        for slot in np.argsort(-scores).tolist():
+            if scores[slot] < self.similarity:
+                return None
+            key = self._slot_keys[slot]
+            if key is None or self._entries[key]["scope"] != scope:
+                continue
+            if self._is_expired(self._entries[key]):
+                self._remove(key)
+                self.expired += 1
+                continue
+            return key
+        return None
+
+    def put(self, query: str, answer: str, embedding=None, scope: str = ""):
+        """
+        Caches an answer. Without an embedding it can only be found by get(). An answer
+        arriving after the index files changed may come from the old data and is not cached.
+        """
+        key = normalize_query(query)
+        if self._check_index():
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            slot = None
+            if embedding is not None:
+                vector = _unit(embedding)
+                if self._vectors is None or len(vector) != self._vectors.shape[1]:
+                    # First embedding, or another model: unused slots stay zero, so they never match
+                    self._clear()
+                    self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                slot = self._free_slots.pop()
+                self._vectors[slot] = vector
+                self._slot_keys[slot] = key
+            self._entries[key] = {"query": query, "answer": answer, "scope": scope,
+                                  "created": time.monotonic(), "slot": slot}
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "lookups": self.lookups,
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.lookups - hits,
+                "hit_rate": round(hits / self.lookups, 3) if self.lookups else None,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+def _unit(vector) -> np.ndarray:
+    vector = np.array(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+
+_answer_cache = None
+_answer_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """
+    Returns the process-wide answer cache, creating it on first use.
+    """
+    global _answer_cache
+    if _answer_cache is None:
+        with _answer_cache_lock:
+            if _answer_cache is None:
+                _answer_cache = AnswerCache()
+    return _answer_cache
+
+
+def answer_cache_stats() -> dict:
+    """
+    Stats of the process-wide cache, without creating it if nothing has used it yet.
+    """
+    return _answer_cache.stats() if _answer_cache is not None else {}
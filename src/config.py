@@ -9,7 +9,159 @@ DB_PATH = "db/"
 
 #Embedding Model 
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# "torch" runs EMBEDDING_MODEL with sentence-transformers (PyTorch). "onnx" runs an int8
+# quantized ONNX export of the same model with onnxruntime, without torch; create it once
+# with `python -m src.onnx_embeddings export` and check it with
+# `python -m benchmarks.bench_onnx_embeddings` before switching.
+EMBEDDING_BACKEND = "torch"
+ONNX_MODEL_DIR = "models/"
+# onnxruntime intra-op threads per encode call (0 lets onnxruntime pick one per core)
+ONNX_THREADS = 4
 
 # LLM Configuration (via OpenRouter) 
 # Other good options: "mistralai/mistral-7b-instruct:free", "huggingfaceh4/zephyr-7b-beta:free"
-LLM_MODEL_NAME = "mistralai/mistral-7b-instruct:free"
\ No newline at end of file
+LLM_MODEL_NAME = "mistralai/mistral-7b-instruct:free"
+LLM_TEMPERATURE = 0
+
+# LLM Cache
+# Completions are cached on disk, keyed by the model settings and a hash of the prompt, so a
+# re-run with the same task and the same tool observations costs no API calls. Only used
+# while LLM_TEMPERATURE is 0; other temperatures are meant to vary between calls.
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "cache/llm.sqlite"
+# Least recently used completions are evicted beyond this size
+LLM_CACHE_MAX_MB = 50
+
+# Agent Scratchpad
+# Once the tool observations in the ReAct scratchpad exceed this many (estimated) tokens, the
+# oldest ones are cut down to their first AGENT_COMPACT_OBSERVATION_CHARS characters. The last
+# AGENT_SCRATCHPAD_KEEP_RECENT steps are always sent in full.
+AGENT_SCRATCHPAD_TOKEN_BUDGET = 3000
+AGENT_SCRATCHPAD_KEEP_RECENT = 2
+AGENT_COMPACT_OBSERVATION_CHARS = 300
+
+# Vector Store
+# "chroma" keeps the Chroma collection in DB_PATH; "flat" keeps a memory-mapped NumPy matrix
+# in FLAT_INDEX_PATH with exact search. Re-run vectordb.py after switching.
+VECTOR_BACKEND = "chroma"
+FLAT_INDEX_PATH = DB_PATH + "flat/"
+# Store the flat index as int8 (4x smaller, slightly less exact scores)
+FLAT_INDEX_QUANTIZE = False
+
+# Vector Database Ingest
+# Maximum number of documents written to (or read from) Chroma in one call
+CHROMA_WRITE_BATCH_SIZE = 5000
+# Rows of materials.csv read per chunk during ingest (None reads the whole file at once)
+INGEST_CHUNK_ROWS = 100_000
+
+# Embedding Stage (ingest)
+# Texts per encode batch
+EMBED_BATCH_SIZE = 256
+# Number of encoding processes; 1 encodes in the main process. Set it to the number of
+# physical cores on CPU-only ingest machines.
+EMBED_WORKERS = 1
+
+# Embedding Cache
+# Embeddings of previously seen texts are kept on disk and re-used by ingest and queries
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_DIR = "cache/embeddings/"
+# Maximum cached texts per model (about 1.5 KB each for all-MiniLM-L6-v2)
+EMBEDDING_CACHE_MAX_ENTRIES = 200_000
+
+# Structured Filter Index
+# Snapshot of the country/city/supplier/criticality index, rebuilt when either CSV changes
+FILTER_INDEX_PATH = DB_PATH + "filter_index.pkl"
+# Maximum materials listed in one answer from the index
+FILTER_INDEX_MAX_ROWS = 25
+
+# Lexical Index
+# BM25 index over the document text, built and updated by vectordb.py together with the
+# vector store, so exact identifiers ("M001", "S851", "ECO-298-ULTRA") are found even when
+# the embedding misses them. Its hits are merged with the vector hits by reciprocal-rank fusion.
+LEXICAL_INDEX_ENABLED = True
+LEXICAL_INDEX_PATH = DB_PATH + "lexical_index.pkl"
+# Query terms found in more than this fraction of the documents (e.g. "material", "by" or a
+# country) are skipped: they identify nothing, and on a large catalogue they would dominate
+# the lookup cost. Matches on the remaining terms are kept even beyond RETRIEVER_MAX_DISTANCE.
+LEXICAL_MAX_DOC_FRACTION = 0.01
+# k in the fused score sum(1 / (k + rank)); larger values flatten the rank differences
+LEXICAL_RRF_K = 60
+# Both rankings are fused over at least this many candidates and then cut to the k asked for,
+# so a top-1 lookup ranks documents the same way as a full RETRIEVER_TOP_K search
+LEXICAL_FUSION_CANDIDATES = 20
+
+# Answer Cache (supply_chain_retriever_tool)
+# Recent answers of the retriever tool, so a rephrased question ("Taiwan suppliers" after
+# "suppliers in Taiwan") is answered without another search. A query hits on its normalized
+# text, or on a cached query with at least this cosine similarity that names the same
+# countries, cities, suppliers, criticality levels and IDs. Cleared when vectordb.py runs.
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_MAX_ENTRIES = 1000
+ANSWER_CACHE_TTL_SECONDS = 600
+ANSWER_CACHE_SIMILARITY = 0.9
+
+# News API (GNews)
+GNEWS_API_BASE = "https://gnews.io/api/v4"
+NEWS_MAX_RESULTS = 10
+NEWS_TIMEOUT_SECONDS = 10
+# Retries after the first attempt, with exponential backoff, for timeouts, 429 and 5xx
+NEWS_MAX_RETRIES = 3
+# Identical queries within this window are served from memory
+NEWS_CACHE_TTL_SECONDS = 900
+# Concurrent requests when fetching several query variants at once
+NEWS_MAX_WORKERS = 4
+
+# Deterministic Fast Path (main.py --fast)
+# News queries scanned concurrently when no headlines file is given
+FAST_PATH_NEWS_QUERIES = [
+    "supply chain disruption", "factory fire", "port congestion",
+    "strike", "flood", "earthquake",
+]
+
+# Supplier Exposure Index
+# Snapshot of the country -> city -> supplier -> materials index
+EXPOSURE_INDEX_PATH = DB_PATH + "exposure_index.npz"
+# How often (at most) a running process checks whether the CSVs changed under the index
+EXPOSURE_REFRESH_SECONDS = 30
+# Maximum suppliers listed in one blast radius answer
+EXPOSURE_MAX_SUPPLIERS = 15
+
+# Retriever
+# Candidates fetched per query before thresholding and grouping
+RETRIEVER_TOP_K = 20
+# Hits further than this (squared L2 distance, as both vector stores report it; for
+# normalized MiniLM vectors 1.0 is a cosine similarity of 0.5) are dropped
+RETRIEVER_MAX_DISTANCE = 1.0
+# Upper bound on the size of the summary returned to the agent
+RETRIEVER_SUMMARY_MAX_CHARS = 1500
+
+# Service Mode (main.py --serve)
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+# Requests handled at the same time; further requests wait in the queue
+SERVER_MAX_CONCURRENCY = 4
+# Requests allowed to wait; beyond this the server answers 429 straight away
+SERVER_MAX_QUEUE = 32
+# A request still running after this long is answered with 504
+SERVER_REQUEST_TIMEOUT_SECONDS = 300
+# Most recent requests per endpoint kept for the p50/p95 latencies
+SERVER_LATENCY_WINDOW = 1000
+
+# Continuous Monitor (main.py --monitor)
+# Analysed articles and the watermark, so a restart does not re-analyse anything
+MONITOR_STORE_PATH = DB_PATH + "monitor.sqlite"
+MONITOR_INTERVAL_SECONDS = 900
+# A title is a near-duplicate of an earlier one if their 64-bit SimHashes differ in at most
+# this many bits and they share at least this fraction of their words. At most 11: the
+# lookup probes each 16-bit quarter of the hash with up to two bits flipped
+MONITOR_SIMHASH_DISTANCE = 10
+MONITOR_TITLE_SIMILARITY = 0.8
+# Articles published this long before the newest one already processed are skipped, and
+# titles seen within this window are checked for near-duplicates
+MONITOR_LOOKBACK_HOURS = 48
+
+# Tracing (--trace on main.py, agent.py and vectordb.py)
+# One JSON-lines file of spans per run
+TRACE_DIR = "traces/"
+# Spans kept per run; long-lived processes (--serve, --monitor) drop the rest
+TRACE_MAX_SPANS = 100_000
@@ -0,0 +1,129 @@
+"""
+Column-wise rendering of the materials/suppliers catalogue into vector database documents.
+
+Everything here works on whole DataFrame columns (vectorised string concatenation and
+metadata built from column arrays) instead of DataFrame.iterrows()/apply(axis=1), and the
+materials file can be streamed in chunks so memory stays flat on very large exports.
+"""
+import hashlib
+
+import pandas as pd
+from src.config import DATA_PATH
+
+# Every column is read as a string: IDs such as 'S001' must keep their zero padding,
+# and it lets pandas skip type inference on large files.
+SUPPLIER_DTYPES = {
+    "supplier_id": str,
+    "supplier_name": str,
+    "country": str,
+    "city": str,
+    "industry_type": str,
+}
+MATERIAL_DTYPES = {
+    "material_id": str,
+    "material_name": str,
+    "supplied_by_id": str,
+    "criticality_level": str,
+}
+
+# Metadata stored with each vector: {metadata key: merged column}
+METADATA_COLUMNS = {
+    "material_id": "material_id",
+    "material_name": "material_name",
+    "criticality_level": "criticality_level",
+    "supplier_id": "supplier_id",
+    "supplier_name": "supplier_name",
+    "city": "city",
+    "country": "country",
+}
+
+# Used for materials whose supplier is missing from suppliers.csv
+MISSING_VALUE = "Unknown"
+
+
+def load_suppliers(data_path: str = DATA_PATH) -> pd.DataFrame:
+    return pd.read_csv(data_path + "suppliers.csv", dtype=SUPPLIER_DTYPES)
+
+
+def merge_materials(materials_df: pd.DataFrame, suppliers_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Left-joins materials to their suppliers and fills the gaps left by unknown suppliers.
+    """
+    merged_df = pd.merge(
+        materials_df,
+        suppliers_df,
+        how="left",
+        left_on="supplied_by_id",
+        right_on="supplier_id"
+    )
+    # A material whose supplier is unknown still keeps its own supplied_by_id
+    merged_df["supplier_id"] = merged_df["supplier_id"].fillna(merged_df["supplied_by_id"])
+    return merged_df.fillna(MISSING_VALUE)
+
+
+def iter_merged_frames(data_path: str = DATA_PATH, chunksize: int = None):
+    """
+    Yields the merged materials/suppliers table.
+    suppliers.csv is a small dimension table and is loaded once; materials.csv is streamed
+    in chunks of `chunksize` rows when given, otherwise read in one go.
+    """
+    suppliers_df = load_suppliers(data_path)
+    if chunksize is None:
+        yield merge_materials(pd.read_csv(data_path + "materials.csv", dtype=MATERIAL_DTYPES), suppliers_df)
+        return
+    with pd.read_csv(data_path + "materials.csv", dtype=MATERIAL_DTYPES, chunksize=chunksize) as reader:
+        for materials_chunk in reader:
+            yield merge_materials(materials_chunk, suppliers_df)
+
+
+def render_page_content(df: pd.DataFrame) -> pd.Series:
+    """
+    Renders the descriptive sentence for every row at once.
+    """
+    return (
+        "Material '" + df["material_name"] + "' (ID: " + df["material_id"] + ") is a "
+        + df["criticality_level"] + " criticality component. It is supplied by '"
+        + df["supplier_name"] + "' (ID: " + df["supplier_id"] + ") from " + df["city"] + ", "
+        + df["country"] + ", which is in the " + df["industry_type"] + " industry."
+    )
+
+
+def _hash_payload(page_content: pd.Series, df: pd.DataFrame) -> pd.Series:
+    # Text followed by the metadata values in sorted key order, separated by the ASCII unit
+    # separator (pandas string columns silently drop NUL characters)
+    payload = page_content
+    for key in sorted(METADATA_COLUMNS):
+        payload = payload + "\x1f" + df[METADATA_COLUMNS[key]]
+    return payload
+
+
+def render_documents(merged_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns one row per document with the columns
+    id, page_content, content_hash and the metadata keys from METADATA_COLUMNS.
+    """
+    page_content = render_page_content(merged_df)
+    payload = _hash_payload(page_content, merged_df)
+
+    rendered = pd.DataFrame({
+        "id": merged_df["material_id"].to_numpy(),
+        "page_content": page_content.to_numpy(),
+        # Hashing is the only per-row step left; it is a tight loop over plain strings
+        "content_hash": [hashlib.sha256(p.encode("utf-8")).hexdigest() for p in payload.to_numpy()],
+    })
+    for key, column in METADATA_COLUMNS.items():
+        rendered[key] = merged_df[column].to_numpy()
+    return rendered
+
+
+def to_metadatas(rendered: pd.DataFrame) -> list:
+    """
+    Builds the per-document metadata dicts from the rendered columns.
+    """
+    keys = list(METADATA_COLUMNS) + ["content_hash"]
+    columns = [rendered[key].to_numpy() for key in keys]
+    sources = ("materials.csv:" + rendered["id"]).to_numpy()
+    return [
+        {"source": source, **dict(zip(keys, values))}
+        for source, *values in zip(sources, *columns)
+    ]
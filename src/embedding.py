@@ -0,0 +1,149 @@
+"""
+Batched, optionally multi-process embedding stage for building the vector database.
+
+The texts are encoded in batches of EMBED_BATCH_SIZE, spread over EMBED_WORKERS processes
+with sentence-transformers' multi-process pool, and each batch is written to the vector
+database by a background thread while the next batch is being encoded. Only a couple of
+batches are ever held in memory, however large the corpus is.
+
+With EMBEDDING_BACKEND = "onnx" the int8 ONNX export (src/onnx_embeddings.py) is used
+instead; it spreads each batch over ONNX_THREADS threads, so no worker pool is started.
+"""
+import queue
+import threading
+
+from src.config import EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBED_BATCH_SIZE, EMBED_WORKERS, EMBEDDING_CACHE_ENABLED
+from src.embedding_cache import EmbeddingCache, embed_with_cache, get_embedding_cache
+from src.tracing import current_span_id, span
+
+BACKENDS = ["torch", "onnx"]
+
+
+def embedding_key(model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND) -> str:
+    """
+    Name the embedding cache is kept under. The int8 model's vectors differ slightly from
+    the PyTorch ones, so the two backends never share cached entries.
+    """
+    return model_name if backend == "torch" else f"{model_name}-onnx-int8"
+
+
+def load_embeddings(model_name: str = EMBEDDING_MODEL, backend: str = EMBEDDING_BACKEND):
+    """
+    Returns LangChain Embeddings for the model on the given backend ("torch" or "onnx").
+    """
+    # Imported here: sentence-transformers pulls in torch, which takes seconds
+    if backend == "torch":
+        from langchain_community.embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings(model_name=model_name)
+    if backend == "onnx":
+        from src.onnx_embeddings import OnnxEmbeddings
+        return OnnxEmbeddings(model_name)
+    raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+
+
+class BatchEmbedder:
+    """
+    Encodes lists of texts with the configured model.
+    Use it as a context manager so the worker pool (if any) is started and stopped cleanly:
+
+        with BatchEmbedder() as embedder:
+            vectors = embedder.embed(texts)
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, batch_size: int = EMBED_BATCH_SIZE,
+                 workers: int = EMBED_WORKERS, cache: EmbeddingCache = None, backend: str = EMBEDDING_BACKEND):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.backend = backend
+        with span("embed.load_model", model=model_name, backend=backend):
+            if backend == "onnx":
+                from src.onnx_embeddings import OnnxEmbeddings
+                self.model = OnnxEmbeddings(model_name, batch_size=batch_size)
+                # onnxruntime already uses several threads per batch
+                workers = 1
+            elif backend == "torch":
+                # Imported here so that `vectordb.py --help` does not pay for torch
+                from sentence_transformers import SentenceTransformer
+                self.model = SentenceTransformer(model_name)
+            else:
+                raise ValueError(f"Unknown embedding backend '{backend}', expected one of {BACKENDS}")
+        self.workers = workers
+        # Texts embedded by an earlier run (or an earlier row) are served from the cache
+        if cache is None and EMBEDDING_CACHE_ENABLED:
+            cache = get_embedding_cache(embedding_key(model_name, backend))
+        self.cache = cache
+        self._pool = None
+
+    def __enter__(self):
+        # One worker means encoding in this process, no pool needed
+        if self.workers > 1:
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+        if self.cache is not None:
+            self.cache.flush()
+
+    def embed(self, texts: list):
+        """
+        Returns a float32 array with one embedding per text.
+        Only texts missing from the embedding cache reach the model.
+        """
+        with span("embed.batch", texts=len(texts)):
+            return embed_with_cache(self.cache, texts, self._encode)
+
+    def _encode(self, texts: list):
+        if self.backend == "onnx":
+            return self.model.encode(texts)
+        if self._pool is not None:
+            return self.model.encode_multi_process(texts, self._pool, batch_size=self.batch_size)
+        return self.model.encode(texts, batch_size=self.batch_size, convert_to_numpy=True)
+
+
+def embed_and_write(embedder: BatchEmbedder, batches, write, max_pending: int = 2) -> int:
+    """
+    Embeds the page_content of every rendered batch (see src.documents.render_documents)
+    from `batches` and hands it to `write(batch, embeddings)`.
+    Writing happens on a background thread, so the next batch is encoded while the
+    previous one is being written; at most `max_pending` embedded batches wait in between.
+    Returns the number of batches written.
+    """
+    pending = queue.Queue(maxsize=max_pending)
+    errors = []
+    written = 0
+    # Writes happen on another thread; their spans belong to the caller's span
+    parent_span = current_span_id()
+
+    def writer():
+        nonlocal written
+        while True:
+            item = pending.get()
+            if item is None:
+                return
+            if errors:
+                # Keep draining so the producer never blocks, but stop writing after a failure
+                continue
+            try:
+                with span("ingest.write", parent=parent_span, rows=len(item[0])):
+                    write(*item)
+                written += 1
+            except Exception as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=writer, name="vectordb-writer", daemon=True)
+    thread.start()
+    try:
+        for batch in batches:
+            if errors:
+                break
+            pending.put((batch, embedder.embed(batch["page_content"].tolist())))
+    finally:
+        pending.put(None)
+        thread.join()
+
+    if errors:
+        raise errors[0]
+    return written
@@ -0,0 +1,271 @@
+"""
+Persistent on-disk cache of text embeddings, shared by ingest and query.
+
+Each embedding model gets its own directory under EMBEDDING_CACHE_DIR holding
+    vectors.npy  a memory-mapped float32 matrix with one row ("slot") per cached text
+    keys.npy     a memory-mapped matrix with the 16-byte digest of the text in each slot
+    index.npz    the compact index: 16-byte text digests, their slots and last-use ticks
+Keys are blake2b digests of the normalized text. When every slot is taken the least
+recently used entries are evicted.
+
+Several processes may share the files (the BatchEmbedder workers, or ingest running next to
+`--serve`). Each keeps its own index and the last one to flush wins, so an index can point
+a digest at a slot another process has since reused. A lookup therefore only counts when
+keys.npy still holds the digest in that slot, before and after the vector is copied;
+otherwise it is a miss and the text is embedded again.
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config import EMBEDDING_MODEL, EMBEDDING_CACHE_DIR, EMBEDDING_CACHE_MAX_ENTRIES
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form used for cache keys: Unicode NFC with runs of whitespace collapsed.
+    The tokenizer produces the same tokens for both forms, so they share one embedding.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(normalize_text(text).encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingCache:
+    """
+    LRU cache of embeddings for one model, backed by a memory-mapped matrix.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, cache_dir: str = EMBEDDING_CACHE_DIR,
+                 max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._keys = None
+        self._slots = {}
+        self._last_used = np.zeros(max_entries, dtype=np.int64)
+        self._clock = 0
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+        atexit.register(self.flush)
+
+    # --- persistence ---
+
+    def _index_file(self) -> str:
+        return os.path.join(self.path, "index.npz")
+
+    def _vectors_file(self) -> str:
+        return os.path.join(self.path, "vectors.npy")
+
+    def _keys_file(self) -> str:
+        return os.path.join(self.path, "keys.npy")
+
+    def _load(self):
+        if not all(os.path.exists(f) for f in (self._index_file(), self._vectors_file(), self._keys_file())):
+            return
+        index = np.load(self._index_file())
+        meta = json.loads(str(index["meta"]))
+        if meta["model_name"] != self.model_name or meta["max_entries"] != self.max_entries:
+            # Different model or capacity: start over rather than mixing incompatible vectors
+            return
+        self._vectors = np.load(self._vectors_file(), mmap_mode="r+")
+        self._keys = np.load(self._keys_file(), mmap_mode="r+")
+        digests = [row.tobytes() for row in index["digests"]]
+        self._slots = dict(zip(digests, index["slots"].tolist()))
+        self._last_used = index["last_used"].copy()
+        self._clock = meta["clock"]
+
+    def flush(self):
+        """
+        Writes the index and flushes the vector matrix to disk.
+        """
+        with self._lock:
+            if not self._dirty or self._vectors is None:
+                return
+            self._vectors.flush()
+            self._keys.flush()
+            meta = json.dumps({"model_name": self.model_name, "max_entries": self.max_entries,
+                               "clock": self._clock})
+            tmp_file = self._index_file() + ".tmp.npz"
+            np.savez(
+                tmp_file,
+                digests=np.frombuffer(b"".join(self._slots.keys()), dtype=np.uint8).reshape(-1, 16),
+                slots=np.array(list(self._slots.values()), dtype=np.int32),
+                last_used=self._last_used,
+                meta=np.array(meta),
+            )
+            os.replace(tmp_file, self._index_file())
+            self._dirty = False
+
+    def _ensure_vectors(self, dim: int):
+        if self._vectors is not None:
+            return
+        shape = (self.max_entries, dim)
+        if os.path.exists(self._vectors_file()) and os.path.exists(self._keys_file()):
+            # Another process may have created the files since we started: share them
+            vectors = np.load(self._vectors_file(), mmap_mode="r+")
+            keys = np.load(self._keys_file(), mmap_mode="r+")
+            if vectors.shape == shape and keys.shape == (self.max_entries, 16):
+                self._vectors, self._keys = vectors, keys
+                return
+        os.makedirs(self.path, exist_ok=True)
+        # The files are created sparse, so unused slots take no disk space
+        self._keys = np.lib.format.open_memmap(
+            self._keys_file(), mode="w+", dtype=np.uint8, shape=(self.max_entries, 16)
+        )
+        self._vectors = np.lib.format.open_memmap(
+            self._vectors_file(), mode="w+", dtype=np.float32, shape=shape
+        )
+
+    def _owns(self, slot: int, digest: bytes) -> bool:
+        return self._keys[slot].tobytes() == digest
+
+    # --- lookups ---
+
+    def get_many(self, texts: list):
+        """
+        Returns (vectors, missing): a list with the cached vector or None for each text,
+        and the positions of the texts that were not cached.
+        """
+        digests = [text_digest(t) for t in texts]
+        vectors = [None] * len(texts)
+        missing = []
+        with self._lock:
+            for i, digest in enumerate(digests):
+                slot = self._slots.get(digest)
+                if slot is None or not self._owns(slot, digest):
+                    missing.append(i)
+                    continue
+                vector = np.array(self._vectors[slot])
+                if not self._owns(slot, digest):
+                    # Overwritten by another process while we were copying
+                    missing.append(i)
+                    continue
+                self._clock += 1
+                self._last_used[slot] = self._clock
+                vectors[i] = vector
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+            if len(missing) < len(texts):
+                self._dirty = True
+        return vectors, missing
+
+    def put_many(self, texts: list, vectors):
+        """
+        Stores the vectors for the given texts, evicting least recently used entries if full.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if len(texts) == 0:
+            return
+        # Only the last occurrence of a repeated text needs storing
+        new_entries = {text_digest(t): v for t, v in zip(texts, vectors)}
+        with self._lock:
+            self._ensure_vectors(vectors.shape[1])
+            fresh = [d for d in new_entries if d not in self._slots]
+            free_slots = self._take_free_slots(min(len(fresh), self.max_entries))
+            for digest in fresh[-len(free_slots):] if free_slots else []:
+                self._slots[digest] = free_slots.pop()
+            for digest, vector in new_entries.items():
+                slot = self._slots.get(digest)
+                if slot is None:
+                    continue
+                # Readers in other processes see either no key or the key with its complete vector
+                self._keys[slot] = 0
+                self._vectors[slot] = vector
+                self._keys[slot] = np.frombuffer(digest, dtype=np.uint8)
+                self._clock += 1
+                self._last_used[slot] = self._clock
+            self._dirty = True
+
+    def _take_free_slots(self, count: int) -> list:
+        # Occupied slots are always 0..len(self._slots)-1. Never-used slots come first;
+        # after that, the least recently used occupied slots are evicted.
+        if count <= 0:
+            return []
+        used = len(self._slots)
+        free = list(range(used, min(used + count, self.max_entries)))
+        shortfall = count - len(free)
+        if shortfall > 0:
+            victims = np.argpartition(self._last_used[:used], shortfall - 1)[:shortfall]
+            victim_set = set(victims.tolist())
+            self._slots = {d: s for d, s in self._slots.items() if s not in victim_set}
+            self._last_used[victims] = 0
+            self.evictions += shortfall
+            free.extend(victims.tolist())
+        return free
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "model_name": self.model_name,
+                "entries": len(self._slots),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+            }
+
+
+def embed_with_cache(cache: EmbeddingCache, texts: list, encode) -> np.ndarray:
+    """
+    Returns embeddings for `texts`, calling `encode(list_of_texts)` only for cache misses.
+    """
+    if cache is None:
+        return np.asarray(encode(texts), dtype=np.float32)
+    vectors, missing = cache.get_many(texts)
+    if missing:
+        missing_texts = [texts[i] for i in missing]
+        encoded = np.asarray(encode(missing_texts), dtype=np.float32)
+        cache.put_many(missing_texts, encoded)
+        for i, vector in zip(missing, encoded):
+            vectors[i] = vector
+    if not vectors:
+        return np.zeros((0, 0), dtype=np.float32)
+    return np.vstack(vectors)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    LangChain Embeddings wrapper that serves repeated texts from an EmbeddingCache.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def embed_documents(self, texts: list) -> list:
+        return embed_with_cache(self.cache, list(texts), self.embeddings.embed_documents).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return embed_with_cache(self.cache, [text], lambda t: [self.embeddings.embed_query(t[0])])[0].tolist()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str = EMBEDDING_MODEL) -> EmbeddingCache:
+    """
+    Returns the process-wide cache for a model.
+    """
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
@@ -0,0 +1,329 @@
+"""
+Precomputed supplier exposure ("blast radius") index.
+
+The catalogue is laid out as a country -> city -> supplier -> materials hierarchy in flat
+NumPy arrays: suppliers are sorted by (country, city), every level points at a contiguous
+range of the level below (CSR offsets), and each level carries its criticality counts
+aggregated from the materials underneath. Answering "what is exposed if Hsinchu goes down?"
+is then a dictionary lookup plus array slices, O(matches).
+
+When a CSV changes only its side is rebuilt: a new materials.csv re-uses the supplier
+tables, and a new suppliers.csv re-maps the materials already in memory. The snapshot holds
+only these arrays (np.savez, no pickle), so loading it does not need pandas.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from src.config import DATA_PATH, EXPOSURE_INDEX_PATH, EXPOSURE_MAX_SUPPLIERS, EXPOSURE_REFRESH_SECONDS
+from src.filter_index import CRITICALITY_ORDER, tokenize
+from src.index_watch import check_indexes
+
+# Column order of every counts matrix: most critical first
+LEVELS = np.array(CRITICALITY_ORDER, dtype=object)
+_LEVEL_CODES = {level: i for i, level in enumerate(CRITICALITY_ORDER)}
+
+# What the snapshot holds; everything else (the name lookups) is rebuilt when it is loaded
+_SNAPSHOT_VERSION = 2
+_STRING_ARRAYS = ["supplier_ids", "supplier_names", "countries", "cities",
+                  "material_ids", "material_names", "material_supplied_by"]
+_NUMERIC_ARRAYS = ["supplier_city", "city_country", "city_offsets", "country_city_offsets",
+                   "material_supplier", "material_level", "supplier_material_offsets",
+                   "supplier_counts", "city_counts", "country_counts"]
+
+
+def _file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+def _normalize(name: str) -> str:
+    return " ".join(tokenize(name))
+
+
+def _pack_strings(values: np.ndarray) -> tuple:
+    encoded = [str(v).encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return np.array([data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)], dtype=object)
+
+
+def _group_offsets(codes: np.ndarray, size: int) -> np.ndarray:
+    # CSR offsets for items sorted by `codes`: items of group g are offsets[g]:offsets[g + 1]
+    return np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=size))]).astype(np.int64)
+
+
+@dataclass
+class BlastRadius:
+    kind: str               # "country", "city" or "supplier"
+    name: str
+    suppliers: np.ndarray   # supplier positions, ranked most exposed first
+    counts: np.ndarray      # criticality counts over everything affected
+
+
+class ExposureIndex:
+
+    def __init__(self, data_path: str = DATA_PATH):
+        self.data_path = data_path
+        self.signatures = {}
+
+    # --- building ---
+
+    @classmethod
+    def build(cls, data_path: str = DATA_PATH) -> "ExposureIndex":
+        index = cls(data_path)
+        index._load_suppliers()
+        index._load_materials()
+        return index
+
+    def _load_suppliers(self):
+        # pandas is only needed to (re)build the tables, not to query them
+        import pandas as pd
+        from src.documents import load_suppliers
+        path = os.path.join(self.data_path, "suppliers.csv")
+        suppliers = load_suppliers(self.data_path).sort_values(["country", "city", "supplier_id"], kind="stable")
+
+        _, countries = pd.factorize(suppliers["country"], sort=True)
+        # Cities are unique per (country, city), since two countries can share a city name
+        city_codes = suppliers.groupby(["country", "city"], sort=True).ngroup().to_numpy()
+        city_table = suppliers[["country", "city"]].drop_duplicates().sort_values(["country", "city"])
+
+        self.supplier_ids = suppliers["supplier_id"].to_numpy(dtype=object)
+        self.supplier_names = suppliers["supplier_name"].to_numpy(dtype=object)
+        self.supplier_city = city_codes.astype(np.int32)
+        self.countries = np.asarray(countries, dtype=object)
+        self.cities = city_table["city"].to_numpy(dtype=object)
+        self.city_country = np.searchsorted(self.countries, city_table["country"].to_numpy(dtype=object)).astype(np.int32)
+        # Suppliers are sorted by (country, city), so each city/country owns a contiguous range
+        self.city_offsets = _group_offsets(self.supplier_city, len(self.cities))
+        self.country_city_offsets = _group_offsets(self.city_country, len(self.countries))
+        self._index_names()
+        self.signatures["suppliers.csv"] = _file_signature(path)
+
+    def _index_names(self):
+        # Name lookups; a name can refer to several entries (e.g. the same supplier name twice)
+        self._names = {"country": {}, "city": {}, "supplier": {}}
+        for code, name in enumerate(self.countries):
+            self._names["country"].setdefault(_normalize(name), []).append(code)
+        for code, name in enumerate(self.cities):
+            self._names["city"].setdefault(_normalize(name), []).append(code)
+        for pos, (sid, name) in enumerate(zip(self.supplier_ids, self.supplier_names)):
+            self._names["supplier"].setdefault(_normalize(name), []).append(pos)
+            self._names["supplier"].setdefault(_normalize(sid), []).append(pos)
+
+    def _load_materials(self):
+        import pandas as pd
+        from src.documents import MATERIAL_DTYPES
+        path = os.path.join(self.data_path, "materials.csv")
+        materials = pd.read_csv(path, dtype=MATERIAL_DTYPES)
+        self.material_ids = materials["material_id"].to_numpy(dtype=object)
+        self.material_names = materials["material_name"].to_numpy(dtype=object)
+        self.material_supplied_by = materials["supplied_by_id"].fillna("").to_numpy(dtype=object)
+        levels = materials["criticality_level"].map(_LEVEL_CODES).fillna(len(LEVELS) - 1)
+        self.material_level = levels.to_numpy(dtype=np.int8)
+        self.signatures["materials.csv"] = _file_signature(path)
+        self._place_materials()
+
+    def _place_materials(self):
+        """
+        Attaches the materials to the current supplier tables: placed materials first, sorted
+        by supplier, then those whose supplier is unknown (they cannot be placed on the map).
+        """
+        # Supplier position of every material, -1 if its supplier is not in suppliers.csv
+        positions = np.full(len(self.material_ids), -1, dtype=np.int64)
+        if len(self.supplier_ids):
+            by_id = np.argsort(self.supplier_ids, kind="stable")
+            sorted_ids = self.supplier_ids[by_id]
+            found = np.minimum(np.searchsorted(sorted_ids, self.material_supplied_by), len(sorted_ids) - 1)
+            known = sorted_ids[found] == self.material_supplied_by
+            positions[known] = by_id[found[known]]
+        placed = positions >= 0
+        placed_rows = np.flatnonzero(placed)
+        order = np.concatenate([placed_rows[np.argsort(positions[placed_rows], kind="stable")], np.flatnonzero(~placed)])
+        for name in ("material_ids", "material_names", "material_supplied_by", "material_level"):
+            setattr(self, name, getattr(self, name)[order])
+        self.material_supplier = positions[order][:len(placed_rows)].astype(np.int32)
+        self.supplier_material_offsets = _group_offsets(self.material_supplier, len(self.supplier_ids))
+        self._count()
+
+    def _count(self):
+        # Criticality counts aggregated bottom-up: supplier -> city -> country
+        self.supplier_counts = np.zeros((len(self.supplier_ids), len(LEVELS)), dtype=np.int32)
+        np.add.at(self.supplier_counts, (self.material_supplier, self.material_level[:len(self.material_supplier)]), 1)
+        self.city_counts = np.add.reduceat(self.supplier_counts, self.city_offsets[:-1], axis=0) \
+            if len(self.supplier_ids) else np.zeros((0, len(LEVELS)), dtype=np.int32)
+        self.country_counts = np.add.reduceat(self.city_counts, self.country_city_offsets[:-1], axis=0) \
+            if len(self.cities) else np.zeros((0, len(LEVELS)), dtype=np.int32)
+
+    @property
+    def unplaced_materials(self) -> int:
+        return len(self.material_ids) - len(self.material_supplier)
+
+    # --- incremental updates ---
+
+    def refresh(self) -> list:
+        """
+        Rebuilds only what changed on disk since the index was built. Returns the changed files.
+        """
+        changed = [
+            name for name in ("suppliers.csv", "materials.csv")
+            if self.signatures.get(name) != _file_signature(os.path.join(self.data_path, name))
+        ]
+        if "suppliers.csv" in changed:
+            self._load_suppliers()
+            if "materials.csv" not in changed:
+                # Re-attach the materials we already have to the new supplier tables
+                self._place_materials()
+        if "materials.csv" in changed:
+            self._load_materials()
+        return changed
+
+    # --- snapshots ---
+
+    def save(self, path: str = EXPOSURE_INDEX_PATH):
+        """
+        Writes the arrays with np.savez: strings as UTF-8 blobs plus offsets, no pickle.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        arrays = {name: getattr(self, name) for name in _NUMERIC_ARRAYS}
+        for name in _STRING_ARRAYS:
+            arrays[name + ".blob"], arrays[name + ".offsets"] = _pack_strings(getattr(self, name))
+        arrays["meta"] = np.array(json.dumps({"version": _SNAPSHOT_VERSION, "signatures": self.signatures}))
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = EXPOSURE_INDEX_PATH, data_path: str = DATA_PATH) -> "ExposureIndex":
+        with np.load(path) as snapshot:
+            meta = json.loads(str(snapshot["meta"]))
+            if meta.get("version") != _SNAPSHOT_VERSION:
+                raise ValueError(f"Exposure index snapshot {path} has an old format")
+            index = cls(data_path)
+            index.signatures = {name: tuple(signature) for name, signature in meta["signatures"].items()}
+            for name in _NUMERIC_ARRAYS:
+                setattr(index, name, snapshot[name])
+            for name in _STRING_ARRAYS:
+                setattr(index, name, _unpack_strings(snapshot[name + ".blob"], snapshot[name + ".offsets"]))
+        index._index_names()
+        return index
+
+    # --- queries ---
+
+    def blast_radius(self, name: str) -> list:
+        """
+        Returns a BlastRadius for every country, city or supplier (name or ID) called `name`,
+        broadest first.
+        """
+        key = _normalize(name)
+        results = []
+        for code in self._names["country"].get(key, []):
+            start, end = self.country_city_offsets[code], self.country_city_offsets[code + 1]
+            suppliers = np.arange(self.city_offsets[start], self.city_offsets[end])
+            results.append(BlastRadius("country", self.countries[code], self._rank(suppliers), self.country_counts[code]))
+        for code in self._names["city"].get(key, []):
+            suppliers = np.arange(self.city_offsets[code], self.city_offsets[code + 1])
+            results.append(BlastRadius("city", self.cities[code], self._rank(suppliers), self.city_counts[code]))
+        for pos in dict.fromkeys(self._names["supplier"].get(key, [])):
+            results.append(BlastRadius("supplier", self.supplier_names[pos], np.array([pos]), self.supplier_counts[pos]))
+        return results
+
+    def _rank(self, suppliers: np.ndarray) -> np.ndarray:
+        # Most Critical materials first, then High, Medium, Low; suppliers with nothing last
+        counts = self.supplier_counts[suppliers]
+        order = np.lexsort([-counts[:, i] for i in reversed(range(len(LEVELS)))])
+        return suppliers[order]
+
+    def supplier_materials(self, pos: int) -> list:
+        """
+        Returns [(material_id, material_name, criticality)] for one supplier, most critical first.
+        """
+        start, end = self.supplier_material_offsets[pos], self.supplier_material_offsets[pos + 1]
+        order = np.argsort(self.material_level[start:end], kind="stable") + start
+        return [(self.material_ids[i], self.material_names[i], LEVELS[self.material_level[i]]) for i in order]
+
+    def format(self, radius: BlastRadius, max_suppliers: int = EXPOSURE_MAX_SUPPLIERS) -> str:
+        """
+        Renders a blast radius as a compact, ranked summary for the agent.
+        """
+        def summary(counts):
+            return ", ".join(f"{level}: {n}" for level, n in zip(LEVELS, counts) if n)
+
+        where = ""
+        if radius.kind == "city":
+            pos = radius.suppliers[0] if len(radius.suppliers) else None
+            if pos is not None:
+                where = f" ({self.countries[self.city_country[self.supplier_city[pos]]]})"
+        lines = [
+            f"Blast radius of {radius.kind} '{radius.name}'{where}: {len(radius.suppliers)} suppliers, "
+            f"{int(radius.counts.sum())} materials ({summary(radius.counts) or 'none'})."
+        ]
+        if radius.kind == "country" and len(radius.suppliers):
+            city_codes = np.unique(self.supplier_city[radius.suppliers])
+            ranked = city_codes[np.lexsort([-self.city_counts[city_codes][:, i] for i in reversed(range(len(LEVELS)))])]
+            lines.append("By city: " + "; ".join(f"{self.cities[c]} ({summary(self.city_counts[c])})" for c in ranked))
+        for pos in radius.suppliers[:max_suppliers]:
+            materials = ", ".join(f"'{name}' ({mid}, {level})" for mid, name, level in self.supplier_materials(pos))
+            lines.append(
+                f"- '{self.supplier_names[pos]}' ({self.supplier_ids[pos]}, {self.cities[self.supplier_city[pos]]}): "
+                f"{summary(self.supplier_counts[pos]) or 'no materials'}. {materials}"
+            )
+        if len(radius.suppliers) > max_suppliers:
+            lines.append(f"... and {len(radius.suppliers) - max_suppliers} more suppliers.")
+        return "\n".join(lines)
+
+
+def build_exposure_index(data_path: str = DATA_PATH, path: str = EXPOSURE_INDEX_PATH) -> ExposureIndex:
+    """
+    Builds the index from the CSVs and writes its snapshot.
+    """
+    index = ExposureIndex.build(data_path)
+    index.save(path)
+    return index
+
+
+_exposure_index = None
+_exposure_index_checked = 0.0
+_exposure_index_lock = threading.Lock()
+
+
+def get_exposure_index() -> ExposureIndex:
+    """
+    Returns the process-wide index, loaded from its snapshot (or built) on first use and
+    brought up to date with any CSV that changed since. The CSVs are checked at most once
+    every EXPOSURE_REFRESH_SECONDS; a snapshot rewritten by vectordb.py is loaded again.
+    """
+    global _exposure_index, _exposure_index_checked
+    check_indexes()
+    with _exposure_index_lock:
+        if _exposure_index is None:
+            try:
+                _exposure_index = ExposureIndex.load(EXPOSURE_INDEX_PATH, DATA_PATH)
+            except (OSError, KeyError, ValueError):
+                # No snapshot yet, or one written by an older version
+                _exposure_index = build_exposure_index(DATA_PATH, EXPOSURE_INDEX_PATH)
+        now = time.monotonic()
+        if now - _exposure_index_checked >= EXPOSURE_REFRESH_SECONDS:
+            _exposure_index_checked = now
+            if _exposure_index.refresh():
+                _exposure_index.save(EXPOSURE_INDEX_PATH)
+        return _exposure_index
+
+
+def reset_exposure_index():
+    """
+    Drops the process-wide index; the next get_exposure_index() loads the current snapshot.
+    """
+    global _exposure_index, _exposure_index_checked
+    with _exposure_index_lock:
+        _exposure_index = None
+        _exposure_index_checked = 0.0
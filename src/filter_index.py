@@ -0,0 +1,268 @@
+"""
+In-memory inverted index over the exact-match fields of the supply chain catalogue.
+
+Many agent queries are really filters ("suppliers in Taiwan", "High criticality materials").
+This index recognises countries, cities, supplier names and criticality levels in a query
+and answers it completely from postings lists, or turns them into a Chroma `where` filter
+when the query also has a free-text part. It is built from the merged CSVs and cached as a
+compact binary snapshot that is reused until either CSV changes.
+"""
+import os
+import pickle
+import re
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+from src.config import DATA_PATH, FILTER_INDEX_PATH, FILTER_INDEX_MAX_ROWS
+from src.index_watch import check_indexes
+
+# Fields that can be filtered on, in the order they are reported
+FILTER_FIELDS = ["country", "city", "supplier_name", "criticality_level"]
+
+# Columns kept for answering queries directly from the index
+ROW_COLUMNS = ["material_id", "material_name", "supplier_id", "supplier_name", "city", "country", "criticality_level"]
+
+# Highest first; used to rank answers
+CRITICALITY_ORDER = ["Critical", "High", "Medium", "Low"]
+
+# Words that carry no meaning of their own once the entities are taken out of a query
+STOPWORDS = {
+    "a", "an", "the", "what", "which", "who", "where", "do", "does", "we", "our", "us", "have", "has",
+    "any", "all", "list", "show", "me", "find", "get", "are", "is", "in", "at", "from", "of", "for",
+    "based", "located", "with", "and", "or", "there", "that", "those", "these", "supplier", "suppliers",
+    "material", "materials", "component", "components", "company", "companies", "criticality", "level",
+    "levels", "items", "item", "parts", "part", "supplied", "by", "supply", "chain", "to", "how", "many",
+}
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list:
+    return _WORD.findall(text.lower())
+
+
+@dataclass
+class QueryMatch:
+    """
+    Entities recognised in a query: {field: [original values]} plus the words left over.
+    """
+    filters: dict = field(default_factory=dict)
+    residual: list = field(default_factory=list)
+
+    @property
+    def is_pure_filter(self) -> bool:
+        # Nothing but entities and stopwords: the index alone answers it completely
+        return bool(self.filters) and not self.residual
+
+    def where(self) -> dict:
+        """
+        Returns the equivalent Chroma metadata filter, or None if nothing was recognised.
+        """
+        clauses = [{name: {"$in": values}} for name, values in self.filters.items()]
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+class FilterIndex:
+    """
+    Postings lists {field: {normalized value: row positions}} over columnar row data.
+    """
+
+    def __init__(self, columns: dict, postings: dict, values: dict, source_signature: tuple = None):
+        self.columns = columns
+        self.postings = postings
+        # {field: {normalized value: original value}}
+        self.values = values
+        self.source_signature = source_signature
+        # Longest entity, in words, per field; bounds the n-grams tried per query
+        self._max_words = {
+            name: max((len(v.split()) for v in vals), default=0) for name, vals in values.items()
+        }
+
+    @classmethod
+    def from_frame(cls, merged_df: "pd.DataFrame", source_signature: tuple = None) -> "FilterIndex":
+        # pandas is only needed to build the index, not to load or query its snapshot
+        import pandas as pd
+        from src.documents import MISSING_VALUE
+        columns = {name: merged_df[name].to_numpy(dtype=object) for name in ROW_COLUMNS}
+        postings = {}
+        values = {}
+        for name in FILTER_FIELDS:
+            codes, uniques = pd.factorize(merged_df[name])
+            order = np.argsort(codes, kind="stable").astype(np.int32)
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            postings[name] = {}
+            values[name] = {}
+            for code, value in enumerate(uniques):
+                if value == MISSING_VALUE:
+                    continue
+                key = " ".join(tokenize(value))
+                rows = order[bounds[code]:bounds[code + 1]]
+                if key in postings[name]:
+                    rows = np.union1d(postings[name][key], rows).astype(np.int32)
+                postings[name][key] = rows
+                values[name][key] = value
+        return cls(columns, postings, values, source_signature)
+
+    @classmethod
+    def from_csv(cls, data_path: str = DATA_PATH) -> "FilterIndex":
+        import pandas as pd
+        from src.documents import iter_merged_frames
+        merged_df = pd.concat(list(iter_merged_frames(data_path)), ignore_index=True)
+        return cls.from_frame(merged_df, source_signature(data_path))
+
+    # --- snapshots ---
+
+    def save(self, path: str = FILTER_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "columns": self.columns,
+                "postings": self.postings,
+                "values": self.values,
+                "source_signature": self.source_signature,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = FILTER_INDEX_PATH) -> "FilterIndex":
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        return cls(state["columns"], state["postings"], state["values"], state["source_signature"])
+
+    # --- queries ---
+
+    def match(self, query: str) -> QueryMatch:
+        """
+        Finds the longest known entities in the query, left to right.
+        Criticality levels only count when written as e.g. 'high criticality'.
+        """
+        words = tokenize(query)
+        matched = QueryMatch()
+        i = 0
+        while i < len(words):
+            hit = self._longest_entity(words, i)
+            if hit is None:
+                if words[i] not in STOPWORDS:
+                    matched.residual.append(words[i])
+                i += 1
+                continue
+            name, key, length = hit
+            value = self.values[name][key]
+            if value not in matched.filters.setdefault(name, []):
+                matched.filters[name].append(value)
+            i += length
+        return matched
+
+    def _longest_entity(self, words: list, start: int):
+        best = None
+        for name in FILTER_FIELDS:
+            for length in range(min(self._max_words[name], len(words) - start), 0, -1):
+                key = " ".join(words[start:start + length])
+                if key not in self.postings[name]:
+                    continue
+                if name == "criticality_level":
+                    if words[start + length:start + length + 1] != ["criticality"]:
+                        continue
+                    length += 1
+                if best is None or length > best[2]:
+                    best = (name, key, length)
+                break
+        return best
+
+    def lookup(self, filters: dict) -> np.ndarray:
+        """
+        Returns the row positions matching every field (values within a field are OR-ed).
+        """
+        result = None
+        for name, values in filters.items():
+            keys = [" ".join(tokenize(v)) for v in values]
+            rows = [self.postings[name][k] for k in keys if k in self.postings[name]]
+            rows = np.unique(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int32)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return result if result is not None else np.empty(0, dtype=np.int32)
+
+    def answer(self, match: QueryMatch, max_rows: int = FILTER_INDEX_MAX_ROWS) -> str:
+        """
+        Renders every matching material, most critical first, as a compact answer for the agent.
+        """
+        rows = self.lookup(match.filters)
+        description = "; ".join(f"{name}={' or '.join(values)}" for name, values in match.filters.items())
+        if len(rows) == 0:
+            return f"No materials in the supply chain database match {description}."
+
+        rank = {level: i for i, level in enumerate(CRITICALITY_ORDER)}
+        levels = self.columns["criticality_level"][rows]
+        order = np.argsort([rank.get(level, len(rank)) for level in levels], kind="stable")
+        rows = rows[order]
+
+        counts = dict(zip(*np.unique(levels.astype(str), return_counts=True)))
+        summary = ", ".join(f"{level}: {counts[level]}" for level in CRITICALITY_ORDER if level in counts)
+        suppliers = len(np.unique(self.columns["supplier_id"][rows]))
+        lines = [f"Found {len(rows)} materials from {suppliers} suppliers matching {description} ({summary})."]
+        for row in rows[:max_rows]:
+            c = {name: self.columns[name][row] for name in ROW_COLUMNS}
+            lines.append(
+                f"- Material '{c['material_name']}' (ID: {c['material_id']}), Criticality Level: "
+                f"{c['criticality_level']}, supplied by '{c['supplier_name']}' (ID: {c['supplier_id']}) "
+                f"from {c['city']}, {c['country']}"
+            )
+        if len(rows) > max_rows:
+            lines.append(f"... and {len(rows) - max_rows} more.")
+        return "\n".join(lines)
+
+
+def source_signature(data_path: str = DATA_PATH) -> tuple:
+    """
+    Identifies the current version of both CSVs by size and modification time.
+    """
+    signature = []
+    for name in ("materials.csv", "suppliers.csv"):
+        stat = os.stat(os.path.join(data_path, name))
+        signature.append((name, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def build_filter_index(data_path: str = DATA_PATH, path: str = FILTER_INDEX_PATH) -> FilterIndex:
+    """
+    Builds the index from the CSVs and writes its snapshot.
+    """
+    index = FilterIndex.from_csv(data_path)
+    index.save(path)
+    return index
+
+
+_filter_index = None
+_filter_index_lock = threading.Lock()
+
+
+def get_filter_index() -> FilterIndex:
+    """
+    Returns the process-wide index, loading the snapshot if it is still current
+    and rebuilding it from the CSVs otherwise. A snapshot rewritten by vectordb.py
+    since the last call is loaded again.
+    """
+    global _filter_index
+    check_indexes()
+    if _filter_index is None:
+        with _filter_index_lock:
+            if _filter_index is None:
+                index = None
+                if os.path.exists(FILTER_INDEX_PATH):
+                    index = FilterIndex.load(FILTER_INDEX_PATH)
+                    if index.source_signature != source_signature(DATA_PATH):
+                        index = None
+                _filter_index = index or build_filter_index(DATA_PATH, FILTER_INDEX_PATH)
+    return _filter_index
+
+
+def reset_filter_index():
+    """
+    Drops the process-wide index; the next get_filter_index() loads the current snapshot.
+    """
+    global _filter_index
+    with _filter_index_lock:
+        _filter_index = None
@@ -0,0 +1,62 @@
+"""
+Notices when vectordb.py has rewritten the index snapshots in db/ under a running process.
+
+The process-wide getters (get_retriever, get_filter_index, get_exposure_index) call
+check_indexes() before handing out their instance. When the modification times of the
+snapshots changed since the last check, the retriever reopens its vector store and lexical
+index (keeping the embedding model) and the filter and exposure indexes are reloaded on
+next use. Searches already running finish with the components they started with.
+"""
+import os
+import threading
+
+from src.config import DB_PATH, FLAT_INDEX_PATH, FILTER_INDEX_PATH, LEXICAL_INDEX_PATH, EXPOSURE_INDEX_PATH
+
+# Files rewritten by every vectordb.py run (and by whichever vector store is in use)
+INDEX_FILES = [FILTER_INDEX_PATH, LEXICAL_INDEX_PATH, EXPOSURE_INDEX_PATH, FLAT_INDEX_PATH + "manifest.json",
+               DB_PATH + "chroma.sqlite3"]
+
+
+def index_signature(paths: list = INDEX_FILES) -> tuple:
+    signature = []
+    for path in paths:
+        try:
+            signature.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+_signature = None
+_signature_lock = threading.Lock()
+
+
+def check_indexes() -> bool:
+    """
+    Reloads the process-wide indexes if the snapshots changed since the last call (the first
+    call only records them). Returns whether they changed.
+    """
+    global _signature
+    signature = index_signature(INDEX_FILES)
+    with _signature_lock:
+        if _signature is None or signature == _signature:
+            _signature = signature
+            return False
+        _signature = signature
+    reload_indexes()
+    return True
+
+
+def reload_indexes():
+    """
+    Makes the process-wide retriever, filter index and exposure index use the current snapshots.
+    """
+    from src.exposure_index import reset_exposure_index
+    from src.filter_index import reset_filter_index
+    from src.retriever import peek_retriever
+
+    retriever = peek_retriever()
+    if retriever is not None:
+        retriever.reload_indexes()
+    reset_filter_index()
+    reset_exposure_index()
@@ -0,0 +1,246 @@
+"""
+BM25 inverted index over the document text, for exact identifiers the embedding model
+handles poorly: material and supplier IDs ("M001", "S851") and part codes
+("ECO-298-ULTRA Drum Container").
+
+Documents are split into lower-cased words, plus every hyphenated code as one extra token
+("eco-298-ultra"), so a full part code matches more strongly than its separate words.
+The postings are kept in compressed sparse rows: for term t, slots[offsets[t]:offsets[t + 1]]
+are the documents containing it (in slot order) and tfs the matching term frequencies.
+A query only touches the postings of its own terms, and terms found in more than
+LEXICAL_MAX_DOC_FRACTION of the documents are skipped, so a lookup stays well under a
+millisecond even on a million documents.
+
+Like FlatVectorStore, the index is updated by upsert()/delete() during ingest and the
+changes are applied in one vectorised pass by persist(). The snapshot lives next to the
+vector store (LEXICAL_INDEX_PATH). The retriever merges its results with the vector hits
+using reciprocal_rank_fusion().
+"""
+import math
+import os
+import pickle
+import re
+
+import numpy as np
+from src.config import LEXICAL_INDEX_PATH, LEXICAL_MAX_DOC_FRACTION, LEXICAL_RRF_K
+
+# Words, with hyphenated codes kept whole; their parts are added as separate tokens
+_TOKEN = re.compile(r"\w+(?:-\w+)*")
+
+# Standard BM25 parameters: term frequency saturation and document length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list:
+    tokens = _TOKEN.findall(text.lower())
+    return tokens + [part for token in tokens if "-" in token for part in token.split("-")]
+
+
+class LexicalIndex:
+    """
+    BM25 index from document ids to their text. Writes become visible to search() after persist().
+    """
+
+    def __init__(self, ids: list = None, vocab: dict = None, offsets: np.ndarray = None,
+                 slots: np.ndarray = None, tfs: np.ndarray = None, lengths: np.ndarray = None):
+        self._set_state(ids, vocab, offsets, slots, tfs, lengths)
+
+    def _set_state(self, ids, vocab, offsets, slots, tfs, lengths):
+        # slot -> document id, and token -> term id
+        self.ids = ids if ids is not None else []
+        self.vocab = vocab if vocab is not None else {}
+        self.offsets = offsets if offsets is not None else np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        self.slots = slots if slots is not None else np.zeros(0, dtype=np.int32)
+        self.tfs = tfs if tfs is not None else np.zeros(0, dtype=np.uint16)
+        self.lengths = lengths if lengths is not None else np.zeros(0, dtype=np.int32)
+        # BM25 length normalization per document, computed once
+        average = self.lengths.mean() if len(self.lengths) else 1.0
+        self._norms = (BM25_K1 * (1 - BM25_B + BM25_B * self.lengths / max(average, 1e-9))).astype(np.float32)
+        # Pending changes: new documents get new slots, replaced or deleted ones are marked dead
+        self._slot_of = None
+        self._alive = None
+        self._new_ids = []
+        self._segments = []
+
+    def __len__(self):
+        return len(self.ids)
+
+    # --- writes ---
+
+    def _ensure_writable(self):
+        if self._slot_of is None:
+            self._slot_of = {doc_id: slot for slot, doc_id in enumerate(self.ids)}
+            self._alive = np.ones(len(self.ids), dtype=bool)
+
+    def _retire(self, doc_id):
+        slot = self._slot_of.pop(doc_id, None)
+        if slot is not None:
+            self._alive[slot] = False
+
+    def upsert(self, ids: list, texts: list):
+        """
+        Adds or replaces documents. Their text is tokenized straight away and not kept.
+        """
+        self._ensure_writable()
+        first = len(self.ids) + len(self._new_ids)
+        for offset, doc_id in enumerate(ids):
+            self._retire(doc_id)
+            self._slot_of[doc_id] = first + offset
+        self._new_ids.extend(ids)
+        self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+        self._segments.append(self._tokenize(list(texts), first))
+
+    def delete(self, ids: list):
+        self._ensure_writable()
+        for doc_id in ids:
+            self._retire(doc_id)
+
+    def reset(self):
+        """
+        Removes every document.
+        """
+        self._ensure_writable()
+        self._slot_of.clear()
+        self._alive[:] = False
+
+    def _tokenize(self, texts: list, first_slot: int) -> tuple:
+        # pandas is only needed to build the index, not to load or query its snapshot
+        import pandas as pd
+
+        # Same tokens as tokenize(), a column at a time
+        flat = pd.Series(texts, dtype=object).str.lower().str.findall(_TOKEN).explode().dropna()
+        codes = flat[flat.str.contains("-", regex=False)]
+        flat = pd.concat([flat, codes.str.split("-").explode()])
+        docs = flat.index.to_numpy(dtype=np.int64)
+        lengths = np.bincount(docs, minlength=len(texts)).astype(np.int32)
+
+        token_codes, uniques = pd.factorize(flat.to_numpy())
+        term_ids = np.array([self.vocab.setdefault(token, len(self.vocab)) for token in uniques], dtype=np.int64)
+        # One posting per (term, document) pair, counting repeats as the term frequency
+        pairs, tfs = np.unique(term_ids[token_codes] << 32 | (docs + first_slot), return_counts=True)
+        return ((pairs >> 32).astype(np.int32), (pairs & 0xFFFFFFFF).astype(np.int32),
+                np.minimum(tfs, np.iinfo(np.uint16).max).astype(np.uint16), lengths)
+
+    def persist(self, path: str = LEXICAL_INDEX_PATH):
+        """
+        Applies the pending changes and writes the snapshot.
+        """
+        if self._slot_of is not None:
+            self._compact()
+        self.save(path)
+
+    def _compact(self):
+        # 1. COLLECT THE POSTINGS OF THE CURRENT AND THE NEW DOCUMENTS
+        terms = [np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int32), np.diff(self.offsets))]
+        slots = [self.slots]
+        tfs = [self.tfs]
+        lengths = [self.lengths]
+        for segment_terms, segment_slots, segment_tfs, segment_lengths in self._segments:
+            terms.append(segment_terms)
+            slots.append(segment_slots)
+            tfs.append(segment_tfs)
+            lengths.append(segment_lengths)
+        terms, slots, tfs, lengths = (np.concatenate(parts) for parts in (terms, slots, tfs, lengths))
+
+        # 2. DROP DEAD DOCUMENTS AND RENUMBER THE REST
+        keep = self._alive[slots]
+        terms, slots, tfs = terms[keep], slots[keep], tfs[keep]
+        new_slot = np.cumsum(self._alive, dtype=np.int32) - 1
+        slots = new_slot[slots]
+        all_ids = self.ids + self._new_ids
+        ids = [all_ids[i] for i in np.flatnonzero(self._alive).tolist()]
+        lengths = lengths[self._alive]
+
+        # 3. REBUILD THE CSR ARRAYS
+        # Within each term the postings are already in slot order (the current ones first, then
+        # each batch of new documents), so a stable sort by term alone is enough
+        counts = np.bincount(terms, minlength=len(self.vocab))
+        used = counts > 0
+        vocab = self.vocab
+        if used.sum() < 0.9 * len(vocab):
+            # Many terms left without postings (e.g. after a full rebuild): drop them
+            new_term = np.cumsum(used, dtype=np.int32) - 1
+            vocab = {token: int(new_term[t]) for token, t in vocab.items() if used[t]}
+            terms = new_term[terms]
+            counts = counts[used]
+        order = np.argsort(terms, kind="stable")
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        self._set_state(ids, vocab, offsets, slots[order].astype(np.int32), tfs[order], lengths)
+
+    # --- snapshots ---
+
+    def save(self, path: str = LEXICAL_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "ids": self.ids,
+                "vocab": self.vocab,
+                "offsets": self.offsets,
+                "slots": self.slots,
+                "tfs": self.tfs,
+                "lengths": self.lengths,
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = LEXICAL_INDEX_PATH) -> "LexicalIndex":
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        return cls(state["ids"], state["vocab"], state["offsets"], state["slots"], state["tfs"], state["lengths"])
+
+    @classmethod
+    def open(cls, path: str = LEXICAL_INDEX_PATH) -> "LexicalIndex":
+        """
+        Loads the snapshot, or starts an empty index if there is none yet.
+        """
+        return cls.load(path) if os.path.exists(path) else cls()
+
+    # --- queries ---
+
+    def search(self, query: str, k: int = 10, max_doc_fraction: float = LEXICAL_MAX_DOC_FRACTION) -> list:
+        """
+        Returns up to k (document id, BM25 score) pairs, best first.
+        """
+        n = len(self.ids)
+        max_postings = max(1, int(max_doc_fraction * n))
+        term_ids = {self.vocab[token] for token in tokenize(query) if token in self.vocab}
+        slots, weights = [], []
+        for term in term_ids:
+            start, end = self.offsets[term], self.offsets[term + 1]
+            df = end - start
+            if df == 0 or df > max_postings:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            term_slots = self.slots[start:end]
+            tf = self.tfs[start:end].astype(np.float32)
+            slots.append(term_slots)
+            weights.append(idf * tf * (BM25_K1 + 1) / (tf + self._norms[term_slots]))
+        if not slots:
+            return []
+        if len(slots) == 1:
+            candidates, scores = slots[0], weights[0]
+        else:
+            candidates, inverse = np.unique(np.concatenate(slots), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(weights))
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [(self.ids[slot], float(score)) for slot, score in zip(candidates[order].tolist(), scores[order].tolist())]
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = LEXICAL_RRF_K) -> list:
+    """
+    Merges several ranked lists of ids: each id scores sum(1 / (k + rank)) over the lists it
+    appears in (rank starting at 1). Returns the ids, best first; ties keep the order in
+    which the ids first appear, so earlier lists win them.
+    """
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
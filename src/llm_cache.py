@@ -0,0 +1,165 @@
+"""
+Persistent cache of LLM completions (LangChain's BaseCache interface), in SQLite.
+
+Keys are blake2b digests of the model settings (LangChain's llm_string: model name,
+temperature, stop words, ...) and of the full prompt, so any change to the task, the tool
+observations or the model is a miss. Only deterministic calls are cached: if the settings
+carry a non-zero temperature the cache stays out of the way. When the stored completions
+grow beyond max_mb the least recently used ones are evicted.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from langchain_core.caches import BaseCache
+from langchain_core.messages import message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, Generation
+from src.config import LLM_CACHE_PATH, LLM_CACHE_MAX_MB
+
+_TEMPERATURE = re.compile(r"""["']temperature["']\s*[:,]\s*([0-9.]+)""")
+
+
+def is_deterministic(llm_string: str) -> bool:
+    return all(float(t) == 0 for t in _TEMPERATURE.findall(llm_string))
+
+
+def _dump_generations(generations: list) -> str:
+    rows = []
+    for g in generations:
+        row = {"text": g.text, "info": g.generation_info}
+        if isinstance(g, ChatGeneration):
+            row["message"] = message_to_dict(g.message)
+        rows.append(row)
+    return json.dumps(rows)
+
+
+def _load_generations(value: str) -> list:
+    generations = []
+    for row in json.loads(value):
+        if "message" in row:
+            generations.append(ChatGeneration(message=messages_from_dict([row["message"]])[0],
+                                              generation_info=row["info"]))
+        else:
+            generations.append(Generation(text=row["text"], generation_info=row["info"]))
+    return generations
+
+
+class SQLiteLLMCache(BaseCache):
+    """
+    Completion cache shared by all agent runs in the process (and across runs via the file).
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, max_mb: float = LLM_CACHE_MAX_MB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        # The server runs agents on worker threads; every access goes through the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS completions (
+                key BLOB PRIMARY KEY,
+                model TEXT,
+                value TEXT,
+                size INTEGER,
+                last_used REAL
+            );
+            CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used);
+        """)
+        self._size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> bytes:
+        h = hashlib.blake2b(digest_size=16)
+        h.update(llm_string.encode("utf-8"))
+        h.update(b"\0")
+        h.update(prompt.encode("utf-8"))
+        return h.digest()
+
+    def lookup(self, prompt: str, llm_string: str):
+        if not is_deterministic(llm_string):
+            return None
+        key = self._key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM completions WHERE key = ?", (key,)).fetchone()
+            try:
+                generations = _load_generations(row[0]) if row else None
+            except (ValueError, KeyError, TypeError):
+                # Written by an incompatible version; it will be overwritten on update
+                generations = None
+            if generations is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return generations
+
+    def update(self, prompt: str, llm_string: str, return_val) -> None:
+        if not is_deterministic(llm_string):
+            return
+        key = self._key(prompt, llm_string)
+        value = _dump_generations(return_val)
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM completions WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                               (key, llm_string[:200], value, size, time.time()))
+            self._size += size - (old[0] if old else 0)
+            if self._size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # Drop the least recently used completions until 90% of the budget is free again
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute("SELECT key, size FROM completions ORDER BY last_used").fetchall()
+        evicted = []
+        for key, size in rows:
+            if self._size <= target:
+                break
+            evicted.append((key,))
+            self._size -= size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return {"entries": entries, "size_mb": round(self._size / 1024 / 1024, 2), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+_llm_cache = None
+
+
+def get_llm_cache() -> SQLiteLLMCache:
+    """
+    Process-wide cache instance, opened on first use.
+    """
+    global _llm_cache
+    if _llm_cache is None:
+        _llm_cache = SQLiteLLMCache()
+    return _llm_cache
+
+
+def llm_cache_stats() -> dict:
+    """
+    Stats of the process-wide cache, without opening it if nothing has used it yet.
+    """
+    return _llm_cache.stats() if _llm_cache is not None else {}
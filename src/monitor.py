@@ -0,0 +1,389 @@
+"""
+Continuous monitoring mode (python main.py --monitor).
+
+A generator pipeline that runs until interrupted:
+
+    poll_news -> drop_seen -> analyse -> persist
+
+Each poll fetches the configured news queries. Articles whose URL was already processed, or
+whose title is a near-duplicate (close SimHash and mostly the same words) of a recent one,
+are dropped before any analysis. Only genuinely new headlines go through the risk
+pipeline (and, optionally, the LLM agent). Every processed article and the publication
+watermark are stored in SQLite, so a restart picks up where the last run stopped and the
+cost of a run grows with the amount of new news, not with the polling frequency.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from src.config import (
+    FAST_PATH_NEWS_QUERIES, MONITOR_STORE_PATH, MONITOR_INTERVAL_SECONDS,
+    MONITOR_SIMHASH_DISTANCE, MONITOR_TITLE_SIMILARITY, MONITOR_LOOKBACK_HOURS,
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SIMHASH_BITS = 64
+
+
+def title_words(title: str) -> list:
+    return _TOKEN_PATTERN.findall(title.lower())
+
+
+def simhash(title: str) -> int:
+    """
+    64-bit SimHash of a title over its character trigrams. Word-level features are too few
+    in a headline to be stable; trigrams keep a changed word or an appended source name to
+    a handful of bits.
+    """
+    text = " ".join(title_words(title))
+    shingles = {text[i:i + 3] for i in range(max(1, len(text) - 2))}
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class SimHashIndex:
+    """
+    Near-duplicate title lookup. Candidates are stored hashes within max_distance bits,
+    found without comparing against every entry: the hash is cut into `bands` bands, and two
+    hashes that close differ in at most max_distance // bands bits of at least one band. Each
+    band of the new hash is looked up as is and with every variant that close, so only
+    entries sharing a (nearly) equal 16-bit band are compared. A candidate only counts as a
+    duplicate if the word sets of the two titles also overlap by at least min_similarity, so
+    "fire in Taiwan" and "fire in Vietnam" stay separate stories.
+
+    Entries remember when they were added; evict() drops those older than the lookback window.
+    """
+
+    def __init__(self, max_distance: int = MONITOR_SIMHASH_DISTANCE,
+                 min_similarity: float = MONITOR_TITLE_SIMILARITY, bands: int = 4):
+        radius = max_distance // bands
+        if radius > 2:
+            raise ValueError(f"max_distance {max_distance} needs more than {bands} bands; "
+                             f"at most {3 * bands - 1} bits are supported")
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        width = SIMHASH_BITS // bands
+        self._bands = [(i * width, SIMHASH_BITS if i == bands - 1 else (i + 1) * width) for i in range(bands)]
+        self._buckets = [{} for _ in self._bands]
+        # XOR masks turning a band into each value within `radius` bits of it, per band width
+        self._probes = {}
+        for start, end in self._bands:
+            bits = [1 << b for b in range(end - start)]
+            masks = [0]
+            if radius >= 1:
+                masks += bits
+            if radius == 2:
+                masks += [a | b for i, a in enumerate(bits) for b in bits[i + 1:]]
+            self._probes[end - start] = masks
+        self._entries = deque()  # (added_at, entry), oldest first
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _keys(self, h: int):
+        for (start, end), buckets in zip(self._bands, self._buckets):
+            yield buckets, (h >> start) & ((1 << (end - start)) - 1)
+
+    def add(self, h: int, title: str, key: str, added_at: datetime = None):
+        entry = (h, frozenset(title_words(title)), key)
+        for buckets, band in self._keys(h):
+            buckets.setdefault(band, []).append(entry)
+        self._entries.append((added_at or datetime.now(timezone.utc), entry))
+
+    def evict(self, before: datetime) -> int:
+        """
+        Drops the entries added before `before` (entries are expected in the order added).
+        Returns how many were dropped.
+        """
+        evicted = 0
+        while self._entries and self._entries[0][0] < before:
+            _, entry = self._entries.popleft()
+            for buckets, band in self._keys(entry[0]):
+                bucket = buckets[band]
+                bucket.remove(entry)
+                if not bucket:
+                    del buckets[band]
+            evicted += 1
+        return evicted
+
+    def _candidates(self, h: int):
+        for (start, end), (buckets, band) in zip(self._bands, self._keys(h)):
+            for mask in self._probes[end - start]:
+                yield from buckets.get(band ^ mask, ())
+
+    def find(self, h: int, title: str):
+        """
+        Returns the key of a stored near-duplicate, or None.
+        """
+        words = set(title_words(title))
+        for other, other_words, key in self._candidates(h):
+            if bin(h ^ other).count("1") <= self.max_distance and jaccard(words, other_words) >= self.min_similarity:
+                return key
+        return None
+
+
+def _to_signed(h: int) -> int:
+    # SQLite integers are signed 64-bit
+    return h - (1 << 64) if h >= 1 << 63 else h
+
+
+def _parse_time(value: str):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class MonitorStore:
+    """
+    SQLite store of every processed article (analysed, near-duplicate or stale) and of the
+    watermark: the newest publication time processed so far.
+    """
+
+    def __init__(self, path: str = MONITOR_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                simhash INTEGER,
+                published_at TEXT,
+                processed_at TEXT,
+                status TEXT,          -- risk, no_match, agent, duplicate or stale
+                priority TEXT,
+                summary TEXT,
+                duplicate_of TEXT
+            );
+            CREATE INDEX IF NOT EXISTS articles_processed_at ON articles (processed_at);
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def seen_urls(self, urls: list) -> set:
+        seen = set()
+        urls = list(urls)
+        for start in range(0, len(urls), 500):
+            chunk = urls[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT url FROM articles WHERE url IN ({','.join('?' * len(chunk))})", chunk)
+            seen.update(url for url, in rows)
+        return seen
+
+    def recent_simhashes(self, since: datetime) -> list:
+        """
+        (simhash, title, url, processed_at) of the analysed articles processed since `since`,
+        oldest first.
+        """
+        rows = self.conn.execute(
+            "SELECT simhash, title, url, processed_at FROM articles "
+            "WHERE status NOT IN ('duplicate', 'stale') AND processed_at >= ? ORDER BY processed_at",
+            (since.isoformat(),))
+        return [(h & ((1 << 64) - 1), title or "", url, _parse_time(processed_at))
+                for h, title, url, processed_at in rows]
+
+    def record(self, article: dict, h: int, status: str, priority: str = None, summary: str = None,
+               duplicate_of: str = None):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (article.get("url"), article.get("title"), _to_signed(h), article.get("publishedAt"),
+             datetime.now(timezone.utc).isoformat(), status, priority, summary, duplicate_of))
+
+    def watermark(self):
+        row = self.conn.execute("SELECT value FROM state WHERE key = 'watermark'").fetchone()
+        return _parse_time(row[0]) if row else None
+
+    def set_watermark(self, value: datetime):
+        self.conn.execute("INSERT OR REPLACE INTO state VALUES ('watermark', ?)", (value.isoformat(),))
+
+    def counts(self) -> dict:
+        return dict(self.conn.execute("SELECT status, COUNT(*) FROM articles GROUP BY status"))
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+@dataclass
+class ArticleResult:
+    url: str
+    title: str
+    status: str
+    priority: str = None
+    summary: str = None
+
+
+@dataclass
+class Cycle:
+    """
+    One poll as it moves through the pipeline.
+    """
+    number: int
+    fetched: list
+    new: list = field(default_factory=list)        # [(article, simhash)]
+    already_seen: int = 0
+    stale: int = 0
+    duplicates: int = 0
+    results: list = field(default_factory=list)    # [ArticleResult]
+
+
+# --- pipeline stages ---
+
+def poll_news(queries: list = FAST_PATH_NEWS_QUERIES, interval: float = MONITOR_INTERVAL_SECONDS,
+              iterations: int = None, fetch=None, sleep=time.sleep):
+    """
+    Yields one Cycle per poll, with every article the queries returned (once, even if
+    several queries found it).
+    """
+    if fetch is None:
+        from src.data_ingestion import fetch_disruption_news_many
+        fetch = fetch_disruption_news_many
+    number = 0
+    while iterations is None or number < iterations:
+        if number:
+            sleep(interval)
+        number += 1
+        results = fetch(queries)
+        articles = {a.get("url"): a for query_articles in results.values() for a in query_articles}
+        yield Cycle(number, list(articles.values()))
+
+
+def drop_seen(cycles, store: MonitorStore, index: SimHashIndex = None,
+              lookback_hours: float = MONITOR_LOOKBACK_HOURS):
+    """
+    Keeps only articles that are new: unknown URL, not older than the lookback window before
+    the watermark, and not a near-duplicate of a title seen within the window. Stale and
+    near-duplicate articles are recorded, so later polls drop them by URL.
+    """
+    lookback = timedelta(hours=lookback_hours)
+    index = index if index is not None else SimHashIndex()
+    for h, title, url, processed_at in store.recent_simhashes(datetime.now(timezone.utc) - lookback):
+        index.add(h, title, url, processed_at)
+
+    for cycle in cycles:
+        index.evict(datetime.now(timezone.utc) - lookback)
+        seen = store.seen_urls(a.get("url") for a in cycle.fetched)
+        watermark = store.watermark()
+        cutoff = watermark - lookback if watermark else None
+        for article in cycle.fetched:
+            url = article.get("url")
+            if not url or url in seen:
+                cycle.already_seen += 1
+                continue
+            seen.add(url)
+            title = article.get("title", "")
+            h = simhash(title)
+            published = _parse_time(article.get("publishedAt"))
+            if cutoff and published and published < cutoff:
+                cycle.stale += 1
+                store.record(article, h, "stale")
+                continue
+            duplicate_of = index.find(h, title)
+            if duplicate_of:
+                cycle.duplicates += 1
+                store.record(article, h, "duplicate", duplicate_of=duplicate_of)
+                continue
+            index.add(h, title, url)
+            cycle.new.append((article, h))
+        store.commit()
+        yield cycle
+
+
+def analyse(cycles, pipeline=None, agent_executor=None):
+    """
+    Scores new articles with the deterministic risk pipeline. With an agent executor, the
+    headlines it could not place are handed to the agent together, once per cycle.
+    """
+    if pipeline is None:
+        from src.risk_pipeline import RiskPipeline
+        pipeline = RiskPipeline()
+    for cycle in cycles:
+        unmatched = []
+        for article, _ in cycle.new:
+            item = pipeline.assess(article.get("title", ""), article.get("url", ""))
+            if item.exposures:
+                cycle.results.append(ArticleResult(item.url, item.headline, "risk", item.priority_tag,
+                                                   pipeline.format_report([item])))
+            else:
+                unmatched.append(article)
+
+        agent_output = None
+        if agent_executor is not None and unmatched:
+            from src.prompts import HEADLINES_TASK
+            headlines = "\n".join(f"- {a.get('title', '')}" for a in unmatched)
+            agent_output = agent_executor.invoke({"input": HEADLINES_TASK.format(headlines=headlines)})["output"]
+        for article in unmatched:
+            status = "agent" if agent_output is not None else "no_match"
+            cycle.results.append(ArticleResult(article.get("url"), article.get("title", ""), status, None, agent_output))
+        yield cycle
+
+
+def persist(cycles, store: MonitorStore):
+    """
+    Records every analysed article and advances the watermark, one transaction per cycle.
+    """
+    for cycle in cycles:
+        hashes = {article.get("url"): (article, h) for article, h in cycle.new}
+        watermark = store.watermark()
+        for result in cycle.results:
+            article, h = hashes[result.url]
+            store.record(article, h, result.status, result.priority, result.summary)
+            published = _parse_time(article.get("publishedAt"))
+            if published and (watermark is None or published > watermark):
+                watermark = published
+        if watermark is not None:
+            store.set_watermark(watermark)
+        store.commit()
+        yield cycle
+
+
+def run_monitor(queries: list = FAST_PATH_NEWS_QUERIES, interval: float = MONITOR_INTERVAL_SECONDS,
+                iterations: int = None, llm_fallback: bool = False, stub_llm: bool = False,
+                store_path: str = MONITOR_STORE_PATH):
+    """
+    Polls the news every `interval` seconds (forever, or `iterations` times) and prints the
+    risks found in new headlines.
+    """
+    store = MonitorStore(store_path)
+    agent_executor = None
+    if llm_fallback:
+        from src.agent_factory import build_agent_executor, build_llm
+        agent_executor = build_agent_executor(build_llm(stub=stub_llm), verbose=False)
+
+    print(f"--- Monitoring {len(queries)} news queries every {interval:.0f}s (store: {store_path}) ---")
+    cycles = persist(analyse(drop_seen(poll_news(queries, interval, iterations), store),
+                             agent_executor=agent_executor), store)
+    try:
+        for cycle in cycles:
+            risks = [r for r in cycle.results if r.status == "risk"]
+            print(f"\n[{datetime.now():%Y-%m-%d %H:%M:%S}] Poll {cycle.number}: {len(cycle.fetched)} fetched, "
+                  f"{len(cycle.new)} new, {cycle.already_seen} already seen, {cycle.duplicates} near-duplicates, "
+                  f"{cycle.stale} stale, {len(risks)} risks")
+            for result in risks:
+                print(result.summary)
+            agent_summary = next((r.summary for r in cycle.results if r.status == "agent"), None)
+            if agent_summary:
+                print(f"Agent on unmatched headlines:\n{agent_summary}")
+    except KeyboardInterrupt:
+        print("\nMonitor stopped.")
+    finally:
+        print(f"Stored articles by status: {store.counts()}")
+        store.close()
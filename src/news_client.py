@@ -0,0 +1,227 @@
+"""
+Pooled, cached client for the GNews search API.
+
+One requests.Session keeps TLS connections alive between calls, responses are cached per
+query (whitespace normalized, case kept) for NEWS_CACHE_TTL_SECONDS, identical queries that
+are already in flight share a single request, several query variants can be fetched concurrently, and failed
+requests are retried a bounded number of times with exponential backoff.
+The base URL is configurable, so the client can be pointed at a local stub server, and
+StaticNewsSource can replace it entirely for offline runs.
+"""
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from src.config import (
+    GNEWS_API_BASE, NEWS_CACHE_TTL_SECONDS, NEWS_MAX_RESULTS, NEWS_MAX_RETRIES,
+    NEWS_MAX_WORKERS, NEWS_TIMEOUT_SECONDS,
+)
+from src.tracing import current_span_id, span
+
+# Worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def normalize_query(query: str) -> str:
+    # Cache and coalescing key only; the query is sent upstream unchanged. Case is kept, since
+    # GNews reads upper-case OR/AND/NOT as operators and lower-case ones as words
+    return " ".join(query.split())
+
+
+class NewsClient:
+    """
+    Thread-safe GNews client. Methods return lists of article dicts, or [] on failure. Each
+    caller gets its own list, so changing it leaves the cache alone.
+    """
+
+    def __init__(self, api_key: str = None, base_url: str = GNEWS_API_BASE,
+                 timeout: float = NEWS_TIMEOUT_SECONDS, max_retries: int = NEWS_MAX_RETRIES,
+                 backoff_seconds: float = 0.5, cache_ttl: float = NEWS_CACHE_TTL_SECONDS,
+                 max_workers: int = NEWS_MAX_WORKERS, max_results: int = NEWS_MAX_RESULTS):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.cache_ttl = cache_ttl
+        self.max_results = max_results
+
+        # Keep-alive connection pool large enough for the fan-out workers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gnews")
+
+        self._lock = threading.Lock()
+        self._cache = {}      # normalize_query(query) -> (expires_at, articles)
+        self._in_flight = {}  # normalize_query(query) -> Future
+        self.requests_sent = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    def search(self, query: str) -> list:
+        """
+        Returns the articles for one query, from the cache when possible.
+        """
+        with span("news.search", queries=1):
+            return list(self._submit(query).result())
+
+    def search_many(self, queries: list) -> dict:
+        """
+        Fetches several query variants concurrently. Returns {query: articles}.
+        """
+        with span("news.search", queries=len(queries)):
+            futures = {query: self._submit(query) for query in queries}
+            return {query: list(future.result()) for query, future in futures.items()}
+
+    def _submit(self, query: str) -> Future:
+        key = normalize_query(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self.cache_hits += 1
+                future = Future()
+                future.set_result(cached[1])
+                return future
+            # Someone is already fetching this exact query: wait for their answer
+            if key in self._in_flight:
+                self.coalesced += 1
+                return self._in_flight[key]
+            # The fetch runs on a pool thread; its span is parented to the caller's
+            future = self._executor.submit(self._fetch, key, query, current_span_id())
+            self._in_flight[key] = future
+        return future
+
+    def _fetch(self, key: str, query: str, parent_span: int = None) -> list:
+        try:
+            with span("news.fetch", parent=parent_span, query=query):
+                articles = self._request_with_retries(query)
+            if articles is not None:
+                with self._lock:
+                    self._cache[key] = (time.monotonic() + self.cache_ttl, articles)
+            return articles or []
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _request_with_retries(self, query: str):
+        # Returns the article list, or None if every attempt failed (failures are not cached)
+        params = {"q": query, "lang": "en", "max": self.max_results, "token": self.api_key}
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff_seconds * (2 ** attempt)
+            try:
+                with self._lock:
+                    self.requests_sent += 1
+                with span("news.request", attempt=attempt):
+                    response = self.session.get(f"{self.base_url}/search", params=params, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    retry_after = response.headers.get("Retry-After")
+                    if retry_after and retry_after.isdigit():
+                        delay = max(delay, float(retry_after))
+                    time.sleep(delay)
+                    continue
+                response.raise_for_status()
+                return response.json().get("articles", [])
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+                    continue
+                print(f"An error occurred while fetching news: {e}")
+                return None
+            except requests.exceptions.RequestException as e:
+                print(f"An error occurred while fetching news: {e}")
+                return None
+        return None
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests_sent": self.requests_sent,
+                "cache_hits": self.cache_hits,
+                "coalesced": self.coalesced,
+                "cached_queries": len(self._cache),
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+class StaticNewsSource:
+    """
+    Offline stand-in for NewsClient with the same search interface. Serves a fixed list of
+    articles, returning those whose title contains any word of the query.
+    """
+    is_configured = True
+
+    def __init__(self, articles: list, max_results: int = NEWS_MAX_RESULTS):
+        self.articles = articles
+        self.max_results = max_results
+        self._lock = threading.Lock()
+        self.searches = 0
+
+    @classmethod
+    def from_file(cls, path: str) -> "StaticNewsSource":
+        """
+        Reads one headline per line.
+        """
+        with open(path, encoding="utf-8") as f:
+            titles = [line.strip() for line in f if line.strip()]
+        return cls([{"title": title, "url": f"stub://news/{i}", "description": "", "source": {"name": "stub"}}
+                    for i, title in enumerate(titles)])
+
+    def search(self, query: str) -> list:
+        with self._lock:
+            self.searches += 1
+        words = query.lower().split()
+        return [a for a in self.articles if any(w in a["title"].lower() for w in words)][:self.max_results]
+
+    def search_many(self, queries: list) -> dict:
+        return {query: self.search(query) for query in queries}
+
+    def clear_cache(self):
+        pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"stub_articles": len(self.articles), "searches": self.searches}
+
+    def close(self):
+        pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_news_client() -> NewsClient:
+    """
+    Returns the process-wide client, created on first use with GNEWS_API_KEY from the environment.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = NewsClient(api_key=os.getenv("GNEWS_API_KEY"))
+    return _client
+
+
+def set_news_client(client):
+    """
+    Replaces the process-wide client, e.g. with a StaticNewsSource for offline runs.
+    """
+    global _client
+    with _client_lock:
+        _client = client
@@ -0,0 +1,181 @@
+"""
+CPU embedding backend: an int8-quantized ONNX export of the sentence-transformers model,
+run with onnxruntime and the standalone `tokenizers` package, without torch.
+
+The export is made once (this needs torch and sentence-transformers, e.g. on a dev box):
+
+    python -m src.onnx_embeddings export                 # EMBEDDING_MODEL into ONNX_MODEL_DIR
+    python -m src.onnx_embeddings export --keep-fp32     # also keep the unquantized model
+
+and leaves, in ONNX_MODEL_DIR/<model>/:
+    model_int8.onnx          the transformer with int8 weights (dynamic quantization)
+    tokenizer.json           the model's fast tokenizer
+    embedding_config.json    pooling, normalization and maximum sequence length
+
+At query time OnnxEmbeddings reproduces the sentence-transformers pipeline (tokenize,
+transformer, mean pooling over real tokens, L2 normalization) in NumPy. Set
+EMBEDDING_BACKEND = "onnx" in src/config.py to use it for ingest and queries, after
+checking agreement with `python -m benchmarks.bench_onnx_embeddings`.
+"""
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from src.config import EMBEDDING_MODEL, ONNX_MODEL_DIR, ONNX_THREADS
+
+MODEL_FILE = "model_int8.onnx"
+FP32_MODEL_FILE = "model.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+CONFIG_FILE = "embedding_config.json"
+
+
+def model_path(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR) -> str:
+    return os.path.join(model_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    LangChain Embeddings backed by the int8 ONNX export of `model_name`.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR,
+                 threads: int = ONNX_THREADS, batch_size: int = 32, model_file: str = MODEL_FILE):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        path = model_path(model_name, model_dir)
+        if not os.path.exists(os.path.join(path, model_file)):
+            raise FileNotFoundError(f"No ONNX export of '{model_name}' in {path}. "
+                                    f"Create it with: python -m src.onnx_embeddings export")
+        with open(os.path.join(path, CONFIG_FILE), encoding="utf-8") as f:
+            self.config = json.load(f)
+        self.model_name = model_name
+        self.batch_size = batch_size
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        # Pad to the longest text of each batch
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(os.path.join(path, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list) -> np.ndarray:
+        """
+        Returns a float32 array with one embedding per text.
+        """
+        if not texts:
+            return np.zeros((0, self.config["dim"]), dtype=np.float32)
+        # Similar lengths together, so batches carry little padding
+        order = np.argsort([len(t) for t in texts], kind="stable")
+        vectors = np.empty((len(texts), self.config["dim"]), dtype=np.float32)
+        for start in range(0, len(texts), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            vectors[batch] = self._encode_batch([texts[i] for i in batch])
+        return vectors
+
+    def _encode_batch(self, texts: list) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feed = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feed.items() if k in self._input_names})[0]
+        return pool(hidden, attention_mask, normalize=self.config["normalize"])
+
+    def embed_documents(self, texts: list) -> list:
+        return self.encode(list(texts)).tolist()
+
+    def embed_query(self, text: str) -> list:
+        return self.encode([text])[0].tolist()
+
+
+def pool(hidden: np.ndarray, attention_mask: np.ndarray, normalize: bool = True) -> np.ndarray:
+    """
+    Mean of the token vectors over real (non-padding) tokens, as sentence-transformers'
+    Pooling(mean) does, optionally L2-normalized.
+    """
+    mask = attention_mask[..., None].astype(np.float32)
+    vectors = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+    if normalize:
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors.astype(np.float32)
+
+
+def export_onnx(model_name: str = EMBEDDING_MODEL, model_dir: str = ONNX_MODEL_DIR, keep_fp32: bool = False) -> str:
+    """
+    Exports the transformer of a sentence-transformers model to ONNX, quantizes its weights
+    to int8 and saves the tokenizer and pooling settings next to it. Returns the directory.
+    """
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    # 1. LOAD THE PYTORCH MODEL AND CHECK ITS PIPELINE
+    st_model = SentenceTransformer(model_name, device="cpu")
+    modules = list(st_model)
+    pooling = next((m for m in modules if type(m).__name__ == "Pooling"), None)
+    if pooling is None or pooling.get_pooling_mode_str() != "mean":
+        raise ValueError(f"'{model_name}' does not use mean pooling; only mean pooling is supported.")
+    if any(type(m).__name__ == "Dense" for m in modules):
+        raise ValueError(f"'{model_name}' has a Dense layer after pooling, which is not supported.")
+    tokenizer = st_model.tokenizer
+    transformer = modules[0].auto_model.eval()
+
+    path = model_path(model_name, model_dir)
+    os.makedirs(path, exist_ok=True)
+    fp32_file = os.path.join(path, FP32_MODEL_FILE)
+
+    # 2. EXPORT THE TRANSFORMER WITH DYNAMIC BATCH AND SEQUENCE AXES
+    sample = tokenizer(["supply chain disruption at a port"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(transformer, tuple(sample[name] for name in input_names), fp32_file,
+                          input_names=input_names, output_names=["last_hidden_state"],
+                          dynamic_axes=dynamic_axes, opset_version=14)
+
+    # 3. QUANTIZE THE WEIGHTS TO INT8 (ACTIVATIONS ARE QUANTIZED ON THE FLY)
+    quantize_dynamic(fp32_file, os.path.join(path, MODEL_FILE), weight_type=QuantType.QInt8)
+    if not keep_fp32:
+        os.remove(fp32_file)
+
+    # 4. SAVE THE TOKENIZER AND THE POOLING SETTINGS
+    tokenizer.backend_tokenizer.save(os.path.join(path, TOKENIZER_FILE))
+    config = {
+        "model_name": model_name,
+        "dim": st_model.get_sentence_embedding_dimension(),
+        "max_seq_length": st_model.max_seq_length,
+        "normalize": any(type(m).__name__ == "Normalize" for m in modules),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+    }
+    with open(os.path.join(path, CONFIG_FILE), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+
+    size_mb = os.path.getsize(os.path.join(path, MODEL_FILE)) / 1024 / 1024
+    print(f"Exported '{model_name}' to {path} ({size_mb:.1f} MB int8 model)")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the int8 ONNX export of the embedding model.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="Export and quantize the model (needs torch).")
+    export_parser.add_argument("--model", default=EMBEDDING_MODEL, help="sentence-transformers model name.")
+    export_parser.add_argument("--out", default=ONNX_MODEL_DIR, help="Directory the model folder is written to.")
+    export_parser.add_argument("--keep-fp32", action="store_true",
+                               help="Also keep the unquantized ONNX model (model.onnx).")
+    args = parser.parse_args()
+    if args.command == "export":
+        export_onnx(args.model, args.out, keep_fp32=args.keep_fp32)
@@ -0,0 +1,117 @@
+"""
+Parallel tool execution for the ReAct agent.
+
+The stock AgentExecutor runs one tool per LLM round-trip. Here the LLM may write several
+independent Action / Action Input pairs in one step (e.g. a few news queries, or every
+location it extracted); they are run together on a thread pool and their observations are
+appended to the scratchpad in the order the actions were written.
+"""
+import contextvars
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.agents.output_parsers import ReActSingleInputOutputParser
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+
+# Appended to the task so the LLM knows it may batch independent actions
+PARALLEL_ACTIONS_INSTRUCTIONS = """
+    You may request several independent actions in a single step by writing several
+    'Action:' / 'Action Input:' pairs one after another before the Observation. They will
+    be executed in parallel and you will receive one Observation per action, in order.
+    """
+
+_ACTION_PATTERN = re.compile(
+    r"Action\s*\d*\s*:[\s]*(.*?)[\s]*Action\s*\d*\s*Input\s*\d*\s*:[\s]*(.*?)(?=\n\s*Action\s*\d*\s*:|\Z)",
+    re.DOTALL,
+)
+
+
+class MultiActionReActOutputParser(ReActSingleInputOutputParser):
+    """
+    ReAct output parser that returns a list of AgentActions when the LLM wrote
+    several Action / Action Input pairs, and behaves like the stock parser otherwise.
+    """
+
+    def parse(self, text: str):
+        matches = list(_ACTION_PATTERN.finditer(text))
+        if len(matches) <= 1:
+            return super().parse(text)
+
+        actions = []
+        for i, match in enumerate(matches):
+            tool_name = match.group(1).strip()
+            tool_input = match.group(2).strip().strip('"')
+            # The first action carries the thought that precedes it, so the scratchpad
+            # reads like a normal ReAct trace with one Observation per action
+            start = 0 if i == 0 else match.start()
+            actions.append(AgentAction(tool_name, tool_input, text[start:match.end()].strip()))
+        return actions
+
+    @property
+    def _type(self) -> str:
+        return "multi-action-react"
+
+
+class ParallelAgentExecutor:
+    """
+    Minimal ReAct loop that executes all actions from one planning step concurrently.
+    Takes the same inputs and returns the same keys ("output", "intermediate_steps")
+    as AgentExecutor.invoke().
+    """
+
+    def __init__(self, agent, tools: list, max_workers: int = 8, max_iterations: int = 15,
+                 handle_parsing_errors: bool = True, verbose: bool = False):
+        self.agent = agent
+        self.tools = {t.name: t for t in tools}
+        self.max_workers = max_workers
+        self.max_iterations = max_iterations
+        self.handle_parsing_errors = handle_parsing_errors
+        self.verbose = verbose
+
+    def _run_tool(self, action: AgentAction, config: dict = None) -> str:
+        tool = self.tools.get(action.tool)
+        if tool is None:
+            return f"{action.tool} is not a valid tool, try one of [{', '.join(self.tools)}]."
+        try:
+            return str(tool.invoke(action.tool_input, config=config))
+        except Exception as e:
+            return f"Error while running {action.tool}: {e}"
+
+    def _run_actions(self, actions: list, pool: ThreadPoolExecutor, config: dict = None) -> list:
+        if len(actions) == 1:
+            return [self._run_tool(actions[0], config)]
+        # Each tool runs in a copy of this thread's context, so its trace spans nest under this step
+        contexts = [contextvars.copy_context() for _ in actions]
+        return list(pool.map(lambda ctx, action: ctx.run(self._run_tool, action, config), contexts, actions))
+
+    def invoke(self, inputs: dict, config: dict = None) -> dict:
+        """
+        config is passed on to the agent and the tools, e.g. {"callbacks": [StepLog()]}.
+        """
+        steps = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="agent-tool") as pool:
+            for iteration in range(self.max_iterations):
+                try:
+                    output = self.agent.invoke({**inputs, "intermediate_steps": steps}, config=config)
+                except OutputParserException as e:
+                    if not self.handle_parsing_errors:
+                        raise
+                    # Same recovery as AgentExecutor(handle_parsing_errors=True)
+                    observation = "Invalid Format: Missing 'Action:' after 'Thought:'"
+                    steps.append((AgentAction("_Exception", observation, str(e.llm_output or e)), observation))
+                    continue
+
+                if isinstance(output, AgentFinish):
+                    return {**inputs, "output": output.return_values.get("output"), "intermediate_steps": steps}
+
+                actions = [output] if isinstance(output, AgentAction) else list(output)
+                start = time.perf_counter()
+                observations = self._run_actions(actions, pool, config)
+                if self.verbose:
+                    print(f"--- Step {iteration + 1}: ran {len(actions)} action(s) in "
+                          f"{time.perf_counter() - start:.2f}s: {', '.join(a.tool for a in actions)} ---")
+                steps.extend(zip(actions, observations))
+
+        return {**inputs, "output": "Agent stopped due to iteration limit or time limit.", "intermediate_steps": steps}
@@ -0,0 +1,61 @@
+"""
+Prompt templates shipped with the project.
+
+The ReAct prompt used to be fetched with hub.pull("hwchase17/react") on every start, which
+costs a network round-trip and fails offline. It is vendored here verbatim instead, next to
+the task descriptions given to the agent by main.py and the service mode.
+"""
+from langchain_core.prompts import PromptTemplate
+
+# hwchase17/react from the LangChain hub
+REACT_TEMPLATE = """Answer the following questions as best you can. You have access to the following tools:
+
+{tools}
+
+Use the following format:
+
+Question: the input question you must answer
+Thought: you should always think about what to do
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+... (this Thought/Action/Action Input/Observation can repeat N times)
+Thought: I now know the final answer
+Final Answer: the final answer to the original input question
+
+Begin!
+
+Question: {input}
+Thought:{agent_scratchpad}"""
+
+
+# The full risk analysis run
+MASTER_TASK = """
+    Your mission is to act as a world-class Supply Chain Risk Analyst.
+    Your goal is to be a resilient and resourceful researcher.
+
+    First, use the news_scanner_tool to find potential disruption events.
+    **CRITICAL INSTRUCTION: If your initial search query returns no results, DO NOT give up. You MUST try again with a different, broader, or simpler query. Break the problem down. For example, if 'factory fire OR port congestion' fails, try searching for just 'factory fire', and then separately for 'port congestion'. Continue this process until you find relevant information.**
+
+    For each relevant news headline you find, you must use the supply_chain_retriever_tool to check if the mentioned location or company affects our supply chain. The tool will return a 'Criticality Level' for any match it finds. When you have several headlines to check, pass them all at once to the supply_chain_batch_retriever_tool, one headline per line. When a headline names a specific country, city or supplier, use the supplier_exposure_tool to see everything that location or supplier affects.
+
+    Finally, provide a consolidated final answer. Your answer MUST be a prioritized list, ordered from most critical to least critical. For each identified risk, you MUST begin the line with a priority score tag:
+    - [P0 - CRITICAL] for 'High' criticality events.
+    - [P1 - WARNING] for 'Medium' criticality events.
+    - [P2 - INFO] for 'Low' criticality events.
+
+    If after several different search attempts you still find no risks, then and only then should you state that clearly. Begin your analysis.
+    """
+
+# Checking a given list of headlines, e.g. those the deterministic fast path could not place
+HEADLINES_TASK = """
+    You are a Supply Chain Risk Analyst. For each of these news headlines, use the supply_chain_retriever_tool
+    (or the supply_chain_batch_retriever_tool for several at once) to check whether it affects our supply chain.
+    Give a prioritised list tagged [P0 - CRITICAL], [P1 - WARNING] or [P2 - INFO], or state that none apply.
+
+{headlines}
+    """
+
+
+def get_react_prompt() -> PromptTemplate:
+    return PromptTemplate.from_template(REACT_TEMPLATE)
@@ -0,0 +1,344 @@
+"""
+Process-wide retriever service for the supply chain vector database.
+
+Loading the sentence-transformers model and opening the vector store takes
+seconds, so it is done once per process, on first use (or on an explicit warm-up),
+and then shared by the agent tools, test_retriever.py and any other entry point.
+
+When the lexical index exists (vectordb.py builds it next to the vector store), every
+search also runs a BM25 lookup and merges both result lists by reciprocal-rank fusion,
+so identifiers such as "M001" or "ECO-298-ULTRA" find their document even when the
+embedding does not.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from src.config import (
+    VECTOR_BACKEND, EMBEDDING_MODEL, EMBEDDING_BACKEND, EMBEDDING_CACHE_ENABLED,
+    RETRIEVER_TOP_K, RETRIEVER_MAX_DISTANCE, RETRIEVER_SUMMARY_MAX_CHARS,
+    LEXICAL_INDEX_ENABLED, LEXICAL_INDEX_PATH, LEXICAL_FUSION_CANDIDATES,
+)
+from src.embedding import embedding_key, load_embeddings
+from src.embedding_cache import CachedEmbeddings, get_embedding_cache
+from src.filter_index import CRITICALITY_ORDER
+from src.index_watch import check_indexes
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.tracing import span
+from src.vectorstore import get_vector_store
+
+
+@dataclass(frozen=True)
+class LoadedComponents:
+    """
+    The model and indexes one search works with. Replaced as a whole on reload, never changed
+    in place, so a search that started with one set finishes with it.
+    """
+    embeddings: object
+    store: object
+    lexical: LexicalIndex = None
+
+
+class SupplyChainRetriever:
+    """
+    Lazily loads the embedding model and the vector store and keeps them resident.
+    Safe to call from several threads; only the first caller pays the load cost.
+    """
+
+    def __init__(self, backend: str = VECTOR_BACKEND, model_name: str = EMBEDDING_MODEL,
+                 embedding_backend: str = EMBEDDING_BACKEND, store=None, embeddings=None,
+                 lexical_index: LexicalIndex = None):
+        """
+        `store`, `embeddings` and `lexical_index` take already opened components (e.g. in
+        benchmarks); given a store, nothing is loaded from the configured paths.
+        """
+        self.backend = backend
+        self.model_name = model_name
+        self.embedding_backend = embedding_backend
+        self._load_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._loaded = LoadedComponents(embeddings, store, lexical_index) if store is not None else None
+        self.load_seconds = 0.0 if store is not None else None
+        self.query_count = 0
+        self.total_query_seconds = 0.0
+        self.last_query_seconds = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded is not None
+
+    def _ensure_loaded(self) -> LoadedComponents:
+        # Fast path: already loaded, no locking needed
+        loaded = self._loaded
+        if loaded is not None:
+            return loaded
+
+        with self._load_lock:
+            # Another thread may have finished loading while we were waiting
+            if self._loaded is None:
+                start = time.perf_counter()
+                with span("retriever.load_model", model=self.model_name, backend=self.embedding_backend):
+                    embeddings = load_embeddings(self.model_name, self.embedding_backend)
+                if EMBEDDING_CACHE_ENABLED:
+                    # Repeated queries are answered from the on-disk embedding cache
+                    embeddings = CachedEmbeddings(embeddings, get_embedding_cache(
+                        embedding_key(self.model_name, self.embedding_backend)))
+                store, lexical = self._open_indexes()
+                self.load_seconds = time.perf_counter() - start
+                self._loaded = LoadedComponents(embeddings, store, lexical)
+                print(f"Retriever loaded '{self.model_name}' ({self.embedding_backend}) and the '{self.backend}' vector store in {self.load_seconds:.2f}s")
+            return self._loaded
+
+    def _open_indexes(self) -> tuple:
+        with span("retriever.open_store", backend=self.backend):
+            store = get_vector_store(self.backend)
+        lexical = None
+        if LEXICAL_INDEX_ENABLED and os.path.exists(LEXICAL_INDEX_PATH):
+            with span("retriever.load_lexical"):
+                lexical = LexicalIndex.load(LEXICAL_INDEX_PATH)
+        elif LEXICAL_INDEX_ENABLED:
+            print(f"No lexical index at {LEXICAL_INDEX_PATH}; run `python vectordb.py` to build it. "
+                  f"Searching the vectors only.")
+        return store, lexical
+
+    def warm_up(self) -> float:
+        """
+        Loads the model and the vector store and runs one throwaway query so that the
+        first real lookup does not pay for any remaining lazy initialisation.
+        Returns the load time in seconds.
+        """
+        loaded = self._ensure_loaded()
+        loaded.store.query([loaded.embeddings.embed_query("warm up")], k=1)
+        if loaded.lexical is not None and len(loaded.lexical):
+            # The flat store builds its id lookup on the first fetch by id
+            loaded.store.get(loaded.lexical.ids[:1])
+        return self.load_seconds
+
+    def _record_query(self, seconds: float, count: int = 1):
+        with self._stats_lock:
+            self.query_count += count
+            self.total_query_seconds += seconds
+            self.last_query_seconds = seconds / count
+
+    def similarity_search(self, query: str, k: int = 1, where: dict = None):
+        """
+        Returns the k closest documents for the query, optionally restricted by a Chroma-style
+        metadata filter such as {"country": "Taiwan"}.
+        """
+        return [doc for doc, _ in self.search_with_scores(query, k=k, max_distance=None, where=where)]
+
+    def embed_query(self, query: str) -> list:
+        """
+        Returns the query's embedding, e.g. to look it up in the answer cache before searching.
+        """
+        embeddings = self._ensure_loaded().embeddings
+        with span("embed.query"):
+            return embeddings.embed_query(query)
+
+    def search_with_scores(self, query: str, k: int = RETRIEVER_TOP_K, max_distance: float = RETRIEVER_MAX_DISTANCE,
+                           where: dict = None, query_embedding: list = None) -> list:
+        """
+        Returns up to k (document, distance) pairs, closest first, dropping any hit
+        further away than max_distance. Pass query_embedding if it is already known.
+        """
+        loaded = self._ensure_loaded()
+        start = time.perf_counter()
+        if query_embedding is None:
+            with span("embed.query"):
+                query_embedding = loaded.embeddings.embed_query(query)
+        candidates = _candidates(loaded, k)
+        with span("vector.search", k=candidates, filtered=where is not None) as s:
+            hits = loaded.store.query([query_embedding], k=candidates, where=where)[0]
+            s.set(hits=len(hits))
+        lexical_ids = set()
+        if loaded.lexical is not None:
+            hits, lexical_ids = self._fuse(loaded, query, query_embedding, hits, k, where)
+        self._record_query(time.perf_counter() - start)
+        # Exact term matches are kept even when their embedding is far from the query's
+        return [(doc, distance) for doc, distance in hits
+                if max_distance is None or distance <= max_distance or doc.id in lexical_ids]
+
+    @staticmethod
+    def _fuse(loaded: LoadedComponents, query: str, query_embedding, hits: list, k: int, where: dict = None) -> tuple:
+        """
+        Merges the vector hits with the lexical index's top candidates by reciprocal-rank
+        fusion; `hits` should hold _candidates(loaded, k) vector hits, so both rankings cover the same
+        pool whatever k is. Documents found only lexically are fetched from the store (subject
+        to `where`) and given their real distance to the query. Returns the fused top k
+        (document, distance) pairs and the ids that matched lexically.
+        """
+        candidates = _candidates(loaded, k)
+        with span("lexical.search", k=candidates) as s:
+            lexical_ids = [doc_id for doc_id, _ in loaded.lexical.search(query, k=candidates)]
+            s.set(hits=len(lexical_ids))
+        if not lexical_ids:
+            return hits[:k], set()
+        found = {doc.id: (doc, distance) for doc, distance in hits}
+        missing = [doc_id for doc_id in lexical_ids if doc_id not in found]
+        if missing:
+            with span("lexical.fetch", documents=len(missing)):
+                query_vector = np.array(query_embedding, dtype=np.float32)
+                query_vector /= max(np.linalg.norm(query_vector), 1e-12)
+                for doc, vector in loaded.store.get(missing, where=where):
+                    cosine = float(query_vector @ vector) / max(float(np.linalg.norm(vector)), 1e-12)
+                    # Squared L2 distance between unit vectors, as the stores report it
+                    found[doc.id] = (doc, max(0.0, 2.0 - 2.0 * cosine))
+        lexical_ids = [doc_id for doc_id in lexical_ids if doc_id in found]
+        # Lexical ranking first, so it wins ties: an exact identifier match beats an equally ranked neighbour
+        ranked = reciprocal_rank_fusion([lexical_ids, [doc.id for doc, _ in hits]])
+        return [found[doc_id] for doc_id in ranked[:k]], set(lexical_ids)
+
+    def batch_similarity_search(self, queries: list, k: int = 1) -> list:
+        """
+        Returns the k closest documents for each query, in the same order as the queries.
+        All queries are encoded in a single model batch and sent as one multi-vector
+        store query, instead of one forward pass and one lookup per query.
+        """
+        if not queries:
+            return []
+        loaded = self._ensure_loaded()
+        start = time.perf_counter()
+
+        # One encode() call for the whole batch (cached queries are skipped)
+        with span("embed.query", queries=len(queries)):
+            query_embeddings = loaded.embeddings.embed_documents(list(queries))
+
+        # One store query with all the vectors
+        candidates = _candidates(loaded, k)
+        with span("vector.search", k=candidates, queries=len(queries)):
+            batch_hits = loaded.store.query(query_embeddings, k=candidates)
+        if loaded.lexical is not None:
+            batch_hits = [self._fuse(loaded, query, embedding, hits, k)[0]
+                          for query, embedding, hits in zip(queries, query_embeddings, batch_hits)]
+        results = [[doc for doc, _ in hits] for hits in batch_hits]
+
+        self._record_query(time.perf_counter() - start, count=len(queries))
+        return results
+
+    def stats(self) -> dict:
+        """
+        Returns load and query timings, e.g. to check that steady-state lookups take milliseconds.
+        """
+        loaded = self._loaded
+        with self._stats_lock:
+            avg = self.total_query_seconds / self.query_count if self.query_count else None
+            cache = getattr(loaded.embeddings, "cache", None) if loaded is not None else None
+            return {
+                "backend": self.backend,
+                "embedding_backend": self.embedding_backend,
+                "loaded": self.is_loaded,
+                "load_seconds": self.load_seconds,
+                "query_count": self.query_count,
+                "avg_query_ms": avg * 1000 if avg is not None else None,
+                "last_query_ms": self.last_query_seconds * 1000 if self.last_query_seconds is not None else None,
+                "embedding_cache": cache.stats() if cache is not None else None,
+                "lexical_documents": len(loaded.lexical) if loaded is not None and loaded.lexical is not None else None,
+            }
+
+    def reset(self):
+        """
+        Drops the loaded model and vector store; the next query loads them again. Searches
+        already running finish with the components they started with.
+        """
+        with self._load_lock:
+            self._loaded = None
+            self.load_seconds = None
+
+    def reload_indexes(self):
+        """
+        Reopens the vector store and the lexical index, e.g. after vectordb.py rebuilt them,
+        keeping the embedding model. Does nothing if nothing has been loaded yet.
+        """
+        with self._load_lock:
+            loaded = self._loaded
+            if loaded is None:
+                return
+            store, lexical = self._open_indexes()
+            self._loaded = LoadedComponents(loaded.embeddings, store, lexical)
+
+
+def _candidates(loaded: LoadedComponents, k: int) -> int:
+    # Fusion ranks over a fixed-size pool, so the top k does not depend on k itself
+    return max(k, LEXICAL_FUSION_CANDIDATES) if loaded.lexical is not None else k
+
+
+def group_hits(hits: list) -> list:
+    """
+    Groups (document, distance) hits by supplier and location. Returns one dict per group
+    with its maximum criticality, best distance and materials, most critical group first.
+    """
+    rank = {level: i for i, level in enumerate(CRITICALITY_ORDER)}
+    groups = {}
+    for doc, distance in hits:
+        m = doc.metadata
+        key = (m.get("supplier_id") or m.get("supplier_name"), m.get("city"), m.get("country"))
+        group = groups.setdefault(key, {
+            "supplier_name": m.get("supplier_name", "Unknown"),
+            "supplier_id": m.get("supplier_id"),
+            "city": m.get("city"),
+            "country": m.get("country"),
+            "max_criticality": None,
+            "best_distance": distance,
+            "materials": [],
+        })
+        level = m.get("criticality_level", "Unknown")
+        if group["max_criticality"] is None or rank.get(level, len(rank)) < rank.get(group["max_criticality"], len(rank)):
+            group["max_criticality"] = level
+        group["best_distance"] = min(group["best_distance"], distance)
+        group["materials"].append((m.get("material_name", "?"), m.get("material_id"), level))
+    return sorted(groups.values(), key=lambda g: (rank.get(g["max_criticality"], len(rank)), g["best_distance"]))
+
+
+def summarize_hits(hits: list, max_chars: int = RETRIEVER_SUMMARY_MAX_CHARS) -> str:
+    """
+    Renders grouped hits as a compact summary for the agent, cut to whole lines within max_chars.
+    """
+    groups = group_hits(hits)
+    lines = [f"Found {len(hits)} matching materials from {len(groups)} supplier locations:"]
+    for group in groups:
+        location = ", ".join(part for part in (group["city"], group["country"]) if part)
+        supplier = f"'{group['supplier_name']}'" + (f" ({group['supplier_id']})" if group["supplier_id"] else "")
+        materials = ", ".join(
+            f"'{name}'" + (f" ({mid}, {level})" if mid else f" ({level})") for name, mid, level in group["materials"]
+        )
+        lines.append(
+            f"- {supplier}" + (f" in {location}" if location else "")
+            + f" | Criticality Level: {group['max_criticality']} | {materials}"
+        )
+
+    summary = lines[0]
+    for shown, line in enumerate(lines[1:]):
+        remaining = len(groups) - shown
+        more = f"\n... and {remaining} more supplier locations."
+        if len(summary) + 1 + len(line) + len(more) > max_chars:
+            return summary + more
+        summary += "\n" + line
+    return summary
+
+
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> SupplyChainRetriever:
+    """
+    Returns the process-wide retriever, creating it (but not loading it) on first call.
+    If vectordb.py rebuilt the indexes since the last call, it reopens them first.
+    """
+    global _retriever
+    check_indexes()
+    if _retriever is None:
+        with _retriever_lock:
+            if _retriever is None:
+                _retriever = SupplyChainRetriever()
+    return _retriever
+
+
+def peek_retriever():
+    """
+    The process-wide retriever if one was created, without creating it.
+    """
+    return _retriever
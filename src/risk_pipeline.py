@@ -0,0 +1,212 @@
+"""
+Deterministic, LLM-free risk scoring for news headlines.
+
+All supplier names, cities and countries from the catalogue are compiled into one
+Aho-Corasick automaton, so each headline is scanned in a single pass whatever the number
+of entities. Matches are joined to the materials through the filter index and ranked into
+P0/P1/P2 by their highest criticality. Headlines that mention nothing we know about are
+returned separately, e.g. for the LLM agent to look at.
+"""
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+from src.filter_index import CRITICALITY_ORDER, FilterIndex, get_filter_index
+
+# Entity fields searched for in headlines, most specific first
+ENTITY_FIELDS = ["supplier_name", "city", "country"]
+
+# Other ways news commonly refers to the countries in suppliers.csv
+COUNTRY_ALIASES = {
+    "USA": ["United States", "U.S."],
+    "UK": ["United Kingdom", "Britain", "England", "Scotland"],
+    "South Korea": ["Korea"],
+}
+
+PRIORITY_TAGS = {
+    "Critical": "[P0 - CRITICAL]",
+    "High": "[P0 - CRITICAL]",
+    "Medium": "[P1 - WARNING]",
+    "Low": "[P2 - INFO]",
+}
+
+
+class AhoCorasick:
+    """
+    Case-insensitive multi-pattern matcher that only reports whole-word matches.
+    """
+
+    def __init__(self, patterns: list):
+        # patterns: list of (text, payload)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        self.payloads = []
+        for text, payload in patterns:
+            self._add(text.lower(), payload)
+        self._build_failure_links()
+
+    def _add(self, text: str, payload):
+        node = 0
+        for ch in text:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append((len(text), len(self.payloads)))
+        self.payloads.append(payload)
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[child] = self.goto[f].get(ch, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str) -> list:
+        """
+        Returns [(start, end, payload)] for the longest non-overlapping whole-word matches.
+        """
+        lowered = text.lower()
+        found = []
+        node = 0
+        for i, ch in enumerate(lowered):
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            for length, pattern_id in self.output[node]:
+                start, end = i - length + 1, i + 1
+                if (start == 0 or not lowered[start - 1].isalnum()) and (end == len(lowered) or not lowered[end].isalnum()):
+                    found.append((start, end, self.payloads[pattern_id]))
+
+        # Prefer the longest match where several overlap ("New Taipei" over "Taipei")
+        found.sort(key=lambda m: (m[0], -(m[1] - m[0])))
+        chosen = []
+        last_end = -1
+        for match in found:
+            if match[0] >= last_end:
+                chosen.append(match)
+                last_end = match[1]
+        return chosen
+
+
+@dataclass
+class Exposure:
+    """
+    One catalogue entity mentioned by a headline and the materials behind it.
+    """
+    field: str
+    value: str
+    rows: np.ndarray
+    max_criticality: str
+
+
+@dataclass
+class RiskItem:
+    headline: str
+    url: str
+    exposures: list = field(default_factory=list)
+
+    @property
+    def max_criticality(self) -> str:
+        levels = [e.max_criticality for e in self.exposures]
+        return min(levels, key=CRITICALITY_ORDER.index)
+
+    @property
+    def priority_tag(self) -> str:
+        return PRIORITY_TAGS[self.max_criticality]
+
+
+class RiskPipeline:
+    """
+    Scans headlines for known entities and turns them into a prioritised risk list.
+    """
+
+    def __init__(self, index: FilterIndex = None):
+        self.index = index or get_filter_index()
+        patterns = []
+        for name in ENTITY_FIELDS:
+            for value in self.index.values[name].values():
+                patterns.append((value, (name, value)))
+        for country, aliases in COUNTRY_ALIASES.items():
+            if " ".join(country.lower().split()) in self.index.values["country"]:
+                patterns.extend((alias, ("country", country)) for alias in aliases)
+        self.matcher = AhoCorasick(patterns)
+        # Countries of every city, so "Hsinchu, Taiwan" counts once, as the city. City names are
+        # not unique ("Valencia, Spain" and "Valencia, Venezuela"), hence a set per city.
+        self._city_countries = {}
+        for city, country in set(zip(self.index.columns["city"], self.index.columns["country"])):
+            self._city_countries.setdefault(city, set()).add(country)
+
+    def _exposure(self, name: str, value: str, countries: list = None) -> Exposure:
+        filters = {name: [value]}
+        if countries:
+            filters["country"] = countries
+        rows = self.index.lookup(filters)
+        levels = set(self.index.columns["criticality_level"][rows])
+        max_level = next((level for level in CRITICALITY_ORDER if level in levels), "Low")
+        return Exposure(name, value, rows, max_level)
+
+    def assess(self, headline: str, url: str = "") -> RiskItem:
+        entities = {}
+        for _, _, (name, value) in self.matcher.find(headline):
+            entities.setdefault((name, value), None)
+        mentioned_countries = {v for (n, v) in entities if n == "country"}
+        # A city named together with its country means that city only, not its namesakes elsewhere
+        city_countries = {v: sorted(self._city_countries.get(v, set()) & mentioned_countries)
+                          for (n, v) in entities if n == "city"}
+        covered_countries = {country for countries in city_countries.values() for country in countries}
+        item = RiskItem(headline, url)
+        for name, value in entities:
+            if name == "country" and value in covered_countries:
+                continue
+            exposure = self._exposure(name, value, city_countries.get(value) if name == "city" else None)
+            if len(exposure.rows):
+                item.exposures.append(exposure)
+        return item
+
+    def run(self, articles: list):
+        """
+        Takes GNews-style article dicts (title, url) and returns (risks, unmatched):
+        risk items sorted most critical first, and the articles that matched nothing.
+        """
+        risks, unmatched = [], []
+        for article in articles:
+            item = self.assess(article.get("title", ""), article.get("url", ""))
+            if item.exposures:
+                risks.append(item)
+            else:
+                unmatched.append(article)
+        rank = {level: i for i, level in enumerate(CRITICALITY_ORDER)}
+        risks.sort(key=lambda r: (rank[r.max_criticality], -sum(len(e.rows) for e in r.exposures)))
+        return risks, unmatched
+
+    def format_report(self, risks: list) -> str:
+        """
+        Renders the prioritised list in the same format the agent is asked to produce.
+        """
+        lines = []
+        columns = self.index.columns
+        for item in risks:
+            parts = []
+            for e in item.exposures:
+                suppliers = len(np.unique(columns["supplier_id"][e.rows]))
+                # No row has max_criticality when none has a known level (it is then ranked "Low")
+                worst = e.rows[columns["criticality_level"][e.rows] == e.max_criticality]
+                worst = worst[0] if len(worst) else e.rows[0]
+                parts.append(
+                    f"{e.value} ({e.field.replace('_', ' ')}): {len(e.rows)} materials from {suppliers} suppliers, "
+                    f"e.g. {columns['criticality_level'][worst]} criticality '{columns['material_name'][worst]}' "
+                    f"({columns['material_id'][worst]}) from '{columns['supplier_name'][worst]}'"
+                )
+            lines.append(f"{item.priority_tag} {item.headline} -> " + "; ".join(parts))
+        return "\n".join(lines)
@@ -0,0 +1,416 @@
+"""
+Long-running HTTP service mode (python main.py --serve).
+
+The embedding model, the vector store, the structured indexes and the agent (with its LLM
+client) are loaded once at start-up and stay resident, so each request only pays for its
+own work. The server is plain asyncio with JSON over HTTP/1.1; the blocking work (model
+inference, tool calls, LLM round-trips) runs on a thread pool.
+
+At most SERVER_MAX_CONCURRENCY requests run at a time; up to SERVER_MAX_QUEUE more wait
+their turn and anything beyond that is turned away with 429, so a burst cannot pile up
+unbounded work. A request that runs past SERVER_REQUEST_TIMEOUT_SECONDS gets a 504, but its
+worker thread cannot be stopped, so it keeps its place among the running requests until it
+actually finishes. Latencies are kept per endpoint and reported as p50/p95 on /metrics.
+
+Endpoints:
+    GET  /health     liveness and warm-up state
+    GET  /metrics    queue, concurrency and per-endpoint latency statistics
+    POST /retrieve   {"query": "..."} or {"queries": [...]}      supply chain lookup
+    POST /news       {"query": "..."} or {"queries": [...]}      news scan
+    POST /report     {"mode": "fast" | "agent", "headlines": [...]}   risk report
+"""
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from src.config import (
+    FAST_PATH_NEWS_QUERIES, SERVER_HOST, SERVER_PORT, SERVER_MAX_CONCURRENCY, SERVER_MAX_QUEUE,
+    SERVER_REQUEST_TIMEOUT_SECONDS, SERVER_LATENCY_WINDOW,
+)
+
+# Largest request body accepted
+MAX_BODY_BYTES = 1 << 20
+
+
+class HTTPError(Exception):
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def percentile(sorted_values: list, q: float):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class LatencyStats:
+    """
+    Request count, error count and a sliding window of latencies for one endpoint.
+    """
+
+    def __init__(self, window: int = SERVER_LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool):
+        with self._lock:
+            self.count += 1
+            self.errors += 0 if ok else 1
+            self._samples.append(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = sorted(self._samples)
+            count, errors = self.count, self.errors
+        to_ms = lambda s: round(s * 1000, 2) if s is not None else None
+        return {
+            "count": count,
+            "errors": errors,
+            "p50_ms": to_ms(percentile(samples, 50)),
+            "p95_ms": to_ms(percentile(samples, 95)),
+            "max_ms": to_ms(samples[-1] if samples else None),
+        }
+
+
+class AdmissionQueue:
+    """
+    Concurrency limit with a bounded waiting line. Use as `async with queue:`, or acquire()
+    and then release() or release_when_done(future).
+    """
+
+    def __init__(self, max_concurrency: int = SERVER_MAX_CONCURRENCY, max_queue: int = SERVER_MAX_QUEUE):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.waiting = 0
+        self.running = 0
+        self.rejected = 0
+        # Requests already answered (timed out or abandoned) whose work is still running
+        self.orphaned = 0
+
+    async def acquire(self):
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise HTTPError(HTTPStatus.TOO_MANY_REQUESTS, "Server busy, try again later.")
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    def release(self):
+        self.running -= 1
+        self._semaphore.release()
+
+    def release_when_done(self, future: asyncio.Future):
+        """
+        Keeps the slot taken until `future` finishes, after its request has been answered.
+        """
+        self.orphaned += 1
+
+        def done(f):
+            self.orphaned -= 1
+            if not f.cancelled():
+                f.exception()  # retrieved, so asyncio does not log it as never retrieved
+            self.release()
+
+        future.add_done_callback(done)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+    def snapshot(self) -> dict:
+        return {"running": self.running, "queued": self.waiting, "rejected": self.rejected,
+                "orphaned": self.orphaned, "max_concurrency": self.max_concurrency, "max_queue": self.max_queue}
+
+
+def _queries(body: dict) -> list:
+    queries = body.get("queries")
+    if queries is None and body.get("query"):
+        queries = [body["query"]]
+    if not queries or not all(isinstance(q, str) and q.strip() for q in queries):
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected a non-empty 'query' string or 'queries' list.")
+    return [q.strip() for q in queries]
+
+
+class RiskService:
+    """
+    The resident state behind the endpoints. The handlers are blocking and run on worker threads.
+    """
+
+    def __init__(self, stub_llm: bool = False):
+        self.stub_llm = stub_llm
+        self.agent_executor = None
+        self._pipeline = None
+        self._lock = threading.Lock()
+        self.warm = False
+        self.warm_up_seconds = None
+
+    def warm_up(self, load_model: bool = True):
+        """
+        Loads the indexes, the fast-path pipeline, the agent and (with load_model) the embedding
+        model and vector store.
+        """
+        from src.exposure_index import get_exposure_index
+        from src.retriever import get_retriever
+
+        start = time.perf_counter()
+        try:
+            get_exposure_index()
+            self.pipeline()
+            self.agent()
+            if load_model:
+                get_retriever().warm_up()
+        except Exception as e:
+            # Keep serving; everything above is loaded on first use by the requests that need it
+            print(f"Service warm-up failed: {type(e).__name__}: {e}")
+            return
+        self.warm_up_seconds = time.perf_counter() - start
+        self.warm = True
+        print(f"Service warm-up finished in {self.warm_up_seconds:.2f}s")
+
+    def pipeline(self):
+        """
+        Returns the fast-path RiskPipeline, rebuilt only when the filter index was reloaded.
+        """
+        from src.filter_index import get_filter_index
+        from src.risk_pipeline import RiskPipeline
+
+        index = get_filter_index()
+        pipeline = self._pipeline
+        if pipeline is None or pipeline.index is not index:
+            with self._lock:
+                pipeline = self._pipeline
+                if pipeline is None or pipeline.index is not index:
+                    pipeline = self._pipeline = RiskPipeline(index)
+        return pipeline
+
+    def agent(self):
+        """
+        Returns the agent executor, building it on first use (or after a failed warm-up).
+        """
+        from src.agent_factory import build_agent_executor, build_llm
+
+        if self.agent_executor is None:
+            with self._lock:
+                if self.agent_executor is None:
+                    self.agent_executor = build_agent_executor(build_llm(stub=self.stub_llm), verbose=False)
+        return self.agent_executor
+
+    def retrieve(self, body: dict) -> dict:
+        from agent import supply_chain_batch_retriever_tool, supply_chain_retriever_tool
+        queries = _queries(body)
+        if len(queries) == 1:
+            return {"result": supply_chain_retriever_tool.invoke(queries[0])}
+        return {"result": supply_chain_batch_retriever_tool.invoke("\n".join(queries))}
+
+    def news(self, body: dict) -> dict:
+        from src.data_ingestion import fetch_disruption_news_many
+        results = fetch_disruption_news_many(_queries(body))
+        # Each article once, even if several queries returned it
+        articles = list({a["url"]: a for query_articles in results.values() for a in query_articles}.values())
+        return {"articles": [{"title": a.get("title"), "url": a.get("url")} for a in articles]}
+
+    def report(self, body: dict) -> dict:
+        from src.prompts import HEADLINES_TASK, MASTER_TASK
+
+        mode = body.get("mode", "fast")
+        headlines = body.get("headlines")
+        if headlines is not None and not isinstance(headlines, list):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "'headlines' must be a list of strings.")
+
+        if mode == "fast":
+            if headlines is None:
+                articles = self.news({"queries": FAST_PATH_NEWS_QUERIES})["articles"]
+            else:
+                articles = [{"title": h, "url": ""} for h in headlines]
+            pipeline = self.pipeline()
+            risks, unmatched = pipeline.run(articles)
+            return {
+                "mode": mode,
+                "headlines": len(articles),
+                "risks": len(risks),
+                "report": pipeline.format_report(risks),
+                "unmatched": [a["title"] for a in unmatched],
+            }
+        if mode == "agent":
+            try:
+                agent_executor = self.agent()
+            except Exception as e:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE,
+                                f"The agent could not be loaded: {type(e).__name__}: {e}")
+            task = MASTER_TASK if headlines is None else HEADLINES_TASK.format(
+                headlines="\n".join(f"- {h}" for h in headlines))
+            from src.agent_budget import StepLog
+            step_log = StepLog(verbose=False)
+            result = agent_executor.invoke({"input": task}, config={"callbacks": [step_log]})
+            return {"mode": mode, "report": result["output"], "steps": step_log.steps}
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'mode' must be 'fast' or 'agent'.")
+
+
+class RiskServer:
+    """
+    Minimal asyncio HTTP/1.1 server (one request per connection) in front of a RiskService.
+    """
+
+    def __init__(self, service: RiskService, max_concurrency: int = SERVER_MAX_CONCURRENCY,
+                 max_queue: int = SERVER_MAX_QUEUE, timeout: float = SERVER_REQUEST_TIMEOUT_SECONDS):
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.started_at = time.time()
+        self.routes = {
+            "/retrieve": service.retrieve,
+            "/news": service.news,
+            "/report": service.report,
+        }
+        self.latency = {path: LatencyStats() for path in self.routes}
+        self.queue = None
+        self._pool = None
+        # Bound port, known once serve() is listening (useful with port 0)
+        self.port = None
+
+    def metrics(self) -> dict:
+        from src.answer_cache import answer_cache_stats
+        from src.llm_cache import llm_cache_stats
+        from src.news_client import get_news_client
+        from src.retriever import get_retriever
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "warm": self.service.warm,
+            "warm_up_seconds": self.service.warm_up_seconds,
+            "queue": self.queue.snapshot(),
+            "endpoints": {path: stats.snapshot() for path, stats in self.latency.items()},
+            "retriever": get_retriever().stats(),
+            "news": get_news_client().stats(),
+            "llm_cache": llm_cache_stats(),
+            "answer_cache": answer_cache_stats(),
+        }
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/health":
+            return HTTPStatus.OK, {"status": "ok", "warm": self.service.warm}
+        if method == "GET" and path == "/metrics":
+            return HTTPStatus.OK, self.metrics()
+        handler = self.routes.get(path)
+        if handler is None:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"Unknown endpoint {path}.")
+        if method != "POST":
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use POST for {path}.")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be JSON.")
+        if not isinstance(payload, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "The request body must be a JSON object.")
+
+        # Latency includes the time spent waiting in the queue, as the client sees it
+        start = time.perf_counter()
+        await self.queue.acquire()
+        future = asyncio.get_running_loop().run_in_executor(self._pool, handler, payload)
+        ok = False
+        try:
+            # Shielded: a timeout only stops the waiting, the thread runs on regardless
+            result = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+            ok = True
+            return HTTPStatus.OK, result
+        except asyncio.TimeoutError:
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, f"The request took longer than {self.timeout}s.")
+        finally:
+            self.latency[path].record(time.perf_counter() - start, ok)
+            if future.done():
+                self.queue.release()
+            else:
+                # Still running: it keeps its slot, so the limits hold until the thread is free again
+                self.queue.release_when_done(future)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                request_line = (await reader.readline()).decode("latin-1").split()
+                if len(request_line) != 3:
+                    raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+                method, target, _ = request_line
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large.")
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self._dispatch(method.upper(), target.split("?", 1)[0], body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": e.message}
+            except (ValueError, asyncio.IncompleteReadError):
+                status, payload = HTTPStatus.BAD_REQUEST, {"error": "Malformed request."}
+            except Exception as e:
+                status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"}
+
+            data = json.dumps(payload, default=str).encode("utf-8")
+            status = HTTPStatus(status)
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = SERVER_HOST, port: int = SERVER_PORT, warm: bool = True, load_model: bool = True):
+        self.queue = AdmissionQueue(self.max_concurrency, self.max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="service")
+        server = await asyncio.start_server(self._handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        print(f"Serving on http://{host}:{self.port} "
+              f"(concurrency {self.max_concurrency}, queue {self.max_queue})")
+        if warm:
+            # Warm up on its own thread, so the first requests do not queue behind it in the
+            # pool; /health reports when it is done
+            threading.Thread(target=self.service.warm_up, args=(load_model,), name="warm-up", daemon=True).start()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._pool.shutdown(wait=False)
+
+
+def run_server(host: str = SERVER_HOST, port: int = SERVER_PORT, max_concurrency: int = SERVER_MAX_CONCURRENCY,
+               max_queue: int = SERVER_MAX_QUEUE, stub_llm: bool = False, stub_news: str = None,
+               load_model: bool = True):
+    """
+    Runs the service until interrupted. stub_llm swaps the chat model for StubReActLLM and
+    stub_news (a file with one headline per line) replaces the GNews client.
+    """
+    if stub_news:
+        from src.news_client import StaticNewsSource, set_news_client
+        set_news_client(StaticNewsSource.from_file(stub_news))
+    server = RiskServer(RiskService(stub_llm=stub_llm), max_concurrency=max_concurrency, max_queue=max_queue)
+    try:
+        asyncio.run(server.serve(host, port, load_model=load_model))
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
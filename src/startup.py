@@ -0,0 +1,80 @@
+"""
+Start-up diagnostics for the command-line entry points.
+
+--profile-imports re-runs the same command under `python -X importtime` and summarises
+where the import time went, so regressions (a heavy library imported at module level again)
+are easy to spot.
+"""
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+_IMPORTED_AT = time.perf_counter()
+
+
+def seconds_since_start() -> float:
+    """
+    Wall time since the process started (Linux), or since this module was imported elsewhere.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # Fields after the command name; starttime is field 22 of the whole line
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - _IMPORTED_AT
+
+
+def parse_importtime(stderr: str):
+    """
+    Splits `-X importtime` output into [(depth, module, self_us, cumulative_us)] and the
+    remaining stderr lines.
+    """
+    rows, other = [], []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            other.append(line)
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows, other
+
+
+def format_import_report(rows: list, top: int = 15) -> str:
+    total = sum(self_us for _, _, self_us, _ in rows)
+    # The entry point's own imports and the modules they import directly
+    direct = sorted((r for r in rows if r[0] <= 1), key=lambda r: -r[3])[:top]
+    # Self time summed per top-level package, i.e. which libraries are expensive
+    packages = defaultdict(int)
+    for _, name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    heaviest = sorted(packages.items(), key=lambda p: -p[1])[:top]
+
+    lines = [f"\n--- Import profile: {len(rows)} modules, {total / 1e6:.2f}s total ---",
+             "Slowest imports, top two levels (cumulative):"]
+    lines += [f"  {cumulative / 1e3:9.1f} ms  {name}" for _, name, _, cumulative in direct]
+    lines.append("Slowest packages (self time):")
+    lines += [f"  {self_us / 1e3:9.1f} ms  {name}" for name, self_us in heaviest]
+    return "\n".join(lines)
+
+
+def profile_imports(argv: list, flag: str = "--profile-imports", top: int = 15) -> int:
+    """
+    Re-runs `python <argv without flag>` with -X importtime, passes its output through and
+    prints the import report afterwards. Returns the child's exit code.
+    """
+    command = [sys.executable, "-X", "importtime"] + [a for a in argv if a != flag]
+    start = time.perf_counter()
+    completed = subprocess.run(command, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    rows, other = parse_importtime(completed.stderr)
+    if other:
+        print("\n".join(other), file=sys.stderr)
+    print(format_import_report(rows, top))
+    print(f"Process wall time: {elapsed:.2f}s")
+    return completed.returncode
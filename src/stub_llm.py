@@ -0,0 +1,26 @@
+"""
+Deterministic offline stand-in for the chat model, for exercising full agent runs (and the
+service mode) without network access or API keys.
+"""
+from langchain_core.language_models.llms import LLM
+
+
+class StubReActLLM(LLM):
+    """
+    Scripted ReAct "model": scans the news once, then answers with what the tool returned.
+    It decides from the prompt alone, so one instance can serve concurrent runs.
+    """
+    news_query: str = "supply chain disruption"
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub-react"
+
+    def _call(self, prompt: str, stop: list = None, run_manager=None, **kwargs) -> str:
+        # The question and the scratchpad follow the last "Question:" of the ReAct prompt
+        scratchpad = prompt.rsplit("Question:", 1)[-1]
+        if "Observation:" not in scratchpad:
+            return (f"Thought: I should look for recent disruptions first.\n"
+                    f"Action: news_scanner_tool\nAction Input: {self.news_query}")
+        observation = scratchpad.rsplit("Observation:", 1)[1].split("\nThought:")[0].strip()
+        return f"Thought: I now know the final answer\nFinal Answer: {observation}"
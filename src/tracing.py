@@ -0,0 +1,235 @@
+"""
+Lightweight tracing: nested spans with wall time and memory deltas.
+
+    from src.tracing import span, traced
+
+    with span("vector.search", k=k):
+        ...
+
+    @traced("tool.news_scanner")
+    def news_scanner_tool(query): ...
+
+Tracing is off unless enable_tracing() has been called (main.py, agent.py and vectordb.py
+do so with --trace). While it is off, span() hands back one shared no-op context manager,
+so an instrumented hot path pays a global lookup and a function call. While it is on, each
+span records its parent (per thread and per asyncio task, through contextvars), its start
+offset, wall time and the change in the process's resident memory. Finished spans are
+exported as JSON lines (one object per span) and summarised per span name.
+"""
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+
+from src.config import TRACE_DIR, TRACE_MAX_SPANS
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_tracer = None
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+_statm_fd = None
+
+
+def _rss_bytes() -> int:
+    global _statm_fd
+    try:
+        # Kept open and re-read in place: two reads per span
+        if _statm_fd is None:
+            _statm_fd = os.open("/proc/self/statm", os.O_RDONLY)
+        return int(os.pread(_statm_fd, 128, 0).split()[1]) * _PAGE_SIZE
+    except (OSError, AttributeError):
+        # No /proc (macOS, Windows): fall back to the peak, which only ever grows
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "id", "parent", "start", "rss", "_token")
+
+    def __init__(self, tracer, name: str, parent: int, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs
+
+    def __enter__(self):
+        if self.parent is None:
+            self.parent = _current_span.get()
+        self.id = next(self.tracer._ids)
+        self._token = _current_span.set(self.id)
+        self.rss = _rss_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **attrs):
+        """
+        Adds attributes known only once the work is done, e.g. the number of hits.
+        """
+        self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        rss = _rss_bytes()
+        _current_span.reset(self._token)
+        record = {
+            "run": self.tracer.run_id,
+            "id": self.id,
+            "parent": self.parent,
+            "name": self.name,
+            "start_ms": round((self.start - self.tracer.started) * 1000, 3),
+            "duration_ms": round((end - self.start) * 1000, 3),
+            "rss_delta_mb": round((rss - self.rss) / 1024 / 1024, 3),
+            "thread": threading.current_thread().name,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        self.tracer._finish(record)
+        return False
+
+
+class Tracer:
+    """
+    Collects the finished spans of one run (at most max_spans; later ones are counted and dropped).
+    """
+
+    def __init__(self, run_name: str = "run", max_spans: int = TRACE_MAX_SPANS):
+        self.run_id = f"{run_name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.started = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _finish(self, record: dict):
+        with self._lock:
+            if len(self.spans) < self.max_spans:
+                self.spans.append(record)
+            else:
+                self.dropped += 1
+
+    def export_jsonl(self, path: str = None) -> str:
+        """
+        Writes every span as one JSON object per line (parents after their children, in the
+        order they finished) and returns the path.
+        """
+        path = path or os.path.join(TRACE_DIR, f"{self.run_id}.jsonl")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w", encoding="utf-8") as f:
+            for record in spans:
+                f.write(json.dumps(record, default=str) + "\n")
+        return path
+
+    def summary(self) -> str:
+        """
+        One row per span name: calls, total / mean / p95 / max wall time and the summed
+        memory delta. Names are indented by how deeply they are nested, in order of first use.
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s["start_ms"])
+        parents = {s["id"]: s["parent"] for s in spans}
+
+        def depth(span_id):
+            d = 0
+            while parents.get(span_id) is not None:
+                span_id = parents[span_id]
+                d += 1
+            return d
+
+        rows = {}
+        for s in spans:
+            row = rows.setdefault(s["name"], {"depth": depth(s["id"]), "durations": [], "rss": 0.0})
+            row["durations"].append(s["duration_ms"])
+            row["rss"] += s["rss_delta_mb"]
+
+        width = max([len(name) + 2 * row["depth"] for name, row in rows.items()] + [4])
+        lines = [f"{'span':<{width}}  {'calls':>6}  {'total ms':>10}  {'mean ms':>9}  {'p95 ms':>9}  {'max ms':>9}  {'rss MB':>8}"]
+        for name, row in rows.items():
+            durations = sorted(row["durations"])
+            p95 = durations[min(len(durations) - 1, int(0.95 * len(durations)))]
+            lines.append(f"{'  ' * row['depth'] + name:<{width}}  {len(durations):>6}  {sum(durations):>10.1f}  "
+                         f"{sum(durations) / len(durations):>9.1f}  {p95:>9.1f}  {durations[-1]:>9.1f}  {row['rss']:>+8.1f}")
+        if self.dropped:
+            lines.append(f"({self.dropped} spans dropped beyond the limit of {self.max_spans})")
+        return "\n".join(lines)
+
+
+def span(name: str, parent: int = None, **attrs):
+    """
+    Context manager timing the enclosed block as a child of the current span. `parent`
+    overrides the parent, e.g. for work handed to another thread (see current_span_id()).
+    """
+    if _tracer is None:
+        return _NOOP_SPAN
+    return Span(_tracer, name, parent, attrs)
+
+
+def traced(name: str = None):
+    """
+    Decorator form of span(); the span is named after the function unless `name` is given.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Span(_tracer, span_name, None, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_span_id():
+    return _current_span.get()
+
+
+def enable_tracing(run_name: str = "run") -> Tracer:
+    global _tracer
+    _tracer = Tracer(run_name)
+    return _tracer
+
+
+def get_tracer():
+    return _tracer
+
+
+def finish_tracing(path: str = None):
+    """
+    Stops tracing, writes the spans as JSON lines and prints the summary table.
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is None or not tracer.spans:
+        return None
+    path = tracer.export_jsonl(path)
+    print(f"\n--- Trace summary ({len(tracer.spans)} spans, written to {path}) ---")
+    print(tracer.summary())
+    return path
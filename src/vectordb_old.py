@@ -5,6 +5,7 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import SentenceTransformerEmbeddings
 from src.config import DATA_PATH, DB_PATH, EMBEDDING_MODEL
+from src.documents import iter_merged_frames, render_page_content
 # Define the paths to your data and the persistent database directory
 
 def create_vector_db():
@@ -13,29 +14,14 @@ def create_vector_db():
     """
     print("Step 1: Loading and preprocessing data...")
     
-    # Load the CSV files into pandas DataFrames
-    suppliers_df = pd.read_csv(DATA_PATH + "suppliers.csv")
-    materials_df = pd.read_csv(DATA_PATH + "materials.csv")
-
-    # Merge the dataframes to create rich, contextual information for each material
+    # Load the CSV files and merge them to create rich, contextual information for each material
     # This combines supplier info with the materials they supply.
-    merged_df = pd.merge(
-        materials_df,
-        suppliers_df,
-        how="left",
-        left_on="supplied_by_id",
-        right_on="supplier_id"
-    )
+    merged_df = next(iter_merged_frames(DATA_PATH))
 
     # Create a descriptive text column that the LLM can understand.
-    # This is a key step in making the data useful for retrieval.
-    merged_df['combined_text'] = merged_df.apply(
-        lambda row: f"Material '{row['material_name']}' (ID: {row['material_id']}) is a "
-                    f"{row['criticality_level']} criticality component. It is supplied by "
-                    f"'{row['supplier_name']}' (ID: {row['supplier_id']}) from {row['city']}, "
-                    f"{row['country']}, which is in the {row['industry_type']} industry.",
-        axis=1
-    )
+    # This is a key step in making the data useful for retrieval. It is rendered column-wise
+    # rather than with a per-row apply().
+    merged_df['combined_text'] = render_page_content(merged_df)
 
     # Use LangChain's DataFrameLoader to prepare the documents
     loader = DataFrameLoader(merged_df, page_content_column="combined_text")
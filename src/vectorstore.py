@@ -0,0 +1,546 @@
+"""
+Pluggable vector store used by ingest (vectordb.py) and the retriever.
+
+Two backends share one small interface:
+    ChromaVectorStore  the existing Chroma collection under DB_PATH
+    FlatVectorStore    normalized float32 (or int8-quantized) embeddings in a memory-mapped
+                       .npy file, metadata in columnar arrays, exact top-k search with a
+                       blocked matrix product plus argpartition
+
+Both report squared L2 distances between the (unit-length) embeddings, so distance
+thresholds such as RETRIEVER_MAX_DISTANCE mean the same thing with either backend.
+"""
+import json
+import os
+import shutil
+
+import numpy as np
+from langchain_core.documents import Document
+from src.config import DB_PATH, FLAT_INDEX_PATH, FLAT_INDEX_QUANTIZE, VECTOR_BACKEND, CHROMA_WRITE_BATCH_SIZE
+
+
+class VectorStore:
+    """
+    Interface shared by the backends. Writes become visible to queries after persist().
+    """
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def get_hashes(self) -> dict:
+        """
+        Returns {document id: content hash} for every stored document.
+        """
+        raise NotImplementedError
+
+    def upsert(self, ids: list, embeddings, documents: list, metadatas: list):
+        raise NotImplementedError
+
+    def delete(self, ids: list):
+        raise NotImplementedError
+
+    def reset(self):
+        """
+        Removes every document.
+        """
+        raise NotImplementedError
+
+    def persist(self):
+        pass
+
+    def query(self, query_embeddings, k: int, where: dict = None) -> list:
+        """
+        Returns, for each query embedding, up to k (Document, distance) pairs, closest first.
+        `where` uses Chroma's filter syntax: {"field": value}, {"field": {"$in": [...]}}, {"$and": [...]}.
+        """
+        raise NotImplementedError
+
+    def get(self, ids: list, where: dict = None) -> list:
+        """
+        Returns (Document, embedding) for each of the ids that is stored (and matches `where`),
+        e.g. to score documents found by the lexical index against the query embedding.
+        """
+        raise NotImplementedError
+
+
+# --- Chroma backend ---
+
+class ChromaVectorStore(VectorStore):
+
+    def __init__(self, persist_directory: str = DB_PATH):
+        from langchain_community.vectorstores import Chroma
+        self._chroma_class = Chroma
+        self.persist_directory = persist_directory
+        # Embeddings are always computed by the caller, so no embedding function is needed
+        self._db = Chroma(persist_directory=persist_directory)
+
+    @property
+    def _collection(self):
+        return self._db._collection
+
+    def count(self) -> int:
+        return self._collection.count()
+
+    def get_hashes(self, page_size: int = CHROMA_WRITE_BATCH_SIZE) -> dict:
+        # Read page by page so large catalogues are not fetched in one response
+        hashes = {}
+        offset = 0
+        while True:
+            page = self._db.get(include=["metadatas"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            for doc_id, metadata in zip(page["ids"], page["metadatas"]):
+                hashes[doc_id] = (metadata or {}).get("content_hash")
+            offset += len(page["ids"])
+        return hashes
+
+    def upsert(self, ids: list, embeddings, documents: list, metadatas: list):
+        self._collection.upsert(
+            ids=list(ids),
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            documents=list(documents),
+            metadatas=list(metadatas),
+        )
+
+    def delete(self, ids: list):
+        for start in range(0, len(ids), CHROMA_WRITE_BATCH_SIZE):
+            self._db.delete(ids=list(ids[start:start + CHROMA_WRITE_BATCH_SIZE]))
+
+    def reset(self):
+        self._db.delete_collection()
+        self._db = self._chroma_class(persist_directory=self.persist_directory)
+
+    def persist(self):
+        self._db.persist()
+
+    def query(self, query_embeddings, k: int, where: dict = None) -> list:
+        response = self._collection.query(
+            query_embeddings=np.asarray(query_embeddings, dtype=np.float32).tolist(),
+            n_results=k,
+            where=where or None,
+            include=["documents", "metadatas", "distances"],
+        )
+        return [
+            [(Document(id=doc_id, page_content=text, metadata=metadata or {}), distance)
+             for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)]
+            for ids, texts, metadatas, distances in zip(
+                response["ids"], response["documents"], response["metadatas"], response["distances"])
+        ]
+
+    def get(self, ids: list, where: dict = None) -> list:
+        if not ids:
+            return []
+        response = self._collection.get(ids=list(ids), where=where or None,
+                                        include=["documents", "metadatas", "embeddings"])
+        return [
+            (Document(id=doc_id, page_content=text, metadata=metadata or {}), np.asarray(embedding, dtype=np.float32))
+            for doc_id, text, metadata, embedding in zip(
+                response["ids"], response["documents"], response["metadatas"], response["embeddings"])
+        ]
+
+
+# --- Flat NumPy backend ---
+
+def _normalize_rows(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _encode_strings(values: list):
+    # All strings as one UTF-8 blob plus offsets: compact and loadable with mmap, no pickle
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+class _StringColumn:
+    """
+    Read-only string column stored as (blob, offsets).
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def tolist(self) -> list:
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(self))]
+
+
+class _DictColumn:
+    """
+    Dictionary-encoded metadata column: int32 codes into a string column of distinct values.
+    The values are stored as JSON, so numbers and booleans come back with their type, as from
+    Chroma; None marks a row without the key. Filters pick the matching distinct values and
+    compare codes, so they never touch the values row by row.
+    """
+
+    def __init__(self, codes: np.ndarray, categories: _StringColumn, encoded: bool = True):
+        self.codes = codes
+        self.categories = categories
+        # Stores written before values were JSON-encoded hold the strings themselves
+        self._decode = json.loads if encoded else (lambda value: value)
+
+    def __getitem__(self, i: int):
+        return self._decode(self.categories[self.codes[i]])
+
+    def tolist(self) -> list:
+        categories = [self._decode(value) for value in self.categories.tolist()]
+        return [categories[c] for c in self.codes.tolist()]
+
+    def codes_where(self, predicate) -> np.ndarray:
+        categories = self.categories.tolist()
+        return np.array([code for code, value in enumerate(categories) if predicate(self._decode(value))],
+                        dtype=np.int32)
+
+
+def _number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _equality_key(value):
+    # True == 1 in Python, but not in Chroma's metadata
+    return isinstance(value, bool), value
+
+
+_RANGE_OPERATORS = {
+    "$gt": lambda a, b: a > b,
+    "$gte": lambda a, b: a >= b,
+    "$lt": lambda a, b: a < b,
+    "$lte": lambda a, b: a <= b,
+}
+
+
+def _predicate(condition):
+    """
+    Turns one field condition ({"$op": operand} or a bare value for $eq) into a test of a
+    metadata value. A row without the key matches no condition.
+    """
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+    (operator, operand), = condition.items()
+    if operator in _RANGE_OPERATORS:
+        if not _number(operand):
+            raise ValueError(f"{operator} needs a number, got {operand!r}")
+        compare = _RANGE_OPERATORS[operator]
+        return lambda value: _number(value) and compare(value, operand)
+    if operator in ("$eq", "$ne"):
+        keys = {_equality_key(operand)}
+    elif operator in ("$in", "$nin"):
+        keys = {_equality_key(v) for v in operand}
+    else:
+        raise ValueError(f"Unsupported filter operator for the flat index: {operator}")
+    if operator in ("$eq", "$in"):
+        return lambda value: value is not None and _equality_key(value) in keys
+    return lambda value: value is not None and _equality_key(value) not in keys
+
+
+class FlatVectorStore(VectorStore):
+    """
+    Exact search over a memory-mapped matrix. Opening it maps the files without reading them,
+    so start-up is near-instant; pending writes are applied in one pass by persist().
+    """
+
+    def __init__(self, path: str = FLAT_INDEX_PATH, quantize: bool = FLAT_INDEX_QUANTIZE,
+                 block_rows: int = 65_536):
+        self.path = path
+        self.quantize = quantize
+        self.block_rows = block_rows
+        self._pending = {}
+        self._deleted = set()
+        self._reset = False
+        self._load()
+
+    # --- files ---
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        self._vectors = None
+        self._scales = None
+        self._ids = _StringColumn(np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64))
+        self._documents = self._ids
+        self._metadata = {}
+        self._id_positions = None
+        manifest_file = self._file("manifest.json")
+        if not os.path.exists(manifest_file):
+            return
+        with open(manifest_file) as f:
+            manifest = json.load(f)
+        load = lambda name: np.load(self._file(name), mmap_mode="r")
+        self._vectors = load("vectors.npy")
+        if manifest["quantized"]:
+            self._scales = load("scales.npy")
+        self._ids = _StringColumn(load("ids.blob.npy"), load("ids.offsets.npy"))
+        self._documents = _StringColumn(load("documents.blob.npy"), load("documents.offsets.npy"))
+        encoded = manifest.get("metadata_encoding") == "json"
+        for key in manifest["metadata_keys"]:
+            categories = _StringColumn(load(f"meta.{key}.blob.npy"), load(f"meta.{key}.offsets.npy"))
+            self._metadata[key] = _DictColumn(load(f"meta.{key}.codes.npy"), categories, encoded)
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def _positions(self) -> dict:
+        if self._id_positions is None:
+            self._id_positions = {doc_id: i for i, doc_id in enumerate(self._ids.tolist())}
+        return self._id_positions
+
+    # --- writes ---
+
+    def get_hashes(self) -> dict:
+        hashes = {}
+        if not self._reset:
+            ids = self._ids.tolist()
+            column = self._metadata.get("content_hash")
+            values = column.tolist() if column is not None else [None] * len(ids)
+            hashes = {i: h for i, h in zip(ids, values) if i not in self._deleted}
+        for doc_id, (_, _, metadata) in self._pending.items():
+            hashes[doc_id] = metadata.get("content_hash")
+        return hashes
+
+    def upsert(self, ids: list, embeddings, documents: list, metadatas: list):
+        vectors = _normalize_rows(embeddings)
+        for doc_id, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+            self._pending[doc_id] = (vector, document, metadata or {})
+            self._deleted.discard(doc_id)
+
+    def delete(self, ids: list):
+        for doc_id in ids:
+            self._pending.pop(doc_id, None)
+            self._deleted.add(doc_id)
+
+    def reset(self):
+        self._pending.clear()
+        self._deleted.clear()
+        self._reset = True
+
+    def persist(self):
+        """
+        Writes the current rows plus pending changes to new files and swaps them in.
+        Vectors are copied block by block, so memory does not grow with the matrix size.
+        """
+        if not (self._pending or self._deleted or self._reset):
+            return
+        # Rows kept from the current files
+        if self._reset or self.count() == 0:
+            keep = np.zeros(self.count(), dtype=bool)
+        else:
+            drop = self._deleted | set(self._pending)
+            keep = np.array([doc_id not in drop for doc_id in self._ids.tolist()], dtype=bool)
+        kept = np.flatnonzero(keep)
+        pending_ids = list(self._pending)
+        total = len(kept) + len(pending_ids)
+
+        if self._pending:
+            dim = len(next(iter(self._pending.values()))[0])
+        else:
+            dim = self._vectors.shape[1] if self._vectors is not None else 0
+        metadata_keys = sorted(set(self._metadata) | {k for _, _, m in self._pending.values() for k in m})
+
+        tmp_path = self.path.rstrip("/") + ".tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        tmp = lambda name: os.path.join(tmp_path, name)
+
+        # Vectors, copied in blocks
+        dtype = np.int8 if self.quantize else np.float32
+        vectors = np.lib.format.open_memmap(tmp("vectors.npy"), mode="w+", dtype=dtype, shape=(total, dim))
+        scales = np.zeros(total, dtype=np.float32) if self.quantize else None
+        out = 0
+        for start in range(0, len(kept), self.block_rows):
+            rows = kept[start:start + self.block_rows]
+            block, block_scales = self._read_block(rows)
+            self._write_block(vectors, scales, out, block, block_scales)
+            out += len(rows)
+        if pending_ids:
+            block = np.vstack([self._pending[i][0] for i in pending_ids])
+            self._write_block(vectors, scales, out, block, None)
+        vectors.flush()
+        del vectors
+        if scales is not None:
+            np.save(tmp("scales.npy"), scales)
+
+        # Columns
+        kept_list = kept.tolist()
+        ids = [self._ids[i] for i in kept_list] + pending_ids
+        documents = [self._documents[i] for i in kept_list] + [self._pending[i][1] for i in pending_ids]
+        self._save_strings(tmp, "ids", ids)
+        self._save_strings(tmp, "documents", documents)
+        for key in metadata_keys:
+            column = self._metadata.get(key)
+            values = [column[i] for i in kept_list] if column is not None else [None] * len(kept_list)
+            values += [self._pending[i][2].get(key) for i in pending_ids]
+            values = [json.dumps(value, ensure_ascii=False) for value in values]
+            distinct, codes = np.unique(np.array(values, dtype=object), return_inverse=True) if values else ([], [])
+            np.save(tmp(f"meta.{key}.codes.npy"), np.asarray(codes, dtype=np.int32))
+            self._save_strings(tmp, f"meta.{key}", list(distinct))
+
+        with open(tmp("manifest.json"), "w") as f:
+            json.dump({"count": total, "dim": dim, "quantized": self.quantize,
+                       "metadata_keys": metadata_keys, "metadata_encoding": "json", "distance": "l2"}, f)
+
+        # Swap the new files in
+        old_path = self.path.rstrip("/") + ".old"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.exists(self.path):
+            os.replace(self.path, old_path)
+        os.replace(tmp_path, self.path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+        self._pending.clear()
+        self._deleted.clear()
+        self._reset = False
+        self._load()
+
+    @staticmethod
+    def _save_strings(tmp, name: str, values: list):
+        blob, offsets = _encode_strings(values)
+        np.save(tmp(f"{name}.blob.npy"), blob)
+        np.save(tmp(f"{name}.offsets.npy"), offsets)
+
+    def _read_block(self, rows: np.ndarray):
+        block = np.asarray(self._vectors[rows])
+        if self._scales is None:
+            return block.astype(np.float32), None
+        return block, np.asarray(self._scales[rows])
+
+    def _write_block(self, vectors, scales, out: int, block: np.ndarray, block_scales):
+        if scales is None:
+            if block.dtype == np.int8:
+                raise ValueError("Cannot de-quantize an int8 index into a float32 one; rebuild with --full.")
+            vectors[out:out + len(block)] = block
+            return
+        if block.dtype == np.int8 and block_scales is not None:
+            vectors[out:out + len(block)] = block
+            scales[out:out + len(block)] = block_scales
+            return
+        # Symmetric per-row int8 quantization: v ~= codes * scale
+        block_scales = np.maximum(np.abs(block).max(axis=1), 1e-12) / 127.0
+        vectors[out:out + len(block)] = np.round(block / block_scales[:, None]).astype(np.int8)
+        scales[out:out + len(block)] = block_scales
+
+    # --- queries ---
+
+    def _where_mask(self, where: dict):
+        if not where:
+            return None
+        masks = []
+        for key, condition in where.items():
+            if key == "$and":
+                masks.append(np.logical_and.reduce([self._where_mask(c) for c in condition]))
+            elif key == "$or":
+                masks.append(np.logical_or.reduce([self._where_mask(c) for c in condition]))
+            else:
+                masks.append(self._field_mask(key, condition))
+        return np.logical_and.reduce(masks)
+
+    def _matches(self, row: int, where: dict) -> bool:
+        # Same semantics as _where_mask, for a single row
+        for key, condition in where.items():
+            if key == "$and":
+                matched = all(self._matches(row, c) for c in condition)
+            elif key == "$or":
+                matched = any(self._matches(row, c) for c in condition)
+            else:
+                column = self._metadata.get(key)
+                matched = _predicate(condition)(column[row] if column is not None else None)
+            if not matched:
+                return False
+        return True
+
+    def _field_mask(self, key: str, condition) -> np.ndarray:
+        predicate = _predicate(condition)
+        column = self._metadata.get(key)
+        if column is None:
+            return np.zeros(self.count(), dtype=bool)
+        return np.isin(column.codes, column.codes_where(predicate))
+
+    def query(self, query_embeddings, k: int, where: dict = None) -> list:
+        queries = _normalize_rows(query_embeddings)
+        n = self.count()
+        if n == 0 or k <= 0:
+            return [[] for _ in range(len(queries))]
+        mask = self._where_mask(where)
+
+        # A filter restricts the scan to the matching rows, gathered from the memmap
+        candidates = np.flatnonzero(mask) if mask is not None else None
+        total = n if candidates is None else len(candidates)
+
+        # Running top-k per query, merged block by block to bound temporary memory
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        # int8 blocks are up-cast before the product; smaller blocks keep that copy cache-sized
+        block_rows = self.block_rows if self._scales is None else min(self.block_rows, 8192)
+        for start in range(0, total, block_rows):
+            end = min(start + block_rows, total)
+            selection = slice(start, end) if candidates is None else candidates[start:end]
+            block_index = np.arange(start, end) if candidates is None else selection
+            block = np.asarray(self._vectors[selection])
+            if self._scales is None:
+                scores = queries @ block.T
+            else:
+                scores = (queries @ block.T.astype(np.float32)) * np.asarray(self._scales[selection])
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, np.broadcast_to(block_index, (len(queries), end - start))], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+
+        order = np.argsort(-best_scores, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        best_rows = np.take_along_axis(best_rows, order, axis=1)
+
+        results = []
+        for scores, rows in zip(best_scores, best_rows):
+            hits = []
+            for score, row in zip(scores.tolist(), rows.tolist()):
+                if score == -np.inf:
+                    break
+                # Squared L2 distance between unit vectors, as Chroma reports it
+                hits.append((self._document(row), max(0.0, 2.0 - 2.0 * score)))
+            results.append(hits)
+        return results
+
+    def _document(self, row: int) -> Document:
+        # Keys the row was stored without are left out, as Chroma does
+        metadata = {key: column[row] for key, column in self._metadata.items()}
+        metadata = {key: value for key, value in metadata.items() if value is not None}
+        return Document(id=self._ids[row], page_content=self._documents[row], metadata=metadata)
+
+    def get(self, ids: list, where: dict = None) -> list:
+        positions = self._positions()
+        rows = [positions[doc_id] for doc_id in ids if doc_id in positions]
+        if where:
+            rows = [row for row in rows if self._matches(row, where)]
+        if not rows:
+            return []
+        block, scales = self._read_block(np.array(rows))
+        vectors = block.astype(np.float32) * scales[:, None] if scales is not None else block
+        return [(self._document(row), vector) for row, vector in zip(rows, vectors)]
+
+
+def get_vector_store(backend: str = VECTOR_BACKEND) -> VectorStore:
+    """
+    Opens the configured backend: "chroma" or "flat".
+    """
+    if backend == "chroma":
+        return ChromaVectorStore(DB_PATH)
+    if backend == "flat":
+        return FlatVectorStore(FLAT_INDEX_PATH, quantize=FLAT_INDEX_QUANTIZE)
+    raise ValueError(f"Unknown vector store backend: {backend!r} (expected 'chroma' or 'flat')")
@@ -1,24 +1,20 @@
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import SentenceTransformerEmbeddings
+import argparse
 
-DB_PATH = "db/"
-EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+from src.config import VECTOR_BACKEND
+from src.retriever import SupplyChainRetriever, get_retriever
 
-def test_query(query: str):
+def test_query(query: str, retriever: SupplyChainRetriever = None):
     """
-    Loads the persisted vector database and performs a similarity search.
+    Queries the persisted vector database through the shared retriever.
     """
     print(f"\n--- Testing query: '{query}' ---")
-    
-    # Load the embedding function
-    embeddings = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
-    
-    # Load the  database
-    vectordb = Chroma(persist_directory=DB_PATH, embedding_function=embeddings)
-    
+
+    # The model and the database are loaded once and re-used across queries
+    retriever = retriever or get_retriever()
+
     #Perform a similarity search
-    results = vectordb.similarity_search(query, k=2) 
-    
+    results = retriever.similarity_search(query, k=2)
+
     if results:
         print("Found relevant documents:")
         for i, doc in enumerate(results):
@@ -26,7 +22,17 @@ def test_query(query: str):
             print(doc.page_content)
     else:
         print("No relevant documents found.")
+    print(f"(query took {retriever.stats()['last_query_ms']:.1f} ms)")
 
 if __name__ == "__main__":
-    test_query("What materials are supplied from Taiwan?")
-    test_query("Do we have any high criticality microchips?")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run a few sample queries against the vector database.")
+    parser.add_argument("--backend", choices=["chroma", "flat"], default=VECTOR_BACKEND,
+                        help="Vector store to query (defaults to VECTOR_BACKEND in src/config.py).")
+    args = parser.parse_args()
+
+    retriever = get_retriever() if args.backend == VECTOR_BACKEND else SupplyChainRetriever(backend=args.backend)
+    load_seconds = retriever.warm_up()
+    print(f"Retriever warm-up took {load_seconds:.2f}s")
+    test_query("What materials are supplied from Taiwan?", retriever)
+    test_query("Do we have any high criticality microchips?", retriever)
+    print(f"\nRetriever stats: {retriever.stats()}")
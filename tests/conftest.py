@@ -0,0 +1,45 @@
+"""
+Shared fixtures: a small supplier/material catalogue written to a temporary data directory.
+"""
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+SUPPLIERS = [
+    ("S001", "Sun Earth Corp", "Taiwan", "Hsinchu", "Electronics"),
+    ("S002", "Harbor Metals", "Netherlands", "Rotterdam", "Metals"),
+    ("S003", "Lotus Plastics", "Japan", "Osaka", "Chemicals"),
+]
+MATERIALS = [
+    ("M001", "ECO-298-ULTRA Drum Container", "S002", "High"),
+    ("M002", "GX-403 Microcontroller", "S001", "Critical"),
+    ("M003", "PX-17 Polymer Pellets", "S003", "Low"),
+    ("M004", "GX-500 Memory Chip", "S001", "Medium"),
+]
+
+
+def write_suppliers(data_path, suppliers: list = SUPPLIERS):
+    pd.DataFrame(suppliers, columns=["supplier_id", "supplier_name", "country", "city", "industry_type"]).to_csv(
+        Path(data_path) / "suppliers.csv", index=False)
+
+
+def write_materials(data_path, materials: list = MATERIALS):
+    pd.DataFrame(materials, columns=["material_id", "material_name", "supplied_by_id", "criticality_level"]).to_csv(
+        Path(data_path) / "materials.csv", index=False)
+
+
+def write_catalogue(data_path, suppliers: list = SUPPLIERS, materials: list = MATERIALS):
+    write_suppliers(data_path, suppliers)
+    write_materials(data_path, materials)
+
+
+@pytest.fixture
+def catalogue(tmp_path):
+    """
+    Data directory (as the "path/" string the loaders expect) holding SUPPLIERS and MATERIALS.
+    """
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    write_catalogue(data_path)
+    return str(data_path) + "/"
@@ -0,0 +1,101 @@
+"""
+AnswerCache: exact and similar hits, scopes, expiry, eviction and invalidation when the index
+files change.
+"""
+import os
+
+import pytest
+
+import src.answer_cache as answer_cache
+from src.answer_cache import AnswerCache, normalize_query, query_scope
+
+TAIWAN = [1.0, 0.0, 0.0]
+TAIWAN_REPHRASED = [0.98, 0.2, 0.0]
+UNRELATED = [0.0, 0.0, 1.0]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(answer_cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def index_file(tmp_path):
+    path = tmp_path / "filter_index.pkl"
+    path.write_bytes(b"v1")
+    return path
+
+
+def touch(path):
+    # A new modification time, even on file systems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_exact_hits_ignore_case_and_punctuation(index_file):
+    cache = AnswerCache(index_files=[str(index_file)])
+    assert normalize_query("What suppliers are in Taiwan?") == "what suppliers are in taiwan"
+    assert cache.get("What suppliers are in Taiwan?") is None
+    cache.put("What suppliers are in Taiwan?", "answer")
+    assert cache.get("what suppliers are in taiwan") == "answer"
+    stats = cache.stats()
+    assert (stats["lookups"], stats["exact_hits"], stats["misses"]) == (2, 1, 1)
+
+
+def test_similar_hits_only_within_the_same_scope(index_file):
+    cache = AnswerCache(similarity=0.9, index_files=[str(index_file)])
+    taiwan = query_scope({"country": ["Taiwan"]}, "suppliers in Taiwan")
+    assert taiwan == "country=taiwan"
+    cache.put("suppliers in Taiwan", "taiwan answer", TAIWAN, taiwan)
+
+    assert cache.get_similar("Taiwan suppliers", TAIWAN_REPHRASED, taiwan) == ("taiwan answer", "suppliers in Taiwan")
+    # Close embedding, other place or part code: not the same question
+    assert cache.get_similar("Japan suppliers", TAIWAN_REPHRASED, "country=japan") == (None, None)
+    assert query_scope({}, "GX-403 suppliers") != query_scope({}, "GX-500 suppliers")
+    assert cache.get_similar("Taiwan suppliers", UNRELATED, taiwan) == (None, None)
+    # Entries put without an embedding are only found by get()
+    cache.put("M001", "exact only")
+    assert cache.get_similar("M001", TAIWAN, "") == (None, None)
+
+
+def test_entries_expire_and_the_least_recently_used_are_evicted(index_file, clock):
+    cache = AnswerCache(max_entries=2, ttl_seconds=60, index_files=[str(index_file)])
+    cache.put("a", "A", TAIWAN)
+    cache.put("b", "B", UNRELATED)
+    assert cache.get("a") == "A"
+    cache.put("c", "C")
+    assert (cache.get("b"), cache.get("a"), cache.get("c")) == (None, "A", "C")
+    assert cache.stats()["evictions"] == 1
+
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.get_similar("a again", TAIWAN) == (None, None)
+    assert cache.stats()["expired"] == 1
+
+
+def test_index_change_clears_the_cache(index_file):
+    cache = AnswerCache(index_files=[str(index_file)])
+    cache.put("suppliers in Taiwan", "old answer", TAIWAN)
+    assert cache.get("suppliers in Taiwan") == "old answer"
+
+    touch(index_file)
+    assert cache.get("suppliers in Taiwan") is None
+    assert cache.get_similar("Taiwan suppliers", TAIWAN) == (None, None)
+    assert cache.stats()["invalidations"] == 1
+
+    # An answer computed before the change is not cached after it
+    touch(index_file)
+    cache.put("suppliers in Taiwan", "answer from the old index", TAIWAN)
+    assert cache.get("suppliers in Taiwan") is None
+    cache.put("suppliers in Taiwan", "new answer", TAIWAN)
+    assert cache.get("suppliers in Taiwan") == "new answer"
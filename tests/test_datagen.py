@@ -0,0 +1,37 @@
+"""
+Synthetic catalogue generator: the sample data's ID format and reproducible output.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+import data.datagen as datagen
+from data.datagen import generate_corpus
+
+SAMPLE_PATH = Path(__file__).resolve().parent.parent / "data"
+
+
+def read(out_dir) -> tuple:
+    return pd.read_csv(out_dir / "suppliers.csv", dtype=str), pd.read_csv(out_dir / "materials.csv", dtype=str)
+
+
+def test_ids_match_the_sample_data(tmp_path):
+    generate_corpus(str(tmp_path), 1000, 1000, verbose=False)
+    suppliers, materials = read(tmp_path)
+    sample_suppliers, sample_materials = read(SAMPLE_PATH)
+    assert suppliers["supplier_id"].tolist() == sample_suppliers["supplier_id"].tolist()
+    assert materials["material_id"].tolist() == sample_materials["material_id"].tolist()
+    assert list(suppliers.columns) == list(sample_suppliers.columns)
+    assert list(materials.columns) == list(sample_materials.columns)
+    assert materials["supplied_by_id"].isin(suppliers["supplier_id"]).all()
+
+
+def test_same_seed_same_files_whatever_the_chunk_size(tmp_path, monkeypatch):
+    # Small blocks, so the corpus spans several random streams and chunks
+    monkeypatch.setattr(datagen, "GENERATION_BLOCK_ROWS", 64)
+    generate_corpus(str(tmp_path / "a"), 300, 500, seed=7, fanout="zipf", chunk_rows=64, verbose=False)
+    generate_corpus(str(tmp_path / "b"), 300, 500, seed=7, fanout="zipf", chunk_rows=256, verbose=False)
+    generate_corpus(str(tmp_path / "c"), 300, 500, seed=8, fanout="zipf", chunk_rows=256, verbose=False)
+    for name in ["suppliers.csv", "materials.csv"]:
+        assert (tmp_path / "a" / name).read_bytes() == (tmp_path / "b" / name).read_bytes()
+        assert (tmp_path / "a" / name).read_bytes() != (tmp_path / "c" / name).read_bytes()
@@ -0,0 +1,64 @@
+"""
+EmbeddingCache, including two caches (standing in for two processes) sharing one directory.
+"""
+import numpy as np
+
+from src.embedding_cache import EmbeddingCache, embed_with_cache
+
+
+def fake_encode(texts: list) -> np.ndarray:
+    # A distinct, recognisable vector per text
+    return np.array([[len(t), sum(map(ord, t)) % 997, 1.0] for t in texts], dtype=np.float32)
+
+
+def test_round_trip_through_disk(tmp_path):
+    cache = EmbeddingCache("model", str(tmp_path), max_entries=8)
+    cache.put_many(["steel bolts", "lithium cells"], fake_encode(["steel bolts", "lithium cells"]))
+    cache.flush()
+
+    reopened = EmbeddingCache("model", str(tmp_path), max_entries=8)
+    vectors, missing = reopened.get_many(["lithium  cells", "copper wire"])
+    assert missing == [1]
+    np.testing.assert_array_equal(vectors[0], fake_encode(["lithium cells"])[0])
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = EmbeddingCache("model", str(tmp_path), max_entries=2)
+    cache.put_many(["a", "b"], fake_encode(["a", "b"]))
+    cache.get_many(["a"])
+    cache.put_many(["c"], fake_encode(["c"]))
+    _, missing = cache.get_many(["a", "b", "c"])
+    assert missing == [1]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_slot_reused_by_another_process_is_a_miss(tmp_path):
+    first = EmbeddingCache("model", str(tmp_path), max_entries=2)
+    first.put_many(["a", "b"], fake_encode(["a", "b"]))
+    first.flush()
+
+    # The second process loads the same files and fills both slots with other texts
+    second = EmbeddingCache("model", str(tmp_path), max_entries=2)
+    second.put_many(["c", "d"], fake_encode(["c", "d"]))
+    second.flush()
+
+    # The first process's index still maps "a" and "b" to those slots
+    vectors, missing = first.get_many(["a", "b"])
+    assert missing == [0, 1]
+    calls = []
+    result = embed_with_cache(first, ["a"], lambda texts: calls.append(texts) or fake_encode(texts))
+    assert calls == [["a"]]
+    np.testing.assert_array_equal(result[0], fake_encode(["a"])[0])
+
+    # ...and the second process now sees its own slot taken back
+    _, missing = second.get_many(["c", "d"])
+    assert len(missing) == 1
+
+
+def test_other_model_starts_empty(tmp_path):
+    cache = EmbeddingCache("model", str(tmp_path), max_entries=4)
+    cache.put_many(["a"], fake_encode(["a"]))
+    cache.flush()
+    other = EmbeddingCache("model", str(tmp_path), max_entries=8)
+    _, missing = other.get_many(["a"])
+    assert missing == [0]
@@ -0,0 +1,80 @@
+"""
+ExposureIndex: blast radius, the array snapshot and refreshing after a CSV changes.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+import src.exposure_index as exposure_index
+from conftest import MATERIALS, SUPPLIERS, write_catalogue, write_suppliers
+from src.exposure_index import ExposureIndex
+
+
+@pytest.fixture
+def index(catalogue) -> ExposureIndex:
+    return ExposureIndex.build(catalogue)
+
+
+def test_blast_radius(index):
+    radius, = index.blast_radius("taiwan")
+    assert (radius.kind, radius.name, len(radius.suppliers)) == ("country", "Taiwan", 1)
+    assert radius.counts.tolist() == [1, 0, 1, 0]
+    assert [m[0] for m in index.supplier_materials(radius.suppliers[0])] == ["M002", "M004"]
+    assert index.blast_radius("S003")[0].name == "Lotus Plastics"
+    assert index.blast_radius("Atlantis") == []
+
+
+def test_snapshot_round_trip_without_pandas(index, catalogue, tmp_path):
+    path = str(tmp_path / "exposure_index.npz")
+    index.save(path)
+    loaded = ExposureIndex.load(path, catalogue)
+    for name in ["Taiwan", "Hsinchu", "Harbor Metals", "S003"]:
+        assert [loaded.format(r) for r in loaded.blast_radius(name)] == [index.format(r) for r in index.blast_radius(name)]
+    assert loaded.signatures == index.signatures
+    assert loaded.refresh() == []
+
+    check = f"import sys; from src.exposure_index import ExposureIndex; ExposureIndex.load({path!r}); print('pandas' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+    assert output.strip() == "False"
+
+
+def test_refresh_after_supplier_change(index, catalogue):
+    suppliers = SUPPLIERS[:2] + [("S003", "Lotus Plastics", "Taiwan", "Taichung", "Chemicals")]
+    write_suppliers(catalogue, suppliers)
+
+    assert index.refresh() == ["suppliers.csv"]
+    radius, = index.blast_radius("Taiwan")
+    assert len(radius.suppliers) == 2
+    assert radius.counts.tolist() == [1, 0, 1, 1]
+
+
+def test_unknown_supplier_is_unplaced(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    write_catalogue(data_path, materials=MATERIALS + [("M005", "Orphan Part", "S999", "Critical")])
+    index = ExposureIndex.build(str(data_path) + "/")
+    assert index.unplaced_materials == 1
+    assert int(index.country_counts.sum()) == len(MATERIALS)
+
+
+def test_csvs_are_checked_at_most_once_per_interval(catalogue, tmp_path, monkeypatch):
+    monkeypatch.setattr(exposure_index, "DATA_PATH", catalogue)
+    monkeypatch.setattr(exposure_index, "EXPOSURE_INDEX_PATH", str(tmp_path / "exposure_index.npz"))
+    monkeypatch.setattr(exposure_index, "EXPOSURE_REFRESH_SECONDS", 60)
+    monkeypatch.setattr(exposure_index, "_exposure_index", None)
+    monkeypatch.setattr(exposure_index, "_exposure_index_checked", 0.0)
+    stats = []
+    file_signature = exposure_index._file_signature
+    monkeypatch.setattr(exposure_index, "_file_signature", lambda path: stats.append(path) or file_signature(path))
+
+    first = exposure_index.get_exposure_index()
+    checked = len(stats)
+    assert exposure_index.get_exposure_index() is first
+    assert len(stats) == checked
+
+    monkeypatch.setattr(exposure_index, "_exposure_index_checked", 0.0)
+    exposure_index.get_exposure_index()
+    assert len(stats) == checked + 2
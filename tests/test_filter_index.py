@@ -0,0 +1,81 @@
+"""
+FilterIndex: entity recognition, pure-filter answers and the translation to `where` filters.
+"""
+import numpy as np
+import pytest
+
+from src.filter_index import FilterIndex
+from src.vectorstore import FlatVectorStore
+
+
+@pytest.fixture
+def index(catalogue) -> FilterIndex:
+    return FilterIndex.from_csv(catalogue)
+
+
+def material_ids(index: FilterIndex, rows) -> list:
+    return sorted(index.columns["material_id"][rows].tolist())
+
+
+def test_pure_filter_query(index):
+    match = index.match("What suppliers do we have in Taiwan?")
+    assert match.filters == {"country": ["Taiwan"]}
+    assert match.is_pure_filter
+    assert material_ids(index, index.lookup(match.filters)) == ["M002", "M004"]
+
+
+def test_free_text_is_left_over(index):
+    match = index.match("memory chips from Hsinchu")
+    assert match.filters == {"city": ["Hsinchu"]}
+    assert match.residual == ["memory", "chips"]
+    assert not match.is_pure_filter
+
+
+def test_multi_word_supplier_and_criticality(index):
+    match = index.match("critical criticality parts from sun earth corp")
+    assert match.filters == {"criticality_level": ["Critical"], "supplier_name": ["Sun Earth Corp"]}
+    assert material_ids(index, index.lookup(match.filters)) == ["M002"]
+    # Without the word "criticality" the level is just a word
+    assert "criticality_level" not in index.match("high demand in Osaka").filters
+
+
+def test_values_within_a_field_are_or_ed_and_fields_and_ed(index):
+    assert material_ids(index, index.lookup({"country": ["Taiwan", "Japan"]})) == ["M002", "M003", "M004"]
+    assert material_ids(index, index.lookup({"country": ["Taiwan"], "criticality_level": ["Low"]})) == []
+
+
+def test_where_translation(index):
+    assert index.match("bolts").where() is None
+    assert index.match("suppliers in Japan").where() == {"country": {"$in": ["Japan"]}}
+    assert index.match("high criticality parts in Rotterdam").where() == {
+        "$and": [{"criticality_level": {"$in": ["High"]}}, {"city": {"$in": ["Rotterdam"]}}]}
+
+
+def test_where_selects_the_same_rows_in_the_vector_store(index, tmp_path):
+    store = FlatVectorStore(str(tmp_path / "flat") + "/")
+    ids = index.columns["material_id"].tolist()
+    metadatas = [{name: index.columns[name][i] for name in index.columns} for i in range(len(ids))]
+    store.upsert(ids, np.eye(len(ids), 8, dtype=np.float32), ids, metadatas)
+    store.persist()
+
+    for query in ["suppliers in Taiwan", "critical criticality parts in Hsinchu or Osaka", "parts from Japan or Taiwan"]:
+        match = index.match(query)
+        hits = store.query([np.ones(8, dtype=np.float32)], k=10, where=match.where())[0]
+        assert sorted(doc.id for doc, _ in hits) == material_ids(index, index.lookup(match.filters)), query
+
+
+def test_answer_lists_most_critical_first(index):
+    answer = index.answer(index.match("suppliers in Taiwan"))
+    lines = answer.splitlines()
+    assert lines[0] == "Found 2 materials from 1 suppliers matching country=Taiwan (Critical: 1, Medium: 1)."
+    assert "(ID: M002), Criticality Level: Critical" in lines[1]
+    assert "(ID: M004), Criticality Level: Medium" in lines[2]
+    assert index.answer(index.match("low criticality parts in Taiwan")).startswith("No materials")
+
+
+def test_snapshot_round_trip(index, tmp_path):
+    path = str(tmp_path / "filter_index.pkl")
+    index.save(path)
+    loaded = FilterIndex.load(path)
+    assert loaded.source_signature == index.source_signature
+    assert loaded.answer(loaded.match("suppliers in Taiwan")) == index.answer(index.match("suppliers in Taiwan"))
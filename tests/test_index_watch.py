@@ -0,0 +1,148 @@
+"""
+Picking up rebuilt indexes in a running process: check_indexes() and the retriever's reload,
+which must not disturb searches already in flight.
+"""
+import os
+import threading
+
+import numpy as np
+import pytest
+
+import src.exposure_index as exposure_index
+import src.filter_index as filter_index
+import src.index_watch as index_watch
+import src.retriever as retriever_module
+from src.lexical_index import LexicalIndex
+from src.retriever import SupplyChainRetriever
+from src.vectorstore import FlatVectorStore
+
+
+def touch(path):
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def flat_store(path: str, ids: list) -> FlatVectorStore:
+    store = FlatVectorStore(path)
+    store.upsert(ids, np.eye(len(ids), 4, dtype=np.float32), ids, [{} for _ in ids])
+    store.persist()
+    return store
+
+
+def lexical_index(ids: list) -> LexicalIndex:
+    index = LexicalIndex()
+    index.upsert(ids, ids)
+    index._compact()
+    return index
+
+
+class BlockingEmbeddings:
+    """
+    Holds embed_query() until released, so a search can be caught half way.
+    """
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def embed_query(self, text: str) -> list:
+        self.started.set()
+        self.release.wait(5)
+        return [1.0, 0.0, 0.0, 0.0]
+
+
+def test_reset_does_not_break_a_search_in_flight(tmp_path):
+    embeddings = BlockingEmbeddings()
+    retriever = SupplyChainRetriever(store=flat_store(str(tmp_path / "flat") + "/", ["A", "B"]),
+                                     embeddings=embeddings, lexical_index=lexical_index(["A", "B"]))
+    results, errors = [], []
+
+    def search():
+        try:
+            results.append(retriever.search_with_scores("B", k=2, max_distance=None))
+        except Exception as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=search)
+    thread.start()
+    assert embeddings.started.wait(5)
+    retriever.reset()
+    embeddings.release.set()
+    thread.join(5)
+
+    assert errors == []
+    # Fusion still ran with the lexical index the search started with: "B" is the exact match
+    hits, = results
+    assert [doc.id for doc, _ in hits] == ["B", "A"]
+    assert not retriever.is_loaded
+
+
+def test_reload_reopens_the_indexes_and_keeps_the_model(tmp_path, monkeypatch):
+    store_path = str(tmp_path / "flat") + "/"
+    lexical_path = str(tmp_path / "lexical_index.pkl")
+    monkeypatch.setattr(retriever_module, "get_vector_store", lambda backend: FlatVectorStore(store_path))
+    monkeypatch.setattr(retriever_module, "LEXICAL_INDEX_PATH", lexical_path)
+    embeddings = BlockingEmbeddings()
+    embeddings.release.set()
+    retriever = SupplyChainRetriever(store=flat_store(store_path, ["A"]), embeddings=embeddings,
+                                     lexical_index=lexical_index(["A"]))
+    before = retriever._ensure_loaded()
+
+    flat_store(store_path, ["A", "B", "C"])
+    lexical_index(["A", "B", "C"]).save(lexical_path)
+    retriever.reload_indexes()
+
+    after = retriever._ensure_loaded()
+    assert after.embeddings is before.embeddings
+    assert (before.store.count(), after.store.count(), len(after.lexical)) == (1, 3, 3)
+    assert retriever.stats()["lexical_documents"] == 3
+
+
+@pytest.fixture
+def watched_file(tmp_path, monkeypatch):
+    path = tmp_path / "filter_index.pkl"
+    path.write_bytes(b"v1")
+    monkeypatch.setattr(index_watch, "INDEX_FILES", [str(path)])
+    monkeypatch.setattr(index_watch, "_signature", None)
+    return path
+
+
+def test_changed_snapshots_reload_the_process_wide_indexes(watched_file, monkeypatch):
+    class Retriever:
+        reloads = 0
+
+        def reload_indexes(self):
+            Retriever.reloads += 1
+
+    monkeypatch.setattr(retriever_module, "_retriever", Retriever())
+    monkeypatch.setattr(filter_index, "_filter_index", "loaded")
+    monkeypatch.setattr(exposure_index, "_exposure_index", "loaded")
+    monkeypatch.setattr(exposure_index, "_exposure_index_checked", 123.0)
+
+    # The first check only records the files
+    assert not index_watch.check_indexes()
+    assert not index_watch.check_indexes()
+    assert filter_index._filter_index == "loaded"
+
+    touch(watched_file)
+    assert index_watch.check_indexes()
+    assert Retriever.reloads == 1
+    assert filter_index._filter_index is None
+    assert (exposure_index._exposure_index, exposure_index._exposure_index_checked) == (None, 0.0)
+    assert not index_watch.check_indexes()
+
+
+def test_get_filter_index_picks_up_a_rebuilt_snapshot(catalogue, watched_file, monkeypatch):
+    # Independent of the answer cache: the getter itself notices the new snapshot
+    path = str(watched_file)
+    monkeypatch.setattr(filter_index, "DATA_PATH", catalogue)
+    monkeypatch.setattr(filter_index, "FILTER_INDEX_PATH", path)
+    monkeypatch.setattr(filter_index, "_filter_index", None)
+    monkeypatch.setattr(retriever_module, "_retriever", None)
+    filter_index.build_filter_index(catalogue, path)
+    first = filter_index.get_filter_index()
+    assert filter_index.get_filter_index() is first
+
+    filter_index.build_filter_index(catalogue, path)
+    touch(path)
+    assert filter_index.get_filter_index() is not first
@@ -0,0 +1,129 @@
+"""
+BM25 index (incremental writes, compaction, snapshots), reciprocal-rank fusion, and fusion in
+the retriever for top-1 and full searches.
+"""
+import numpy as np
+
+import src.retriever as retriever_module
+from src.lexical_index import LexicalIndex, reciprocal_rank_fusion, tokenize
+from src.retriever import SupplyChainRetriever
+from src.vectorstore import FlatVectorStore
+
+DOCUMENTS = {
+    "M001": "ECO-298-ULTRA Drum Container supplied by Harbor Metals in Rotterdam",
+    "M002": "GX-403 Microcontroller supplied by Sun Earth Corp in Hsinchu",
+    "M003": "PX-17 Polymer Pellets supplied by Lotus Plastics in Osaka",
+    "M004": "GX-500 Memory Chip supplied by Sun Earth Corp in Hsinchu",
+    "M005": "Steel Drum supplied by Harbor Metals in Rotterdam",
+}
+QUERIES = ["GX-403", "drum container", "eco-298-ultra", "Hsinchu memory", "pellets osaka", "M005 steel"]
+
+
+def search_all(index: LexicalIndex) -> dict:
+    return {q: index.search(q, k=5, max_doc_fraction=1.0) for q in QUERIES}
+
+
+def built(documents: dict) -> LexicalIndex:
+    index = LexicalIndex()
+    index.upsert(list(documents), list(documents.values()))
+    index._compact()
+    return index
+
+
+def test_codes_are_kept_whole_and_split():
+    assert tokenize("ECO-298-ULTRA drum") == ["eco-298-ultra", "drum", "eco", "298", "ultra"]
+    index = built(DOCUMENTS)
+    # The whole code outranks a document sharing only one of its parts
+    assert [doc_id for doc_id, _ in index.search("ECO-298-ULTRA", max_doc_fraction=1.0)] == ["M001"]
+    assert index.search("GX-403", k=1, max_doc_fraction=1.0)[0][0] == "M002"
+
+
+def test_incremental_writes_score_like_a_fresh_build():
+    final = dict(DOCUMENTS)
+    final["M002"] = "GX-403 Microcontroller supplied by Sun Earth Corp in Taichung"
+    del final["M003"]
+
+    index = built({k: v for k, v in DOCUMENTS.items() if k != "M005"})
+    # Pending writes are not visible until compacted
+    index.upsert(["M002", "M005"], [final["M002"], final["M005"]])
+    index.delete(["M003"])
+    assert len(index) == 4
+    index._compact()
+
+    fresh = built({k: final[k] for k in index.ids})
+    assert sorted(index.ids) == sorted(final)
+    for query, hits in search_all(index).items():
+        expected = search_all(fresh)[query]
+        assert [d for d, _ in hits] == [d for d, _ in expected], query
+        np.testing.assert_allclose([s for _, s in hits], [s for _, s in expected], rtol=1e-6)
+    assert index.search("Osaka", max_doc_fraction=1.0) == []
+    assert index.search("Taichung", max_doc_fraction=1.0)[0][0] == "M002"
+
+
+def test_reset_and_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "lexical_index.pkl")
+    index = built(DOCUMENTS)
+    index.persist(path)
+    assert search_all(LexicalIndex.load(path)) == search_all(index)
+
+    index.reset()
+    index.upsert(["M009"], ["Copper Wire supplied by Andes Cable"])
+    index.persist(path)
+    loaded = LexicalIndex.load(path)
+    assert loaded.ids == ["M009"]
+    # Terms without postings are dropped from the vocabulary
+    assert "hsinchu" not in loaded.vocab
+
+
+def test_common_terms_are_skipped():
+    index = built(DOCUMENTS)
+    assert index.search("supplied", max_doc_fraction=0.5) == []
+    assert len(index.search("supplied", max_doc_fraction=1.0)) == 5
+
+
+def test_reciprocal_rank_fusion_order():
+    # c: 1/63 + 1/61 beats b: 1/62 + 1/62, and both beat a single first place
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["c", "b", "d"]], k=60) == ["c", "b", "a", "d"]
+    # Ties keep first appearance, so the first list wins them
+    assert reciprocal_rank_fusion([["x"], ["y"]]) == ["x", "y"]
+    assert reciprocal_rank_fusion([[], ["y", "z"]]) == ["y", "z"]
+
+
+class DictEmbeddings:
+    """
+    Fixed query vectors, so the vector ranking is known in advance.
+    """
+
+    def __init__(self, vectors: dict):
+        self.vectors = vectors
+
+    def embed_query(self, text: str) -> list:
+        return self.vectors[text]
+
+    def embed_documents(self, texts: list) -> list:
+        return [self.vectors[t] for t in texts]
+
+
+def test_top_1_agrees_with_the_full_search(tmp_path, monkeypatch):
+    # Vector ranking: A, C, E, F, G, B, D. Lexical ranking: B, C. Fused over the whole pool C is
+    # best, being second in both lists; fused over top-1 lists only, B would win the tie with A.
+    ids = ["A", "B", "C", "D", "E", "F", "G"]
+    texts = ["alpha", "bravo", "charlie xray yankee", "delta", "echo", "foxtrot", "golf"]
+    vectors = np.array([[1, 0, 0], [0.2, 1, 0], [0.8, 0.6, 0], [0, 0, 1],
+                        [0.7, 0.7, 0.1], [0.6, 0.6, 0.3], [0.5, 0.5, 0.5]], dtype=np.float32)
+    store = FlatVectorStore(str(tmp_path / "flat") + "/")
+    store.upsert(ids, vectors, texts, [{} for _ in ids])
+    store.persist()
+    lexical = built(dict(zip(ids, texts)))
+    query = "bravo charlie"
+    assert [d for d, _ in lexical.search(query)] == ["B", "C"]
+
+    retriever = SupplyChainRetriever(store=store, embeddings=DictEmbeddings({query: [1, 0.1, 0]}),
+                                     lexical_index=lexical)
+    assert [doc.id for doc, _ in retriever.search_with_scores(query, k=20, max_distance=None)][:3] == ["C", "B", "A"]
+    assert [docs[0].id for docs in retriever.batch_similarity_search([query], k=1)] == ["C"]
+    assert [doc.id for doc in retriever.similarity_search(query, k=1)] == ["C"]
+
+    # Without the shared pool the top-1 lookup disagrees
+    monkeypatch.setattr(retriever_module, "LEXICAL_FUSION_CANDIDATES", 1)
+    assert [docs[0].id for docs in retriever.batch_similarity_search([query], k=1)] == ["B"]
@@ -0,0 +1,84 @@
+"""
+SQLiteLLMCache (hits, non-deterministic settings, LRU eviction, persistence) and the
+scratchpad budget of the agent.
+"""
+from langchain_core.agents import AgentAction
+from langchain_core.language_models import FakeListLLM
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+
+from src.agent_budget import estimate_tokens, format_scratchpad
+from src.llm_cache import SQLiteLLMCache, is_deterministic
+
+SETTINGS = '{"model": "m", "temperature": 0.0}'
+
+
+def test_hit_after_update_and_miss_on_other_prompt_or_model(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"))
+    assert cache.lookup("prompt", SETTINGS) is None
+    cache.update("prompt", SETTINGS, [Generation(text="answer")])
+
+    assert [g.text for g in cache.lookup("prompt", SETTINGS)] == ["answer"]
+    assert cache.lookup("prompt ", SETTINGS) is None
+    assert cache.lookup("prompt", '{"model": "other", "temperature": 0.0}') is None
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_sampled_calls_are_not_cached(tmp_path):
+    assert is_deterministic(SETTINGS) and is_deterministic('{"model": "m"}')
+    assert not is_deterministic("{'model': 'm', 'temperature': 0.7}")
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"))
+    cache.update("prompt", '{"temperature": 0.7}', [Generation(text="answer")])
+    assert cache.stats()["entries"] == 0
+
+
+def test_chat_generations_survive_reopening(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    SQLiteLLMCache(path).update("prompt", SETTINGS, [ChatGeneration(message=AIMessage(content="hello"))])
+    generation, = SQLiteLLMCache(path).lookup("prompt", SETTINGS)
+    assert isinstance(generation, ChatGeneration)
+    assert generation.message.content == "hello"
+
+
+def test_least_recently_used_completions_are_evicted(tmp_path):
+    # Room for about three of the ~1 KB completions
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"), max_mb=3.5 / 1024)
+    for name in "abc":
+        cache.update(name, SETTINGS, [Generation(text=name * 1000)])
+    assert cache.lookup("a", SETTINGS)
+    cache.update("d", SETTINGS, [Generation(text="d" * 1000)])
+
+    assert cache.evictions >= 1
+    assert cache.lookup("b", SETTINGS) is None
+    assert cache.lookup("a", SETTINGS) and cache.lookup("d", SETTINGS)
+    # Larger than the whole budget: never stored
+    cache.update("e", SETTINGS, [Generation(text="e" * 10_000)])
+    assert cache.lookup("e", SETTINGS) is None
+
+
+def test_llm_calls_go_through_the_cache(tmp_path):
+    cache = SQLiteLLMCache(str(tmp_path / "llm.sqlite"))
+    llm = FakeListLLM(responses=["first", "second"], cache=cache)
+    assert llm.invoke("same prompt") == "first"
+    # Without the cache the model would move on to its next response
+    assert llm.invoke("same prompt") == "first"
+    assert llm.invoke("other prompt") == "second"
+    assert cache.hits == 1
+
+
+def step(n: int, observation_chars: int):
+    return AgentAction("search", f"q{n}", f"Thought: step {n}\nAction: search\nAction Input: q{n}"), "x" * observation_chars
+
+
+def test_scratchpad_compacts_oldest_observations_first():
+    steps = [step(n, 2000) for n in range(4)]
+    full = format_scratchpad(steps, token_budget=10_000)
+    assert full.count("x" * 2000) == 4
+
+    budgeted = format_scratchpad(steps, token_budget=1200, keep_recent=2)
+    assert estimate_tokens(budgeted) < estimate_tokens(full)
+    observations = [part.split("\nThought: ")[0] for part in budgeted.split("Observation: ")[1:]]
+    assert [len(o) == 2000 for o in observations] == [False, False, True, True]
+    assert "more characters omitted" in observations[0]
+    # Layout unchanged: each step's log, then its observation, then the next thought
+    assert budgeted.startswith("Thought: step 0") and budgeted.endswith("\nThought: ")
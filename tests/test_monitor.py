@@ -0,0 +1,140 @@
+"""
+Monitor: SimHash near-duplicate suppression and the drop_seen stage against a SQLite store
+in a temporary directory.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.monitor import (
+    ArticleResult, Cycle, MonitorStore, SimHashIndex, drop_seen, jaccard, persist, simhash, title_words,
+)
+
+HEADLINE = "Typhoon shuts ports in southern Taiwan"
+
+
+def article(url: str, title: str, published: str = "2026-10-01T08:00:00Z") -> dict:
+    return {"url": url, "title": title, "publishedAt": published}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MonitorStore(str(tmp_path / "monitor.sqlite"))
+    yield store
+    store.close()
+
+
+def test_simhash_index_finds_near_duplicates_only():
+    index = SimHashIndex()
+    index.add(simhash(HEADLINE), HEADLINE, "u1")
+    for title in [HEADLINE, "Typhoon shuts ports in Southern Taiwan!", HEADLINE + " - Reuters"]:
+        assert index.find(simhash(title), title) == "u1", title
+    # Same shape, different place: a separate story
+    for title in ["Typhoon shuts ports in southern Vietnam", "Fire at chemical plant in Osaka"]:
+        assert index.find(simhash(title), title) is None, title
+
+
+def test_lookup_compares_few_titles_and_misses_none():
+    # Two days of headlines: random titles over a vocabulary of made-up words
+    rng = random.Random(3)
+    syllables = ["ka", "to", "ri", "mon", "sel", "bar", "den", "lu", "po", "vi", "gra", "ste", "nor", "fen"]
+    words = ["".join(rng.choice(syllables) for _ in range(rng.randint(2, 3))) for _ in range(2000)]
+    titles = [" ".join(rng.choice(words) for _ in range(rng.randint(6, 10))) for _ in range(2000)]
+    hashes = [simhash(title) for title in titles]
+    index = SimHashIndex()
+    for i, (h, title) in enumerate(zip(hashes, titles)):
+        index.add(h, title, f"u{i}")
+
+    def scan(h, title):
+        # What comparing against every entry would find
+        words = set(title_words(title))
+        return next((f"u{j}" for j, (other, other_title) in enumerate(zip(hashes, titles))
+                     if bin(h ^ other).count("1") <= index.max_distance
+                     and jaccard(words, set(title_words(other_title))) >= index.min_similarity), None)
+
+    compared = []
+    for title in titles[:100]:
+        variant = title + " - Reuters"
+        h = simhash(variant)
+        compared.append(len({key for _, _, key in index._candidates(h)}))
+        assert index.find(h, variant) == scan(h, variant)
+    assert sum(compared) / len(compared) < 0.1 * len(titles)
+
+
+def test_distance_beyond_the_band_layout_is_rejected():
+    SimHashIndex(max_distance=11)
+    with pytest.raises(ValueError):
+        SimHashIndex(max_distance=12)
+
+
+def test_entries_older_than_the_window_are_evicted():
+    index = SimHashIndex()
+    now = datetime(2026, 10, 5, tzinfo=timezone.utc)
+    index.add(simhash(HEADLINE), HEADLINE, "old", now - timedelta(hours=50))
+    index.add(simhash("Fire at chemical plant in Osaka"), "Fire at chemical plant in Osaka", "new", now)
+    assert index.evict(now - timedelta(hours=48)) == 1
+    assert len(index) == 1
+    assert index.find(simhash(HEADLINE), HEADLINE) is None
+    assert index.find(simhash("Fire at chemical plant in Osaka"), "Fire at chemical plant in Osaka") == "new"
+    assert all(index._buckets)
+    assert sum(len(buckets) for buckets in index._buckets) == 4
+
+
+def test_drop_seen_suppresses_near_duplicate_headlines(store):
+    fetched = [
+        article("u1", HEADLINE),
+        article("u2", HEADLINE + " - Reuters"),
+        article("u3", "Typhoon shuts ports in southern Vietnam"),
+        article("u1", HEADLINE),
+        article("", "No URL"),
+    ]
+    cycle, = drop_seen([Cycle(1, fetched)], store)
+    assert [a["url"] for a, _ in cycle.new] == ["u1", "u3"]
+    assert (cycle.duplicates, cycle.already_seen) == (1, 2)
+    # The duplicate is stored with the article it repeats
+    assert store.conn.execute("SELECT status, duplicate_of FROM articles WHERE url = 'u2'").fetchone() == (
+        "duplicate", "u1")
+
+
+def mark_all_as_risk(cycles):
+    # Stands in for analyse(): every new article is a risk
+    for cycle in cycles:
+        cycle.results = [ArticleResult(a["url"], a["title"], "risk", "[P0 - CRITICAL]") for a, _ in cycle.new]
+        yield cycle
+
+
+def test_restart_remembers_urls_titles_and_the_watermark(tmp_path):
+    path = str(tmp_path / "monitor.sqlite")
+    store = MonitorStore(path)
+    cycle, = persist(mark_all_as_risk(drop_seen([Cycle(1, [article("u1", HEADLINE, "2026-10-05T08:00:00Z")])],
+                                                store)), store)
+    assert len(cycle.results) == 1
+    store.close()
+
+    store = MonitorStore(path)
+    assert store.watermark().isoformat() == "2026-10-05T08:00:00+00:00"
+    fetched = [
+        article("u1", HEADLINE, "2026-10-05T08:00:00Z"),
+        article("u2", "Typhoon shuts ports in Southern Taiwan!", "2026-10-05T09:00:00Z"),
+        # More than the lookback window before the watermark
+        article("u3", "Strike at Rotterdam container terminal", "2026-09-01T08:00:00Z"),
+        article("u4", "Strike at Rotterdam container terminal", "2026-10-05T10:00:00Z"),
+    ]
+    cycle, = drop_seen([Cycle(2, fetched)], store)
+    assert [a["url"] for a, _ in cycle.new] == ["u4"]
+    assert (cycle.already_seen, cycle.duplicates, cycle.stale) == (1, 1, 1)
+
+    # The stale article was recorded, so the next poll drops it by URL
+    cycle, = drop_seen([Cycle(3, [fetched[2]])], store)
+    assert (cycle.already_seen, cycle.stale) == (1, 0)
+    assert store.counts()["stale"] == 1
+    store.close()
+
+
+def test_drop_seen_forgets_titles_older_than_the_window(store):
+    index = SimHashIndex()
+    index.add(simhash(HEADLINE), HEADLINE, "u1", datetime.now(timezone.utc) - timedelta(hours=49))
+    cycle, = drop_seen([Cycle(1, [article("u2", HEADLINE + " - Reuters")])], store, index)
+    assert [a["url"] for a, _ in cycle.new] == ["u2"]
+    assert len(index) == 1
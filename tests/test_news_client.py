@@ -0,0 +1,151 @@
+"""
+NewsClient against a local stub of the GNews /search endpoint.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from src.news_client import NewsClient
+
+
+class StubGNews:
+    """
+    Answers /search with one article titled after the query. `statuses` are returned, in
+    order, before the first successful answer; `delay` slows every answer down.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.statuses = []
+        self.delay = 0.0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)["q"][0]
+                with lock:
+                    stub.queries.append(query)
+                    status = stub.statuses.pop(0) if stub.statuses else 200
+                time.sleep(stub.delay)
+                body = json.dumps({"articles": [{"title": f"News about {query}"}]} if status == 200 else {}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubGNews()
+    yield server
+    server.close()
+
+
+def make_client(stub, **kwargs) -> NewsClient:
+    settings = {"api_key": "test", "base_url": stub.url, "timeout": 5, "max_retries": 2,
+                "backoff_seconds": 0.01, "cache_ttl": 60, "max_workers": 4}
+    settings.update(kwargs)
+    return NewsClient(**settings)
+
+
+def test_query_is_sent_as_written(stub):
+    client = make_client(stub)
+    articles = client.search("factory fire OR port congestion")
+    assert stub.queries == ["factory fire OR port congestion"]
+    assert articles == [{"title": "News about factory fire OR port congestion"}]
+    client.close()
+
+
+def test_cache_hit_until_ttl_expires(stub):
+    client = make_client(stub, cache_ttl=0.2)
+    client.search("Taiwan typhoon")
+    client.search("  Taiwan   typhoon ")
+    assert len(stub.queries) == 1
+    assert client.stats()["cache_hits"] == 1
+    time.sleep(0.3)
+    client.search("Taiwan typhoon")
+    assert len(stub.queries) == 2
+    client.close()
+
+
+def test_case_is_part_of_the_cache_key(stub):
+    # Upper-case OR is an operator to GNews, lower-case or is a word
+    client = make_client(stub)
+    assert client.search("taiwan OR japan") == [{"title": "News about taiwan OR japan"}]
+    assert client.search("taiwan or japan") == [{"title": "News about taiwan or japan"}]
+    assert stub.queries == ["taiwan OR japan", "taiwan or japan"]
+    client.close()
+
+
+def test_callers_cannot_change_the_cached_articles(stub):
+    client = make_client(stub)
+    client.search("port strike").clear()
+    client.search_many(["port strike"])["port strike"].append({"title": "added"})
+    assert client.search("port strike") == [{"title": "News about port strike"}]
+    assert len(stub.queries) == 1
+    client.close()
+
+
+def test_concurrent_identical_queries_share_one_request(stub):
+    stub.delay = 0.3
+    client = make_client(stub)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(client.search, ["port strike"] * 8))
+    assert len(stub.queries) == 1
+    assert all(result == results[0] for result in results)
+    assert client.stats()["coalesced"] == 7
+    client.close()
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_retries_transient_errors(stub, status):
+    stub.statuses = [status, status]
+    client = make_client(stub)
+    assert client.search("chip shortage") == [{"title": "News about chip shortage"}]
+    assert len(stub.queries) == 3
+    client.close()
+
+
+def test_gives_up_after_retries_and_does_not_cache(stub):
+    stub.statuses = [500] * 3
+    client = make_client(stub)
+    assert client.search("flood") == []
+    assert len(stub.queries) == 3
+    # The failure was not cached: the next call goes upstream again and succeeds
+    assert client.search("flood") == [{"title": "News about flood"}]
+    assert len(stub.queries) == 4
+    client.close()
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.statuses = [403]
+    client = make_client(stub)
+    assert client.search("earthquake") == []
+    assert len(stub.queries) == 1
+    client.close()
+
+
+def test_connection_error_returns_empty(stub):
+    url = stub.url
+    stub.close()
+    client = NewsClient(api_key="test", base_url=url, timeout=1, max_retries=1, backoff_seconds=0.01)
+    assert client.search("earthquake") == []
+    client.close()
@@ -0,0 +1,107 @@
+"""
+MultiActionReActOutputParser and ParallelAgentExecutor, driven by FakeListLLM.
+"""
+import threading
+import time
+
+import pytest
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.fake import FakeListLLM
+from langchain_core.tools import tool
+
+from src.agent_factory import build_react_agent
+from src.parallel_agent import MultiActionReActOutputParser, ParallelAgentExecutor
+from src.prompts import get_react_prompt
+
+TWO_ACTIONS = """Thought: I should check both locations.
+Action: lookup
+Action Input: Hsinchu
+Action: lookup
+Action Input: "Rotterdam"
+"""
+
+
+def test_parser_returns_every_action():
+    actions = MultiActionReActOutputParser().parse(TWO_ACTIONS)
+    assert [(a.tool, a.tool_input) for a in actions] == [("lookup", "Hsinchu"), ("lookup", "Rotterdam")]
+    # The first action keeps the thought in its log
+    assert actions[0].log.startswith("Thought: I should check both locations.")
+    assert actions[1].log.startswith("Action: lookup")
+
+
+def test_parser_single_action_and_final_answer():
+    parser = MultiActionReActOutputParser()
+    action = parser.parse("Thought: look it up\nAction: lookup\nAction Input: Hsinchu")
+    assert isinstance(action, AgentAction)
+    assert (action.tool, action.tool_input) == ("lookup", "Hsinchu")
+
+    finish = parser.parse("Thought: I now know the final answer\nFinal Answer: All clear.")
+    assert isinstance(finish, AgentFinish)
+    assert finish.return_values["output"] == "All clear."
+
+
+def test_parser_rejects_malformed_output():
+    with pytest.raises(OutputParserException):
+        MultiActionReActOutputParser().parse("Thought: I am not sure what to do next.")
+
+
+def make_tools(delays: dict, calls: list):
+    @tool
+    def lookup(location: str) -> str:
+        """Looks a location up."""
+        calls.append((location, threading.current_thread().name, time.perf_counter()))
+        time.sleep(delays.get(location, 0.0))
+        return f"{location}: ok"
+
+    return [lookup]
+
+
+def make_executor(responses: list, tools: list, **kwargs) -> ParallelAgentExecutor:
+    agent = build_react_agent(FakeListLLM(responses=responses), tools, get_react_prompt(),
+                              output_parser=MultiActionReActOutputParser())
+    return ParallelAgentExecutor(agent=agent, tools=tools, **kwargs)
+
+
+def test_actions_run_concurrently_and_observations_keep_their_order():
+    calls = []
+    # The first action is the slowest, so it finishes last
+    tools = make_tools({"Hsinchu": 0.4, "Rotterdam": 0.2, "Penang": 0.0}, calls)
+    three_actions = ("Thought: check all three\nAction: lookup\nAction Input: Hsinchu\n"
+                     "Action: lookup\nAction Input: Rotterdam\nAction: lookup\nAction Input: Penang")
+    executor = make_executor([three_actions, "Thought: done\nFinal Answer: checked"], tools)
+
+    start = time.perf_counter()
+    result = executor.invoke({"input": "Check our locations."})
+    elapsed = time.perf_counter() - start
+
+    assert result["output"] == "checked"
+    assert [observation for _, observation in result["intermediate_steps"]] == [
+        "Hsinchu: ok", "Rotterdam: ok", "Penang: ok"]
+    # Run side by side: well under the 0.6s they would take one after another
+    assert elapsed < 0.55
+    assert len({thread for _, thread, _ in calls}) == 3
+    assert max(t for _, _, t in calls) - min(t for _, _, t in calls) < 0.15
+
+
+def test_unknown_tool_and_parse_error_become_observations():
+    calls = []
+    executor = make_executor([
+        "Thought: hmm, no action here",
+        "Thought: try\nAction: teleport\nAction Input: Mars",
+        "Thought: done\nFinal Answer: gave up",
+    ], make_tools({}, calls))
+    result = executor.invoke({"input": "Go."})
+    observations = [observation for _, observation in result["intermediate_steps"]]
+    assert observations[0].startswith("Invalid Format")
+    assert "teleport is not a valid tool" in observations[1]
+    assert result["output"] == "gave up"
+    assert calls == []
+
+
+def test_iteration_limit():
+    executor = make_executor(["Thought: again\nAction: lookup\nAction Input: Hsinchu"] * 3,
+                             make_tools({}, []), max_iterations=3)
+    result = executor.invoke({"input": "Loop."})
+    assert len(result["intermediate_steps"]) == 3
+    assert result["output"].startswith("Agent stopped")
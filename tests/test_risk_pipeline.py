@@ -0,0 +1,116 @@
+"""
+The Aho-Corasick matcher and the deterministic RiskPipeline.
+"""
+import random
+
+import pytest
+
+from conftest import MATERIALS, SUPPLIERS, write_catalogue
+from src.filter_index import FilterIndex
+from src.risk_pipeline import AhoCorasick, RiskPipeline
+
+
+def naive_find(patterns: list, text: str) -> list:
+    # Every whole-word, case-insensitive occurrence, then the same longest-first selection
+    lowered = text.lower()
+    found = [(start, start + len(pattern), payload) for pattern, payload in patterns
+             for start in range(len(text)) if lowered.startswith(pattern.lower(), start)]
+    found = [(s, e, p) for s, e, p in found
+             if (s == 0 or not lowered[s - 1].isalnum()) and (e == len(lowered) or not lowered[e].isalnum())]
+    found.sort(key=lambda m: (m[0], -(m[1] - m[0]), m[2]))
+    chosen, last_end = [], -1
+    for match in found:
+        if match[0] >= last_end:
+            chosen.append(match)
+            last_end = match[1]
+    return chosen
+
+
+def test_matcher_prefers_longest_whole_word_match():
+    matcher = AhoCorasick([("Taipei", "taipei"), ("New Taipei", "new taipei"), ("York", "york"), ("Osaka", "osaka")])
+    assert matcher.find("Flooding in NEW TAIPEI and Yorkshire; Osaka port closed") == [
+        (12, 22, "new taipei"), (38, 43, "osaka")]
+
+
+def test_matcher_agrees_with_naive_scan():
+    rng = random.Random(7)
+    alphabet = "ab c"
+    patterns = sorted({"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))).strip() or "a"
+                       for _ in range(30)})
+    patterns = [(p, p) for p in patterns]
+    matcher = AhoCorasick(patterns)
+    for _ in range(300):
+        text = "".join(rng.choice(alphabet + "AB.") for _ in range(rng.randint(0, 40)))
+        expected = naive_find(patterns, text)
+        found = matcher.find(text)
+        # Where several patterns end at the same place only the span is guaranteed, not which payload
+        assert [(s, e) for s, e, _ in found] == [(s, e) for s, e, _ in expected], text
+
+
+@pytest.fixture
+def pipeline(catalogue) -> RiskPipeline:
+    return RiskPipeline(FilterIndex.from_csv(catalogue))
+
+
+def test_headlines_are_prioritised_by_criticality(pipeline):
+    risks, unmatched = pipeline.run([
+        {"title": "Port strike in Rotterdam", "url": "u1"},
+        {"title": "Typhoon hits Hsinchu, Taiwan", "url": "u2"},
+        {"title": "Markets rally on rate cut", "url": "u3"},
+    ])
+    assert [r.headline for r in risks] == ["Typhoon hits Hsinchu, Taiwan", "Port strike in Rotterdam"]
+    assert [r.priority_tag for r in risks] == ["[P0 - CRITICAL]", "[P0 - CRITICAL]"]
+    # The city and its country count once, as the city
+    assert [(e.field, e.value) for e in risks[0].exposures] == [("city", "Hsinchu")]
+    assert [a["url"] for a in unmatched] == ["u3"]
+    assert "Hsinchu (city): 2 materials from 1 suppliers" in pipeline.format_report(risks)
+
+
+def test_country_aliases(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    write_catalogue(data_path, suppliers=SUPPLIERS + [("S004", "Lone Star Metals", "USA", "Austin", "Metals")],
+                    materials=MATERIALS + [("M005", "Steel Beam", "S004", "Low")])
+    pipeline = RiskPipeline(FilterIndex.from_csv(str(data_path) + "/"))
+    item = pipeline.assess("New tariffs announced by the United States")
+    assert [(e.field, e.value) for e in item.exposures] == [("country", "USA")]
+    assert item.priority_tag == "[P2 - INFO]"
+
+
+def test_same_city_name_in_two_countries(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    suppliers = [
+        ("S001", "Iberia Chips", "Spain", "Valencia", "Electronics"),
+        ("S002", "Orinoco Steel", "Venezuela", "Valencia", "Metals"),
+    ]
+    materials = [("M001", "Wafer", "S001", "Critical"), ("M002", "Rebar", "S002", "Low")]
+    write_catalogue(data_path, suppliers=suppliers, materials=materials)
+    pipeline = RiskPipeline(FilterIndex.from_csv(str(data_path) + "/"))
+
+    # Named with its country: only that Valencia, and the country is not counted again
+    item = pipeline.assess("Power cut in Valencia, Venezuela")
+    assert [(e.field, e.value) for e in item.exposures] == [("city", "Valencia")]
+    assert pipeline.index.columns["material_id"][item.exposures[0].rows].tolist() == ["M002"]
+    assert item.priority_tag == "[P2 - INFO]"
+
+    item = pipeline.assess("Power cut in Valencia, Spain")
+    assert pipeline.index.columns["material_id"][item.exposures[0].rows].tolist() == ["M001"]
+    assert item.priority_tag == "[P0 - CRITICAL]"
+
+    # Without a country it could be either
+    item = pipeline.assess("Power cut in Valencia")
+    assert sorted(pipeline.index.columns["material_id"][item.exposures[0].rows].tolist()) == ["M001", "M002"]
+
+
+def test_report_on_materials_without_a_criticality(tmp_path):
+    data_path = tmp_path / "data"
+    data_path.mkdir()
+    write_catalogue(data_path, suppliers=SUPPLIERS + [("S004", "Andes Cable", "Chile", "Santiago", "Metals")],
+                    materials=MATERIALS + [("M005", "Copper Wire", "S004", None)])
+    pipeline = RiskPipeline(FilterIndex.from_csv(str(data_path) + "/"))
+    risks, _ = pipeline.run([{"title": "Mine strike in Santiago", "url": "u1"}])
+    assert [r.priority_tag for r in risks] == ["[P2 - INFO]"]
+    assert pipeline.format_report(risks) == (
+        "[P2 - INFO] Mine strike in Santiago -> Santiago (city): 1 materials from 1 suppliers, "
+        "e.g. Unknown criticality 'Copper Wire' (M005) from 'Andes Cable'")
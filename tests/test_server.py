@@ -0,0 +1,195 @@
+"""
+RiskServer on an ephemeral port, with StubReActLLM and StaticNewsSource standing in for the
+LLM and GNews.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from src.news_client import StaticNewsSource
+from src.server import RiskServer, RiskService
+
+ARTICLES = [
+    {"title": "Port strike halts supply chain disruption fears", "url": "stub://1"},
+    {"title": "Typhoon closes factories in Hsinchu", "url": "stub://2"},
+]
+
+
+class GatedNews(StaticNewsSource):
+    """
+    StaticNewsSource whose searches wait until the gate is open.
+    """
+
+    def __init__(self, articles: list):
+        super().__init__(articles)
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def search(self, query: str) -> list:
+        self.gate.wait(10)
+        return super().search(query)
+
+
+@pytest.fixture
+def news(monkeypatch):
+    source = GatedNews(ARTICLES)
+    monkeypatch.setattr("src.news_client._client", source)
+    yield source
+    source.gate.set()
+
+
+@pytest.fixture
+def start_server():
+    started = []
+
+    def start(service=None, **kwargs) -> tuple:
+        server = RiskServer(service or RiskService(stub_llm=True), **kwargs)
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(server.serve("127.0.0.1", 0, warm=False))
+
+        def run():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        wait_for(lambda: server.port is not None)
+        started.append((loop, task, thread))
+        return server, f"http://127.0.0.1:{server.port}"
+
+    yield start
+    for loop, task, thread in started:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(5)
+
+
+@pytest.fixture
+def indexes(catalogue, tmp_path, monkeypatch):
+    # Filter and exposure indexes built from the test catalogue, with their snapshots in tmp_path
+    import src.exposure_index as exposure_index
+    import src.filter_index as filter_index
+
+    monkeypatch.setattr(filter_index, "DATA_PATH", catalogue)
+    monkeypatch.setattr(filter_index, "FILTER_INDEX_PATH", str(tmp_path / "filter_index.pkl"))
+    monkeypatch.setattr(filter_index, "_filter_index", None)
+    monkeypatch.setattr(exposure_index, "DATA_PATH", catalogue)
+    monkeypatch.setattr(exposure_index, "EXPOSURE_INDEX_PATH", str(tmp_path / "exposure_index.npz"))
+    monkeypatch.setattr(exposure_index, "_exposure_index", None)
+    return filter_index
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting"
+        time.sleep(0.01)
+
+
+def post_in_background(url: str, body: dict) -> list:
+    # Returns a list that receives the response once it arrives
+    responses = []
+    threading.Thread(target=lambda: responses.append(requests.post(url, json=body, timeout=10)), daemon=True).start()
+    return responses
+
+
+def test_health_and_news(news, start_server):
+    _, url = start_server()
+    health = requests.get(f"{url}/health", timeout=5)
+    assert health.status_code == 200
+    assert health.json() == {"status": "ok", "warm": False}
+
+    response = requests.post(f"{url}/news", json={"queries": ["port strike", "strike"]}, timeout=5)
+    assert response.status_code == 200
+    assert response.json()["articles"] == [{"title": ARTICLES[0]["title"], "url": "stub://1"}]
+
+
+def test_bad_requests(news, start_server):
+    _, url = start_server()
+    assert requests.post(f"{url}/news", json={}, timeout=5).status_code == 400
+    assert requests.post(f"{url}/news", data=b"not json", timeout=5).status_code == 400
+    assert requests.get(f"{url}/news", timeout=5).status_code == 405
+    assert requests.post(f"{url}/nowhere", json={}, timeout=5).status_code == 404
+
+
+def test_agent_is_built_on_first_use_after_a_failed_warm_up(news, indexes, start_server, monkeypatch):
+    import src.agent_factory as agent_factory
+
+    service = RiskService(stub_llm=True)
+    monkeypatch.setattr("src.llm_cache.get_llm_cache", lambda: None)
+    real_build = agent_factory.build_agent_executor
+
+    def failing_build(*args, **kwargs):
+        raise RuntimeError("LLM endpoint unreachable")
+
+    monkeypatch.setattr(agent_factory, "build_agent_executor", failing_build)
+    service.warm_up(load_model=False)
+    assert not service.warm and service.agent_executor is None
+    _, url = start_server(service)
+    response = requests.post(f"{url}/report", json={"mode": "agent"}, timeout=5)
+    assert response.status_code == 503
+    assert "LLM endpoint unreachable" in response.json()["error"]
+
+    # Once the cause is gone the next agent request builds the executor itself
+    monkeypatch.setattr(agent_factory, "build_agent_executor", real_build)
+    response = requests.post(f"{url}/report", json={"mode": "agent"}, timeout=30)
+    assert response.status_code == 200
+    body = response.json()
+    assert "Port strike halts" in body["report"]
+    assert body["steps"]
+
+
+def test_fast_report_reuses_the_pipeline(news, indexes, start_server):
+    service = RiskService(stub_llm=True)
+    _, url = start_server(service)
+    for _ in range(2):
+        response = requests.post(f"{url}/report", json={"headlines": ["Typhoon closes factories in Hsinchu"]},
+                                 timeout=10)
+        assert response.status_code == 200 and response.json()["risks"] == 1
+    pipeline = service.pipeline()
+    assert service.pipeline() is pipeline
+
+    # A reloaded filter index gets a new pipeline
+    indexes.reset_filter_index()
+    assert service.pipeline() is not pipeline
+
+
+def test_full_queue_is_rejected(news, start_server):
+    server, url = start_server(max_concurrency=1, max_queue=1)
+    news.gate.clear()
+    first = post_in_background(f"{url}/news", {"query": "port"})
+    wait_for(lambda: server.queue.running == 1)
+    second = post_in_background(f"{url}/news", {"query": "typhoon"})
+    wait_for(lambda: server.queue.waiting == 1)
+
+    rejected = requests.post(f"{url}/news", json={"query": "strike"}, timeout=5)
+    assert rejected.status_code == 429
+
+    news.gate.set()
+    wait_for(lambda: first and second)
+    assert first[0].status_code == 200 and second[0].status_code == 200
+    metrics = requests.get(f"{url}/metrics", timeout=5).json()
+    assert metrics["queue"]["rejected"] == 1
+    assert metrics["endpoints"]["/news"]["count"] == 2
+
+
+def test_timed_out_request_keeps_its_slot(news, start_server):
+    server, url = start_server(max_concurrency=1, max_queue=0, timeout=0.2)
+    news.gate.clear()
+    timed_out = requests.post(f"{url}/news", json={"query": "port"}, timeout=5)
+    assert timed_out.status_code == 504
+
+    # The worker thread is still busy, so there is no room for another request
+    metrics = requests.get(f"{url}/metrics", timeout=5).json()
+    assert metrics["queue"]["running"] == 1
+    assert metrics["queue"]["orphaned"] == 1
+    assert requests.post(f"{url}/news", json={"query": "typhoon"}, timeout=5).status_code == 429
+
+    news.gate.set()
+    wait_for(lambda: server.queue.orphaned == 0)
+    assert server.queue.running == 0
+    assert requests.post(f"{url}/news", json={"query": "typhoon"}, timeout=5).status_code == 200
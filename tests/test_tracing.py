@@ -0,0 +1,110 @@
+"""
+Tracing: span nesting within a thread, across threads (explicit parent) and across asyncio
+tasks (contextvars), and the exported records.
+"""
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import src.tracing as tracing
+from src.tracing import current_span_id, enable_tracing, span, traced
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    return enable_tracing("test")
+
+
+def by_name(tracer) -> dict:
+    return {s["name"]: s for s in tracer.spans}
+
+
+def test_disabled_tracing_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(tracing, "_tracer", None)
+    with span("anything", k=1) as s:
+        s.set(hits=3)
+        assert current_span_id() is None
+    assert span("a") is span("b")
+
+
+def test_spans_nest_and_record_errors(tracer):
+    @traced()
+    def work():
+        with span("inner", k=5) as s:
+            s.set(hits=2)
+
+    with span("outer"):
+        work()
+        with pytest.raises(KeyError):
+            with span("failing"):
+                raise KeyError("x")
+    assert current_span_id() is None
+
+    spans = by_name(tracer)
+    assert spans["outer"]["parent"] is None
+    assert spans["test_spans_nest_and_record_errors.<locals>.work"]["parent"] == spans["outer"]["id"]
+    assert spans["inner"]["parent"] == spans["test_spans_nest_and_record_errors.<locals>.work"]["id"]
+    assert spans["inner"]["attrs"] == {"k": 5, "hits": 2}
+    assert spans["failing"]["parent"] == spans["outer"]["id"] and spans["failing"]["error"] == "KeyError"
+    # Children finish before their parents
+    assert [s["name"] for s in tracer.spans][-1] == "outer"
+
+
+def test_threads_start_without_a_parent_unless_one_is_passed(tracer):
+    def handed_over(parent):
+        with span("with_parent", parent=parent):
+            with span("nested_in_thread"):
+                pass
+        with span("without_parent"):
+            pass
+
+    with span("request"):
+        parent = current_span_id()
+        with ThreadPoolExecutor(2) as pool:
+            list(pool.map(handed_over, [parent, parent]))
+
+    request = by_name(tracer)["request"]["id"]
+    assert [s["parent"] for s in tracer.spans if s["name"] == "with_parent"] == [request, request]
+    assert {s["parent"] for s in tracer.spans if s["name"] == "without_parent"} == {None}
+    with_parent_ids = {s["id"] for s in tracer.spans if s["name"] == "with_parent"}
+    assert {s["parent"] for s in tracer.spans if s["name"] == "nested_in_thread"} == with_parent_ids
+    assert {s["thread"] for s in tracer.spans if s["name"] == "with_parent"} != {threading.current_thread().name}
+
+
+def test_asyncio_tasks_keep_their_own_current_span(tracer):
+    async def task(name):
+        with span(name):
+            await asyncio.sleep(0.01)
+            with span(name + ".child"):
+                await asyncio.sleep(0)
+
+    async def main():
+        with span("gather"):
+            await asyncio.gather(task("a"), task("b"))
+
+    asyncio.run(main())
+    spans = by_name(tracer)
+    assert spans["a"]["parent"] == spans["b"]["parent"] == spans["gather"]["id"]
+    # Interleaved tasks do not become each other's children
+    assert spans["a.child"]["parent"] == spans["a"]["id"]
+    assert spans["b.child"]["parent"] == spans["b"]["id"]
+
+
+def test_export_summary_and_span_limit(tracer, tmp_path):
+    tracer.max_spans = 3
+    with span("root"):
+        for _ in range(4):
+            with span("leaf"):
+                pass
+    assert (len(tracer.spans), tracer.dropped) == (3, 2)
+
+    path = tracer.export_jsonl(str(tmp_path / "trace.jsonl"))
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert [r["name"] for r in records] == ["leaf", "leaf", "leaf"]
+    summary = tracer.summary()
+    assert "leaf" in summary and "2 spans dropped" in summary
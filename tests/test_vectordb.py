@@ -0,0 +1,111 @@
+"""
+Incremental ingest (vectordb.create_vector_db) into a flat store in a temporary directory,
+with a fake embedder.
+"""
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import vectordb
+from conftest import MATERIALS, SUPPLIERS, write_catalogue
+from src.lexical_index import LexicalIndex
+from src.vectorstore import FlatVectorStore
+
+
+class FakeEmbedder:
+    """
+    Stands in for BatchEmbedder: a vector derived from the text's hash, and a record of every text.
+    """
+    model_name = "fake"
+    backend = "fake"
+    batch_size = 16
+    workers = 1
+
+    def __init__(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def embed(self, texts: list):
+        FakeEmbedder.embedded.extend(texts)
+        seeds = [int.from_bytes(hashlib.blake2b(t.encode(), digest_size=4).digest(), "little") for t in texts]
+        return np.vstack([np.random.default_rng(seed).standard_normal(8) for seed in seeds]).astype(np.float32)
+
+
+@pytest.fixture
+def ingest(catalogue, tmp_path, monkeypatch):
+    store_path = str(tmp_path / "flat") + "/"
+    lexical_path = str(tmp_path / "lexical_index.pkl")
+    monkeypatch.setattr(vectordb, "DATA_PATH", catalogue)
+    monkeypatch.setattr(vectordb, "LEXICAL_INDEX_PATH", lexical_path)
+    monkeypatch.setattr(vectordb, "get_vector_store", lambda backend: FlatVectorStore(store_path))
+    monkeypatch.setattr(vectordb, "BatchEmbedder", FakeEmbedder)
+    monkeypatch.setattr(vectordb, "build_filter_index", lambda data_path: None)
+    monkeypatch.setattr(vectordb, "build_exposure_index", lambda data_path: None)
+
+    def run(incremental: bool = True) -> list:
+        FakeEmbedder.embedded = []
+        vectordb.create_vector_db(incremental=incremental, chunksize=2, backend="flat")
+        return FakeEmbedder.embedded
+
+    run.store = lambda: FlatVectorStore(store_path)
+    run.lexical = lambda: LexicalIndex.load(lexical_path)
+    run.data_path = Path(catalogue)
+    run.store_path = Path(store_path)
+    return run
+
+
+def test_first_run_embeds_everything(ingest):
+    assert len(ingest()) == len(MATERIALS)
+    store = ingest.store()
+    assert sorted(store.get_hashes()) == ["M001", "M002", "M003", "M004"]
+    assert ingest.lexical().search("M003", k=1)[0][0] == "M003"
+
+
+def test_unchanged_catalogue_writes_nothing(ingest):
+    ingest()
+    manifest = ingest.store_path / "manifest.json"
+    written = manifest.stat().st_mtime_ns
+    hashes = ingest.store().get_hashes()
+
+    assert ingest() == []
+    assert manifest.stat().st_mtime_ns == written
+    assert ingest.store().get_hashes() == hashes
+
+
+def test_changed_row_is_replaced_and_removed_row_deleted(ingest):
+    ingest()
+    materials = [("M001", "ECO-298-ULTRA Drum Container", "S002", "Critical")] + MATERIALS[1:3]
+    write_catalogue(ingest.data_path, materials=materials)
+
+    embedded = ingest()
+    assert len(embedded) == 1 and "'ECO-298-ULTRA Drum Container' (ID: M001) is a Critical" in embedded[0]
+    store = ingest.store()
+    assert sorted(store.get_hashes()) == ["M001", "M002", "M003"]
+    doc, _ = store.get(["M001"])[0]
+    assert doc.metadata["criticality_level"] == "Critical"
+    lexical = ingest.lexical()
+    assert lexical.search("M004") == []
+    assert sorted(lexical.ids) == ["M001", "M002", "M003"]
+
+
+def test_supplier_change_re_embeds_its_materials(ingest):
+    ingest()
+    suppliers = [("S001", "Sun Earth Corp", "Taiwan", "Taichung", "Electronics")] + SUPPLIERS[1:]
+    write_catalogue(ingest.data_path, suppliers=suppliers)
+
+    embedded = ingest()
+    assert sorted(text.split("(ID: ")[1][:4] for text in embedded) == ["M002", "M004"]
+    assert ingest.lexical().search("Taichung", k=5, max_doc_fraction=1.0)
+
+
+def test_full_rebuild_embeds_everything_again(ingest):
+    ingest()
+    assert len(ingest(incremental=False)) == len(MATERIALS)
+    assert len(ingest.store().get_hashes()) == len(MATERIALS)
@@ -0,0 +1,154 @@
+"""
+FlatVectorStore: exact top-k against a brute-force scan, `where` filters, int8 quantization
+and writes through persist().
+"""
+import numpy as np
+import pytest
+
+from src.vectorstore import FlatVectorStore
+
+
+def random_rows(n: int, dim: int = 16, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+
+
+def unit(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def store_path(tmp_path) -> str:
+    return str(tmp_path / "flat") + "/"
+
+
+def filled(path: str, vectors: np.ndarray, quantize: bool = False, block_rows: int = 7) -> FlatVectorStore:
+    store = FlatVectorStore(path, quantize=quantize, block_rows=block_rows)
+    ids = [f"d{i:03d}" for i in range(len(vectors))]
+    metadatas = [{"parity": "even" if i % 2 == 0 else "odd", "bucket": str(i % 3)} for i in range(len(vectors))]
+    store.upsert(ids, vectors, [f"text {i}" for i in range(len(vectors))], metadatas)
+    store.persist()
+    return store
+
+
+def test_top_k_matches_brute_force_across_blocks(store_path):
+    vectors = random_rows(50)
+    queries = random_rows(4, seed=1)
+    # Seven-row blocks, so the running top-k is merged several times
+    store = filled(store_path, vectors)
+
+    expected = np.argsort(-(unit(queries) @ unit(vectors).T), axis=1)[:, :5]
+    results = store.query(queries, k=5)
+    for hits, rows in zip(results, expected):
+        assert [doc.id for doc, _ in hits] == [f"d{r:03d}" for r in rows]
+        distances = [d for _, d in hits]
+        assert distances == sorted(distances)
+    # Squared L2 between unit vectors
+    doc, distance = results[0][0]
+    row = int(doc.id[1:])
+    assert distance == pytest.approx(float(np.sum((unit(queries)[0] - unit(vectors)[row]) ** 2)), abs=1e-5)
+
+
+def test_where_filters(store_path):
+    vectors = random_rows(30)
+    store = filled(store_path, vectors)
+    query = random_rows(1, seed=2)
+
+    def ids(where):
+        return sorted(int(doc.id[1:]) for doc, _ in store.query(query, k=100, where=where)[0])
+
+    assert ids({"parity": "even"}) == list(range(0, 30, 2))
+    assert ids({"bucket": {"$in": ["0", "1"]}}) == [i for i in range(30) if i % 3 != 2]
+    assert ids({"bucket": {"$nin": ["0"]}}) == [i for i in range(30) if i % 3 != 0]
+    assert ids({"parity": {"$ne": "odd"}}) == list(range(0, 30, 2))
+    assert ids({"$and": [{"parity": "odd"}, {"bucket": "0"}]}) == [i for i in range(30) if i % 2 and i % 3 == 0]
+    assert ids({"$or": [{"parity": "odd"}, {"bucket": "0"}]}) == [i for i in range(30) if i % 2 or i % 3 == 0]
+    assert ids({"missing_field": "x"}) == []
+
+    # get() applies the same semantics row by row
+    fetched = store.get(["d000", "d003", "d004", "nope"], where={"$and": [{"parity": "even"}, {"bucket": "1"}]})
+    assert [doc.id for doc, _ in fetched] == ["d004"]
+    np.testing.assert_allclose(fetched[0][1], unit(vectors)[4], atol=1e-6)
+
+
+def test_metadata_keeps_its_types(store_path):
+    store = FlatVectorStore(store_path)
+    metadatas = [{"year": 2020 + i, "weight": 0.5 * i, "active": i % 2 == 0, "code": str(i)} for i in range(6)]
+    store.upsert([f"d{i}" for i in range(6)], random_rows(6), [f"text {i}" for i in range(6)], metadatas)
+    store.persist()
+    store = FlatVectorStore(store_path)
+    query = random_rows(1, seed=2)
+
+    def ids(where):
+        hits = sorted(int(doc.id[1:]) for doc, _ in store.query(query, k=10, where=where)[0])
+        # get() applies the same semantics row by row
+        assert sorted(int(doc.id[1:]) for doc, _ in store.get([f"d{i}" for i in range(6)], where=where)) == hits
+        return hits
+
+    (doc, _), = store.get(["d3"])
+    assert doc.metadata == {"year": 2023, "weight": 1.5, "active": False, "code": "3"}
+    assert ids({"year": 2023}) == [3]
+    assert ids({"year": "2023"}) == []
+    assert ids({"code": 3}) == []
+    assert ids({"year": {"$gte": 2022}}) == [2, 3, 4, 5]
+    assert ids({"$and": [{"weight": {"$gt": 0.5}}, {"weight": {"$lt": 2.0}}]}) == [2, 3]
+    assert ids({"active": True}) == [0, 2, 4]
+    # True is not the number 1
+    assert ids({"year": {"$lt": 2022}}) == [0, 1] and ids({"active": 1}) == []
+    assert ids({"code": {"$gt": 2}}) == []
+
+
+def test_unknown_operators_are_rejected(store_path):
+    store = filled(store_path, random_rows(4))
+    for where in [{"parity": {"$regex": "ev"}}, {"missing_field": {"$like": "x"}}, {"bucket": {"$gt": "0"}}]:
+        with pytest.raises(ValueError):
+            store.query(random_rows(1), k=3, where=where)
+        with pytest.raises(ValueError):
+            store.get(["d000"], where=where)
+
+
+def test_quantized_store_ranks_like_the_float_one(tmp_path):
+    vectors = random_rows(200, dim=32)
+    queries = random_rows(5, dim=32, seed=3)
+    exact = filled(str(tmp_path / "f32") + "/", vectors)
+    quantized = filled(str(tmp_path / "int8") + "/", vectors, quantize=True)
+    assert quantized._vectors.dtype == np.int8
+
+    for exact_hits, quantized_hits in zip(exact.query(queries, k=10), quantized.query(queries, k=10)):
+        assert exact_hits[0][0].id == quantized_hits[0][0].id
+        assert len({d.id for d, _ in exact_hits} & {d.id for d, _ in quantized_hits}) >= 8
+        assert quantized_hits[0][1] == pytest.approx(exact_hits[0][1], abs=0.02)
+
+    # An int8 index cannot be appended to as a float32 one
+    store = FlatVectorStore(quantized.path, quantize=False)
+    store.upsert(["x"], random_rows(1, dim=32), ["x"], [{}])
+    with pytest.raises(ValueError):
+        store.persist()
+
+
+def test_writes_are_visible_after_persist_and_reopen(store_path):
+    vectors = random_rows(10)
+    store = filled(store_path, vectors)
+    assert store.count() == 10
+
+    store.delete(["d001", "d002"])
+    store.upsert(["d003", "new"], random_rows(2, seed=4), ["changed", "added"],
+                 [{"parity": "odd", "content_hash": "h3"}, {"content_hash": "hn"}])
+    # Queries still see the persisted rows until persist()
+    assert store.count() == 10
+    assert "d001" not in store.get_hashes() and store.get_hashes()["new"] == "hn"
+    store.persist()
+
+    reopened = FlatVectorStore(store_path)
+    assert reopened.count() == 9
+    assert sorted(reopened.get_hashes()) == sorted([f"d{i:03d}" for i in range(10) if i not in (1, 2)] + ["new"])
+    (doc, _), = reopened.get(["d003"])
+    assert (doc.page_content, doc.metadata["parity"]) == ("changed", "odd")
+    # Keys that new rows did not set are left out of their metadata, and vice versa
+    assert "parity" not in reopened.get(["new"])[0][0].metadata
+    assert "content_hash" not in reopened.get(["d000"])[0][0].metadata
+
+    reopened.reset()
+    assert reopened.get_hashes() == {}
+    reopened.persist()
+    assert FlatVectorStore(store_path).count() == 0
+    assert FlatVectorStore(store_path).query(random_rows(1), k=3) == [[]]
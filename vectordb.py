@@ -1,75 +1,154 @@
+import argparse
+import atexit
+
 import pandas as pd
-import chromadb
-from langchain_community.document_loaders import DataFrameLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import Chroma
-from langchain_core.documents import Document
-from langchain_community.embeddings import SentenceTransformerEmbeddings
-from src.config import DATA_PATH, DB_PATH, EMBEDDING_MODEL
+from src.config import (
+    DATA_PATH, DB_PATH, FLAT_INDEX_PATH, VECTOR_BACKEND, LEXICAL_INDEX_ENABLED, LEXICAL_INDEX_PATH,
+    CHROMA_WRITE_BATCH_SIZE, INGEST_CHUNK_ROWS, EMBED_BATCH_SIZE, EMBED_WORKERS,
+)
+from src.documents import iter_merged_frames, render_documents, to_metadatas
+from src.embedding import BatchEmbedder, embed_and_write
+from src.exposure_index import build_exposure_index
+from src.filter_index import build_filter_index
+from src.lexical_index import LexicalIndex
+from src.tracing import enable_tracing, finish_tracing, span, traced
+from src.vectorstore import VectorStore, get_vector_store
 # Define the paths to your data and the persistent database directory
-def create_vector_db():
+
+def write_documents(store: VectorStore, batch: pd.DataFrame, embeddings):
+    """
+    Upserts one batch of rendered documents and their precomputed embeddings, keyed by material_id.
+    """
+    store.upsert(
+        ids=batch["id"].tolist(),
+        embeddings=embeddings,
+        documents=batch["page_content"].tolist(),
+        metadatas=to_metadatas(batch),
+    )
+
+def iter_write_batches(rendered: pd.DataFrame, batch_size: int = CHROMA_WRITE_BATCH_SIZE):
+    """
+    Slices rendered documents into bounded batches for embedding and writing.
+    """
+    for start in range(0, len(rendered), batch_size):
+        yield rendered.iloc[start:start + batch_size]
+
+@traced("ingest")
+def create_vector_db(incremental: bool = True, chunksize: int = INGEST_CHUNK_ROWS,
+                     embed_batch_size: int = EMBED_BATCH_SIZE, workers: int = EMBED_WORKERS,
+                     backend: str = VECTOR_BACKEND):
     """
     Creates and persists a vector database from the company's supply chain data.
     This new version enriches each document with critical metadata.
+
+    With incremental=True (the default) only rows whose content hash changed since the
+    last run are embedded and upserted, and rows that disappeared from the CSVs are deleted.
+    With incremental=False the collection is dropped and rebuilt from scratch.
+    materials.csv is streamed `chunksize` rows at a time (None reads it in one go), and
+    embeddings are computed `embed_batch_size` texts at a time across `workers` processes.
+    `backend` picks the vector store ("chroma" or "flat", see src/vectorstore.py).
+    The BM25 lexical index (src/lexical_index.py) receives the same upserts and deletes.
     """
-    # 1. LOAD AND PREPROCESS THE DATA
-    print("Step 1: Loading and preprocessing data...")
-    
-    suppliers_df = pd.read_csv(DATA_PATH + "suppliers.csv")
-    materials_df = pd.read_csv(DATA_PATH + "materials.csv")
+    # 1. OPEN THE VECTOR DATABASE
+    # Embeddings are computed by our own batched embedding stage, so the store itself
+    # does not need an embedding function here.
+    print(f"Step 1: Opening the '{backend}' vector store...")
+    with span("ingest.open_store", backend=backend):
+        store = get_vector_store(backend)
+    lexical = None
+    if LEXICAL_INDEX_ENABLED:
+        with span("ingest.open_lexical"):
+            lexical = LexicalIndex.open(LEXICAL_INDEX_PATH) if incremental else LexicalIndex()
 
-    merged_df = pd.merge(
-        materials_df,
-        suppliers_df,
-        how="left",
-        left_on="supplied_by_id",
-        right_on="supplier_id"
-    )
-    print("Successfully loaded and merged CSV data.")
+    if incremental:
+        with span("ingest.read_hashes"):
+            existing_hashes = pd.Series(store.get_hashes(), dtype=object)
+        print(f"Found {len(existing_hashes)} documents already in the vector database.")
+    else:
+        print("Dropping the existing documents for a full rebuild...")
+        with span("ingest.reset"):
+            store.reset()
+        existing_hashes = pd.Series(dtype=object)
+    # A store built before the lexical index existed: index every row once, not just the changed ones
+    backfill_lexical = lexical is not None and len(lexical) == 0 and len(existing_hashes) > 0
 
+    # 2. LOAD, MERGE AND RENDER THE DATA CHUNK BY CHUNK, THEN EMBED AND WRITE IT
+    # Every document is a single sentence, well under any sensible chunk size, so each
+    # material maps to exactly one vector and is keyed by its material_id.
+    seen_ids = set()
+    counts = {"rows": 0, "changed": 0}
 
-    # 2. CREATE LANGCHAIN DOCUMENTS WITH METADATA
-    print("\nStep 2: Creating LangChain documents with metadata...")
-    
-    documents = []
-    for index, row in merged_df.iterrows():
-        page_content = f"Material '{row['material_name']}' (ID: {row['material_id']}) is a " \
-                       f"{row['criticality_level']} criticality component. It is supplied by " \
-                       f"'{row['supplier_name']}' (ID: {row['supplier_id']}) from {row['city']}, " \
-                       f"{row['country']}, which is in the {row['industry_type']} industry."
-        
-        metadata = {
-            "source": f"materials.csv:{row['material_id']}",
-            "supplier_name": row['supplier_name'],
-            "material_name": row['material_name'],
-            "criticality_level": row['criticality_level']
-        }
-        
-        documents.append(Document(page_content=page_content, metadata=metadata))
+    def changed_batches():
+        frames = iter_merged_frames(DATA_PATH, chunksize=chunksize)
+        while True:
+            # The spans must not stay open across the yield below
+            with span("ingest.read"):
+                merged_df = next(frames, None)
+            if merged_df is None:
+                return
+            with span("ingest.render", rows=len(merged_df)):
+                rendered = render_documents(merged_df)
+                counts["rows"] += len(rendered)
+                seen_ids.update(rendered["id"])
 
-    print(f"Successfully created {len(documents)} documents with rich metadata.")
-    
-    # 3. SPLIT DOCUMENTS INTO CHUNKS
-    print("\nStep 3: Splitting documents into chunks...")
-    text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    texts = text_splitter.split_documents(documents)
-    print(f"Split documents into {len(texts)} chunks.")
+                # Keep only rows that are new or whose content hash changed
+                previous = existing_hashes.reindex(rendered["id"]).to_numpy()
+                changed = rendered[previous != rendered["content_hash"].to_numpy()]
+            if lexical is not None:
+                indexed = rendered if backfill_lexical else changed
+                with span("ingest.lexical", rows=len(indexed)):
+                    lexical.upsert(indexed["id"].tolist(), indexed["page_content"].tolist())
+            counts["changed"] += len(changed)
+            print(f"Rendered {counts['rows']} rows, {counts['changed']} new or changed so far.")
+            yield from iter_write_batches(changed)
 
-    # 4. CREATE EMBEDDINGS
-    print("\nStep 4: Creating embeddings...")
-    embeddings = SentenceTransformerEmbeddings(model_name=EMBEDDING_MODEL)
-    print("Embeddings model loaded.")
+    with BatchEmbedder(batch_size=embed_batch_size, workers=workers) as embedder, span("ingest.embed_and_write"):
+        print(f"\nStep 2: Embedding new or changed rows with '{embedder.model_name}' on {embedder.backend} "
+              f"(batch size {embedder.batch_size}, {max(embedder.workers, 1)} worker(s))...")
+        embed_and_write(embedder, changed_batches(), lambda batch, embeddings: write_documents(store, batch, embeddings))
 
-    # 5. CREATE AND PERSIST THE VECTOR DATABASE
-    print("\nStep 5: Creating and persisting the vector database...")
-    vectordb = Chroma.from_documents(
-        documents=texts, 
-        embedding=embeddings,
-        persist_directory=DB_PATH
-    )
-    
-    vectordb.persist()
-    print(f"\nVector database created and persisted at: {DB_PATH}")
+    # 3. DELETE ROWS THAT VANISHED FROM THE CSVs
+    stale_ids = [doc_id for doc_id in existing_hashes.index if doc_id not in seen_ids]
+    print(f"\nStep 3: Deleting {len(stale_ids)} stale documents...")
+    with span("ingest.delete", rows=len(stale_ids)):
+        store.delete(stale_ids)
+        if lexical is not None:
+            lexical.delete(stale_ids)
+
+    with span("ingest.persist"):
+        store.persist()
+    if lexical is not None:
+        with span("ingest.lexical_persist"):
+            lexical.persist(LEXICAL_INDEX_PATH)
+        print(f"Lexical index updated: {len(lexical)} documents, {len(lexical.vocab)} terms.")
+
+    # 4. REFRESH THE STRUCTURED INDEX SNAPSHOTS
+    print("\nStep 4: Building the filter index and the supplier exposure index...")
+    with span("ingest.filter_index"):
+        build_filter_index(DATA_PATH)
+    with span("ingest.exposure_index"):
+        build_exposure_index(DATA_PATH)
+
+    print(f"\n{counts['changed']} of {counts['rows']} documents embedded, {len(stale_ids)} deleted.")
+    print(f"Vector database created and persisted at: {FLAT_INDEX_PATH if backend == 'flat' else DB_PATH}")
 
 if __name__ == "__main__":
-    create_vector_db()
+    parser = argparse.ArgumentParser(description="Build or update the supply chain vector database.")
+    parser.add_argument("--full", action="store_true",
+                        help="Drop the collection and re-embed every row instead of updating only changed rows.")
+    parser.add_argument("--chunksize", type=int, default=INGEST_CHUNK_ROWS,
+                        help="Rows of materials.csv to read at a time (0 reads the whole file at once).")
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE,
+                        help="Texts per embedding batch.")
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS,
+                        help="Embedding processes (1 encodes in this process).")
+    parser.add_argument("--backend", choices=["chroma", "flat"], default=VECTOR_BACKEND,
+                        help="Vector store to build (defaults to VECTOR_BACKEND in src/config.py).")
+    parser.add_argument("--trace", action="store_true",
+                        help="Time every ingest stage and print a summary (spans are written to traces/).")
+    args = parser.parse_args()
+    if args.trace:
+        enable_tracing("vectordb")
+        atexit.register(finish_tracing)
+    create_vector_db(incremental=not args.full, chunksize=args.chunksize or None,
+                     embed_batch_size=args.batch_size, workers=args.workers, backend=args.backend)